@@ -0,0 +1,45 @@
+# app/cli.py
+#
+# One-shot database tasks, run once per deploy before the API starts (the API no longer does them on import):
+#
+#   python -m app.cli migrate   # apply pending Alembic migrations (app/migrations)
+#   python -m app.cli seed      # create the ADMIN_EMAIL superuser if there is no superuser yet
+#   python -m app.cli init      # both
+
+import argparse
+import logging
+from dotenv import load_dotenv
+from app.core.logging_config import setup_logging
+
+logger = logging.getLogger("app.cli")
+
+def migrate() -> None:
+    from app.core.db import migrate_db
+    migrate_db()
+    logger.info("Database is at the latest migration.")
+
+def seed() -> None:
+    from app.core.db import seed_admin
+    from app.core.passwords import shutdown_pool
+    try:
+        created = seed_admin()
+    finally:
+        shutdown_pool()
+    logger.info("Admin user created." if created else "A superuser already exists, nothing to seed.")
+
+def init() -> None:
+    migrate()
+    seed()
+
+COMMANDS = {"migrate": migrate, "seed": seed, "init": init}
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Birthday Buddy database tasks")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    load_dotenv() # Same environment as the API: the root .env, before the tasks import the settings
+    setup_logging()
+    COMMANDS[args.command]()
+
+if __name__ == "__main__":
+    main()
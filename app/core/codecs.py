@@ -0,0 +1,110 @@
+# app/core/codecs.py
+
+import abc
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try: # Optional, only needed with CACHE_CODEC=msgpack
+    import msgpack
+except ImportError:
+    msgpack = None
+import orjson
+logger = logging.getLogger(__name__)
+
+# Every payload starts with two bytes: the codec tag and "z" (zlib) or "-" (raw).
+# Readers pick the decoder from the tag, so changing CACHE_CODEC never misreads what is already in Redis.
+_COMPRESSED, _RAW = b"z", b"-"
+
+# ──────────────────────────────────Codecs──────────────────────────────────
+class Codec(abc.ABC):
+    tag: bytes = b"?"
+    errors: Tuple[type, ...] = (ValueError,) # What loads() raises on bytes it cannot read (JSONDecodeError and orjson's subclass ValueError)
+
+    @abc.abstractmethod
+    def dumps(self, value: Any) -> bytes: ...
+
+    @abc.abstractmethod
+    def loads(self, data: bytes) -> Any: ...
+
+class JsonCodec(Codec): # Stdlib json, the original cache format
+    tag = b"j"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+class OrjsonCodec(Codec): # Serialises UUID/date/datetime natively, several times faster than json
+    tag = b"o"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=str)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+class MsgpackCodec(Codec): # Smallest payloads. UUIDs and dates are stored as strings, like the JSON codecs
+    tag = b"m"
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("CACHE_CODEC=msgpack needs the msgpack package (pip install msgpack)")
+        self.errors = (ValueError, msgpack.exceptions.UnpackException)
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=str)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data)
+
+CODECS: Dict[str, Callable[[], Codec]] = {"json": JsonCodec, "orjson": OrjsonCodec, "msgpack": MsgpackCodec}
+
+# ──────────────────────────────────Framed payloads──────────────────────────────────
+class PayloadCodec:
+    """
+    Encodes cache values with the configured codec, zlib-compressing anything of at least `compress_min_bytes`
+    (0 disables compression). Decodes whatever codec a payload was written with.
+    """
+    def __init__(self, name: str, compress_min_bytes: int = 0):
+        if name not in CODECS:
+            raise ValueError(f"Unknown cache codec {name!r}, expected one of {sorted(CODECS)}")
+        self.codec = CODECS[name]()
+        self.compress_min_bytes = compress_min_bytes
+        self._decoders: Dict[bytes, Codec] = {self.codec.tag: self.codec}
+
+    def encode(self, value: Any) -> bytes:
+        data = self.codec.dumps(value)
+        if self.compress_min_bytes and len(data) >= self.compress_min_bytes:
+            return self.codec.tag + _COMPRESSED + zlib.compress(data)
+        return self.codec.tag + _RAW + data
+
+    def decode(self, payload: Optional[bytes]) -> Optional[Any]: # None for a miss, or a payload we cannot read (treated as a miss)
+        if not payload:
+            return None
+        codec = self._decoder(payload[:1])
+        if codec is None:
+            return None
+        data = payload[2:]
+        try:
+            if payload[1:2] == _COMPRESSED:
+                data = zlib.decompress(data)
+            return codec.loads(data)
+        except (zlib.error, *codec.errors) as e: # Truncated or corrupt entry: a miss, the caller rebuilds it
+            logger.warning("Unreadable %r cache payload (%d bytes), treating as a miss: %s", payload[:1], len(payload), e)
+            return None
+
+    def _decoder(self, tag: bytes) -> Optional[Codec]:
+        if tag not in self._decoders:
+            for factory in CODECS.values():
+                if factory.tag == tag:
+                    try:
+                        self._decoders[tag] = factory()
+                    except RuntimeError: # e.g. msgpack payloads but msgpack not installed here
+                        return None
+                    break
+            else:
+                return None
+        return self._decoders[tag]
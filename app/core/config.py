@@ -3,10 +3,6 @@
 from datetime import date
 from pydantic import AnyHttpUrl, EmailStr, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from passlib.context import CryptContext
-
-# ──────────────────────────────────Create password‐hasher──────────────────────────────────
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # ──────────────────────────────────Define Pydantic settings class──────────────────────────────────
 class Settings(BaseSettings):
@@ -18,6 +14,55 @@ class Settings(BaseSettings):
     admin_dob: date          = Field(..., env="ADMIN_DOB")  
     redis_url: str           = Field(..., env="REDIS_URL")
     database_url: str        = Field(..., env="DATABASE_URL")
+    scheduler_mode: str      = Field("daily", env="SCHEDULER_MODE") # "daily" = 09:00 ET for everyone, "timezone" = 09:00 in each workspace's timezone
+
+    # Slack fan-out tuning
+    slack_max_workers: int   = Field(8, env="SLACK_MAX_WORKERS")       # Webhooks posted to concurrently
+    slack_rate_per_sec: float = Field(1.0, env="SLACK_RATE_PER_SEC")   # Slack allows ~1 msg/s per incoming webhook
+    slack_burst: int         = Field(1, env="SLACK_BURST")             # Token bucket capacity per webhook
+    outbox_max_attempts: int = Field(5, env="OUTBOX_MAX_ATTEMPTS")     # Failed notifications are dead-lettered after this many tries
+    scheduler_lock_ttl: int  = Field(60, env="SCHEDULER_LOCK_TTL")     # Seconds a dead replica can hold the job lock before failover
+
+    # Postgres connection pool (applied to both the sync and the async engine, per process)
+    db_pool_size: int        = Field(5, env="DB_POOL_SIZE")            # Connections kept open
+    db_max_overflow: int     = Field(10, env="DB_MAX_OVERFLOW")        # Extra connections allowed under burst
+    db_pool_timeout: int     = Field(30, env="DB_POOL_TIMEOUT")        # Seconds to wait for a free connection
+    db_pool_recycle: int     = Field(1800, env="DB_POOL_RECYCLE")      # Reconnect connections older than this (seconds)
+    db_pool_pre_ping: bool   = Field(True, env="DB_POOL_PRE_PING")     # Test connections on checkout, drops dead ones after a DB restart
+    db_create_all: bool      = Field(False, env="DB_CREATE_ALL")       # Build the schema with create_all() instead of migrations. Scratch/dev databases only
+
+    # Redis connection pool
+    redis_max_connections: int        = Field(50, env="REDIS_MAX_CONNECTIONS")
+    redis_socket_timeout: float       = Field(5.0, env="REDIS_SOCKET_TIMEOUT")          # Seconds per command before RedisError
+    redis_socket_connect_timeout: float = Field(5.0, env="REDIS_SOCKET_CONNECT_TIMEOUT")
+    redis_health_check_interval: int  = Field(30, env="REDIS_HEALTH_CHECK_INTERVAL")    # PING idle connections older than this before reuse
+
+    # List endpoint paging
+    page_size: int           = Field(100, env="PAGE_SIZE")             # Default ?limit= for list endpoints
+    max_page_size: int       = Field(1000, env="MAX_PAGE_SIZE")        # Largest ?limit= accepted
+
+    # In-process (L1) cache in front of Redis, per worker
+    l1_cache_max_entries: int = Field(1024, env="L1_CACHE_MAX_ENTRIES") # Pages kept in memory, least recently used evicted first. 0 disables
+    l1_cache_ttl: float      = Field(5.0, env="L1_CACHE_TTL")          # Seconds a page is served from memory. Bounds staleness if an invalidation is missed
+    l1_workspaces_ttl: float = Field(300.0, env="L1_WORKSPACES_TTL")   # Workspaces barely change, so keep them in memory longer
+
+    # Cached payload format
+    cache_codec: str         = Field("orjson", env="CACHE_CODEC")      # "orjson", "json" or "msgpack" (needs the msgpack package)
+    cache_compress_min_bytes: int = Field(0, env="CACHE_COMPRESS_MIN_BYTES") # zlib-compress payloads at least this big. 0 disables
+
+    # Background admin jobs
+    job_max_workers: int     = Field(2, env="JOB_MAX_WORKERS")         # Admin jobs run at once per process
+    job_ttl: int             = Field(86400, env="JOB_TTL")             # Seconds a job's status stays pollable after it was queued
+
+    # Authenticated-user cache
+    principal_cache_ttl: int = Field(60, env="PRINCIPAL_CACHE_TTL")   # Seconds a resolved bearer token skips the user lookup. Updates/deletes evict right away
+    jwt_principal_claims: bool = Field(False, env="JWT_PRINCIPAL_CLAIMS") # Put workspace ("ws") and superuser ("su") claims in new tokens; tokens whose claims went stale are rejected
+
+    # Password hashing (app/core/passwords.py)
+    password_scheme: str     = Field("bcrypt", env="PASSWORD_SCHEME")  # "bcrypt" or "argon2" (needs argon2-cffi). Hashes in the other scheme are upgraded on login
+    bcrypt_rounds: int       = Field(12, env="BCRYPT_ROUNDS")          # log2 cost. Changing it rehashes each password on its owner's next login
+    password_hash_workers: int = Field(0, env="PASSWORD_HASH_WORKERS") # Processes in each API worker's hashing pool. 0 = CPUs / WEB_CONCURRENCY
+    web_concurrency: int     = Field(1, env="WEB_CONCURRENCY")         # API worker processes on this host (uvicorn --workers reads the same variable)
 
     # Pydantic-settings config ignoring extra fields
     model_config = SettingsConfigDict(
@@ -26,14 +71,5 @@ class Settings(BaseSettings):
         extra="ignore",    
     )
 
-    # Seeding the admin user's password (need to hash it first)
-    @property
-    def hashed_admin_password(self) -> str:
-        """
-        bcrypt-hash the plain admin_password on demand.
-        Used in init_db() to seed the superuser.
-        """
-        return pwd_ctx.hash(self.admin_password)
-
 # ──────────────────────────────────Instantiate global settings object──────────────────────────────────
 settings = Settings()
\ No newline at end of file
@@ -1,48 +1,219 @@
 # app/core/db.py
 
+import logging
+from typing import Any, AsyncGenerator, Callable, TypeVar
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import IntegrityError
-from redis import Redis
+from sqlalchemy.ext.asyncio import create_async_engine
+from redis import ConnectionPool, Redis
+from redis.asyncio import ConnectionPool as AsyncConnectionPool, Redis as AsyncRedis
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.passwords import hash_password
 from app.models.user_model import User
+logger = logging.getLogger(__name__)
 
 # ──────────────────────────────────Create SQLModel Engine──────────────────────────────────
-engine = create_engine(settings.database_url, echo=False)
+_pool_options = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
+engine = create_engine(settings.database_url, echo=False, **_pool_options)
 SessionLocal = Session # aliases the local session
 
+# ──────────────────────────────────Create async engine──────────────────────────────────
+def _async_database_url(url: str) -> str: # postgresql:// or postgresql+psycopg2:// -> postgresql+asyncpg://
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgresql+psycopg2"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+async_engine = create_async_engine(_async_database_url(settings.database_url), echo=False, **_pool_options) # Used by the hot read and auth paths
+
+instrument_engine(engine, "sync") # db_query_seconds on /metrics
+instrument_engine(async_engine.sync_engine, "async")
+
 # ──────────────────────────────────Create Redis client──────────────────────────────────
-redis = Redis.from_url(settings.redis_url, decode_responses=True)
+redis_pool = ConnectionPool.from_url(
+    settings.redis_url,
+    decode_responses=True,
+    max_connections=settings.redis_max_connections,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_socket_connect_timeout,
+    health_check_interval=settings.redis_health_check_interval,
+)
+redis = Redis(connection_pool=redis_pool)
+
+# Cache payloads are binary (see app/core/codecs.py), so the cache gets its own undecoded pool
+cache_redis_pool = ConnectionPool.from_url(
+    settings.redis_url,
+    max_connections=settings.redis_max_connections,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_socket_connect_timeout,
+    health_check_interval=settings.redis_health_check_interval,
+)
+cache_redis = Redis(connection_pool=cache_redis_pool)
+
+# Async twin of the cache client for the request path, so coroutines never block the event loop on Redis
+async_cache_redis_pool = AsyncConnectionPool.from_url(
+    settings.redis_url,
+    max_connections=settings.redis_max_connections,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_socket_connect_timeout,
+    health_check_interval=settings.redis_health_check_interval,
+)
+async_cache_redis = AsyncRedis(connection_pool=async_cache_redis_pool)
 
 # ──────────────────────────────────Initialize database & seed admin──────────────────────────────────
 def init_db() -> None:
     """
-    Create all tables and ensure the default admin user exists.
+    Migrate the schema and ensure the default admin user exists. Run once per deploy with `python -m app.cli init`,
+    not by the API processes on startup.
+    """
+    migrate_db()
+    seed_admin()
+
+def migrate_db() -> None:
+    """
+    Apply pending Alembic migrations (app/migrations). Databases created before migrations existed are stamped
+    at the baseline first. DB_CREATE_ALL=true skips Alembic and runs create_all(), for throwaway databases. Safe to re-run.
     """
-    SQLModel.metadata.create_all(engine)
+    if settings.db_create_all:
+        SQLModel.metadata.create_all(engine)
+        return
+    from app.core.migrations import upgrade # Alembic is only needed by this one-shot command
+    upgrade()
 
+def seed_admin() -> bool: # Create the ADMIN_EMAIL superuser unless a superuser exists. True when one was created
     with SessionLocal(engine) as session: # look for an existing superuser
         existing = session.exec(
             select(User).where(User.is_superuser == True)
         ).first()                                     
-        if not existing:
-            admin = User(
-                email=settings.admin_email,
-                hashed_password=settings.hashed_admin_password,
-                date_of_birth=settings.admin_dob,
-                is_active=True,
-                is_superuser=True,
-                is_verified=True,
-            )
-            session.add(admin)
-            try:
-                session.commit()
-            except IntegrityError: # if two processes race eat it up so only 1 admin exists
-                session.rollback()
+        if existing:
+            return False
+        admin = User(
+            email=settings.admin_email,
+            hashed_password=hash_password(settings.admin_password),
+            date_of_birth=settings.admin_dob,
+            is_active=True,
+            is_superuser=True,
+            is_verified=True,
+        )
+        session.add(admin)
+        try:
+            session.commit()
+        except IntegrityError: # if two processes race eat it up so only 1 admin exists
+            session.rollback()
+            return False
+    return True
                 
-# ──────────────────────────────────Give local session info──────────────────────────────────
-def get_session():
+# ──────────────────────────────────Backfill birthday month-day key──────────────────────────────────
+def backfill_birthday_month_day() -> int:
+    """
+    Add the indexed birthday.month_day column to pre-existing tables and fill it for rows that lack it.
+    create_all() only creates missing tables, so older databases need this one-off step. Safe to re-run.
+    Only used when adopting such a database into migrations; schema changes since then are Alembic revisions.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE birthday ADD COLUMN IF NOT EXISTS month_day INTEGER"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_birthday_month_day ON birthday (month_day)"))
+        result = conn.execute(text(
+            "UPDATE birthday "
+            "SET month_day = EXTRACT(MONTH FROM date_of_birth)::int * 100 + EXTRACT(DAY FROM date_of_birth)::int "
+            "WHERE month_day IS NULL"
+        ))
+    return result.rowcount
+
+# ──────────────────────────────────Indexes for the timezone scheduler──────────────────────────────────
+def create_scheduler_indexes() -> None:
     """
-    Dependency that yields a database session and closes it after use.
+    Indexes used by the timezone-aware birthday job on databases created before they were declared on the models.
     """
-    with SessionLocal(engine) as session:
-        yield session
\ No newline at end of file
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_workspace_timezone ON workspace (timezone)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_birthday_workspace_month_day ON birthday (workspace_id, month_day)"))
+
+# ──────────────────────────────────Duplicate unique constraint on birthday.user_id──────────────────────────────────
+def drop_duplicate_birthday_user_unique() -> int:
+    """
+    create_all() gave older databases two unique constraints on birthday.user_id: uq_birthday_user and an unnamed one
+    from Field(unique=True), so every insert maintained two identical indexes. Drop all but uq_birthday_user. Safe to re-run.
+    Returns the number dropped.
+    """
+    uniques = inspect(engine).get_unique_constraints("birthday")
+    if not any(u["name"] == "uq_birthday_user" for u in uniques): # Never leave the column without one
+        return 0
+    duplicates = [u["name"] for u in uniques if u["column_names"] == ["user_id"] and u["name"] != "uq_birthday_user"]
+    with engine.begin() as conn:
+        for name in duplicates:
+            conn.execute(text(f'ALTER TABLE birthday DROP CONSTRAINT IF EXISTS "{name}"'))
+    return len(duplicates)
+
+# ──────────────────────────────────Request-scoped session──────────────────────────────────
+T = TypeVar("T")
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    The one database session of a request. FastAPI caches dependencies per request, so the auth user lookup,
+    get_uow and any route asking for this all get the same session, and at most one pooled connection.
+    The connection is only checked out on the first query, so requests served from cache never take one.
+    expire_on_commit=False so returned objects can still be serialised after a commit without lazy IO.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+class UnitOfWork:
+    """
+    The request's session, for routes whose service code is synchronous.
+    run_sync hands the services a sync Session bound to the same connection and transaction, so they run
+    unchanged without a second connection. They run on the event loop (DB waits still yield to other
+    requests), so keep CPU-heavy work such as password hashing out of them, and register their blocking
+    cache writes with after_commit: those run in the threadpool once the service returns.
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T: # fn(sync_session, *args, **kwargs)
+        deferred: list = []
+
+        def call(sync_session: Session, *args: Any, **kwargs: Any) -> T:
+            sync_session.info["after_commit"] = deferred
+            try:
+                return fn(sync_session, *args, **kwargs)
+            finally:
+                sync_session.info.pop("after_commit", None)
+
+        try:
+            return await self.session.run_sync(call, *args, **kwargs)
+        finally:
+            if deferred: # Also when fn raised after a commit: what it committed still has to reach the cache
+                await run_in_threadpool(_run_deferred, deferred)
+
+def after_commit(session: Session, fn: Callable[..., Any], *args: Any) -> None:
+    """
+    Run fn(*args) after a write has been committed: straight away for a plain Session (threads, jobs, the CLI),
+    later and off the event loop when called inside UnitOfWork.run_sync.
+    """
+    deferred = session.info.get("after_commit")
+    if deferred is None:
+        fn(*args)
+    else:
+        deferred.append((fn, args))
+
+def _run_deferred(deferred: list) -> None:
+    for fn, args in deferred:
+        try:
+            fn(*args)
+        except Exception:
+            logger.exception("after_commit callback %s failed", getattr(fn, "__name__", fn))
+
+def get_uow(session: AsyncSession = Depends(get_async_session)) -> UnitOfWork:
+    return UnitOfWork(session)
\ No newline at end of file
@@ -0,0 +1,66 @@
+# app/core/metrics.py
+
+import os
+import time
+from typing import Optional
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ──────────────────────────────────Cache──────────────────────────────────
+# "family" is the key family without ids: birthdays:all, birthdays:ws, users:ws, workspaces:all, or a record kind (birthday, user, workspace)
+CACHE_HITS = Counter("cache_hits_total", "List pages served from cache", ["family", "tier"]) # tier: l1, redis or stale
+CACHE_MISSES = Counter("cache_misses_total", "List pages rebuilt from the database", ["family"])
+CACHE_ERRORS = Counter("cache_errors_total", "Redis errors on cache operations (the request falls back to the DB)", ["family", "op"])
+CACHE_PAYLOAD_BYTES = Histogram(
+    "cache_payload_bytes", "Size of encoded cache payloads", ["family", "op"],
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+CACHE_CODEC_SECONDS = Histogram(
+    "cache_codec_seconds", "Time spent encoding/decoding cache payloads", ["family", "op"],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1),
+)
+
+# ──────────────────────────────────Database──────────────────────────────────
+DB_QUERY_SECONDS = Histogram("db_query_seconds", "SQL statement execution time", ["engine", "statement"])
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool", ["engine"])
+
+def _statement_kind(statement: str) -> str: # SELECT/INSERT/UPDATE/DELETE/..., keeps label cardinality fixed
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+
+def instrument_engine(engine: Engine, name: str) -> None: # Time every statement and count pool checkouts on a (sync) engine. Pass async_engine.sync_engine for the async one
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_conn, conn_record, conn_proxy):
+        DB_POOL_CHECKOUTS.labels(name).inc()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter() # On the statement's own context, so a failed statement leaves nothing behind
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_start", None)
+        if started is None:
+            return
+        DB_QUERY_SECONDS.labels(name, _statement_kind(statement)).observe(time.perf_counter() - started)
+
+# ──────────────────────────────────HTTP──────────────────────────────────
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency", ["method", "route", "status"])
+
+# ──────────────────────────────────Slack──────────────────────────────────
+SLACK_POST_SECONDS = Histogram(
+    "slack_post_seconds", "Latency of each Slack webhook POST attempt", ["outcome"], # outcome: HTTP status, or "error"
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# ──────────────────────────────────Exposition──────────────────────────────────
+def render_metrics() -> tuple:
+    """
+    (body, content type) in the Prometheus text format. With several worker processes, set PROMETHEUS_MULTIPROC_DIR
+    to a shared empty directory so every worker's samples are aggregated instead of just the one answering the scrape.
+    """
+    registry: Optional[CollectorRegistry] = None
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return (generate_latest(registry) if registry else generate_latest()), CONTENT_TYPE_LATEST
@@ -0,0 +1,73 @@
+# app/core/migrations.py
+
+import logging
+from pathlib import Path
+from typing import Sequence
+from alembic import command, op
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+BASELINE_REVISION = "0001" # The schema create_all() built before migrations existed
+BASELINE_TABLES = ("workspace", "user", "birthday", "birthday_notification") # Tables created by revision 0001
+
+# ──────────────────────────────────Alembic config──────────────────────────────────
+def alembic_config() -> Config: # Built in code so the Docker image (which only ships app/) needs no alembic.ini
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+# ──────────────────────────────────Adopt databases created by create_all──────────────────────────────────
+def _adopt_legacy_schema() -> bool:
+    """
+    Databases built by the old init_db (create_all + one-off fixes) have the tables but no alembic_version.
+    Bring them up to the baseline revision the same way init_db used to, then stamp it, so `upgrade` only
+    runs the revisions that came after. True when a database was adopted.
+    """
+    from app.core.db import backfill_birthday_month_day, create_scheduler_indexes, drop_duplicate_birthday_user_unique, engine
+    from app.models import birthday_model, notification_model, user_model, workspace_model  # noqa: F401 (registers the tables create_all may need)
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" in tables or "user" not in tables:
+        return False
+    logger.info("Database predates migrations, stamping it at revision %s.", BASELINE_REVISION)
+    missing = [t for t in SQLModel.metadata.sorted_tables if t.name in BASELINE_TABLES and t.name not in tables] # Added to the models after that database was created
+    SQLModel.metadata.create_all(engine, tables=missing)
+    backfill_birthday_month_day()
+    create_scheduler_indexes()
+    drop_duplicate_birthday_user_unique()
+    command.stamp(alembic_config(), BASELINE_REVISION)
+    return True
+
+def upgrade(revision: str = "head") -> None: # Apply every pending revision
+    _adopt_legacy_schema()
+    command.upgrade(alembic_config(), revision)
+
+# ──────────────────────────────────Online index changes (for revisions)──────────────────────────────────
+def create_index_concurrently(index_name: str, table_name: str, columns: Sequence[str], **kw) -> None:
+    """
+    CREATE INDEX CONCURRENTLY, which does not block writes to the table while it builds. It cannot run
+    inside a transaction, so it runs in an autocommit block. A build that failed halfway leaves an INVALID
+    index behind that IF NOT EXISTS would skip, so one is dropped and rebuilt. Other databases get a plain CREATE INDEX.
+    """
+    context = op.get_context()
+    if context.dialect.name != "postgresql":
+        op.create_index(index_name, table_name, list(columns), if_not_exists=True, **kw)
+        return
+    with context.autocommit_block():
+        invalid = not context.as_sql and op.get_bind().execute(text( # Nothing to look at when only rendering SQL (alembic upgrade --sql)
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ), {"name": index_name}).first()
+        if invalid:
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+        op.create_index(index_name, table_name, list(columns), postgresql_concurrently=True, if_not_exists=True, **kw)
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    if op.get_context().dialect.name != "postgresql":
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
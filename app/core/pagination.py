@@ -0,0 +1,34 @@
+# app/core/pagination.py
+
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import Query, Response
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor" # Set when there is another page. Pass it back as ?cursor=
+
+# ──────────────────────────────────Page query params──────────────────────────────────
+class PageParams: # Dependency for keyset-paginated list endpoints: ?cursor=<X-Next-Cursor>&limit=N
+    def __init__(self,
+                 cursor: Optional[UUID] = Query(None, description="X-Next-Cursor header of the previous page"),
+                 limit: int = Query(settings.page_size, ge=1, le=settings.max_page_size, description="Page size")):
+        self.cursor = cursor
+        self.limit = limit
+
+# ──────────────────────────────────Keyset helpers──────────────────────────────────
+def keyset(stmt, key_column, cursor: Optional[UUID], limit: int): # Rows strictly after the cursor in key order. Fetches one extra row to detect a next page
+    if cursor is not None:
+        stmt = stmt.where(key_column > cursor)
+    return stmt.order_by(key_column).limit(limit + 1)
+
+def split_page(rows: Sequence[Any], limit: int, key: str) -> Tuple[List[Any], Optional[UUID]]: # (page items, cursor for the next page or None)
+    items = list(rows[:limit])
+    next_cursor = getattr(items[-1], key) if len(rows) > limit else None
+    return items, next_cursor
+
+def cursor_from_cache(raw: Optional[str]) -> Optional[UUID]: # Cached pages store the next cursor as a string
+    return UUID(raw) if raw else None
+
+def set_next_cursor(response: Response, next_cursor: Optional[UUID]) -> None:
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
@@ -0,0 +1,104 @@
+# app/core/passwords.py
+
+import asyncio
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+SCHEMES = ("bcrypt", "argon2")
+
+# ──────────────────────────────────Hashing policy──────────────────────────────────
+@lru_cache(maxsize=1)
+def _context() -> "CryptContext":
+    """
+    New hashes use PASSWORD_SCHEME. Hashes in the other scheme, or bcrypt hashes with a different cost than BCRYPT_ROUNDS,
+    still verify but are flagged for an upgrade, which happens on the user's next login.
+    passlib is imported here, on first use, so it stays out of the API's startup path.
+    """
+    from passlib.context import CryptContext
+    if settings.password_scheme not in SCHEMES:
+        raise ValueError(f"Unknown PASSWORD_SCHEME {settings.password_scheme!r}, expected one of {list(SCHEMES)}")
+    rounds = settings.bcrypt_rounds
+    context = CryptContext(
+        schemes=[settings.password_scheme] + [s for s in SCHEMES if s != settings.password_scheme],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds, # min == max == rounds: a cost change either way triggers a rehash
+        bcrypt__max_rounds=rounds,
+    )
+    if settings.password_scheme == "argon2":
+        try:
+            context.handler("argon2").get_backend()
+        except Exception: # passlib raises MissingBackendError, a subclass of several bases depending on version
+            raise RuntimeError("PASSWORD_SCHEME=argon2 needs the argon2-cffi package (pip install argon2-cffi)")
+    return context
+
+# These run inside the pool's worker processes
+def _hash(password: str) -> str:
+    return _context().hash(password)
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return _context().verify_and_update(password, hashed)
+
+# ──────────────────────────────────Process pool──────────────────────────────────
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _workers() -> int: # Every API worker process has its own pool, so together they get one hashing process per CPU
+    return settings.password_hash_workers or max(1, (os.cpu_count() or 1) // max(1, settings.web_concurrency))
+
+def _get_pool() -> ProcessPoolExecutor: # bcrypt/argon2 are CPU-bound: spread them over the cores. spawn, because forking a threaded server is unsafe
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _context() # Fail on a bad PASSWORD_SCHEME here, not inside a worker
+            _pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+# ──────────────────────────────────Sync API (threads, scripts)──────────────────────────────────
+def hash_password(password: str) -> str:
+    return _get_pool().submit(_hash, password).result()
+
+def hash_passwords(passwords: List[str]) -> List[str]: # Bulk hashing for imports, order preserved
+    if not passwords:
+        return []
+    chunksize = max(1, len(passwords) // (_workers() * 4)) # Few enough round trips, still balanced across workers
+    return list(_get_pool().map(_hash, passwords, chunksize=chunksize))
+
+def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]: # (valid, new hash if the stored one is outdated)
+    return _get_pool().submit(_verify_and_update, password, hashed).result()
+
+# ──────────────────────────────────Async API (event loop)──────────────────────────────────
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), _hash, password)
+
+async def verify_and_update_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), _verify_and_update, password, hashed)
+
+# ──────────────────────────────────FastAPI Users adapter──────────────────────────────────
+class PasswordHelper: # Implements fastapi_users.password.PasswordHelperProtocol on top of the shared pool and policy. Blocking: UserManager awaits the async API instead on every path it uses
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return verify_and_update(plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        return hash_password(password)
+
+    def generate(self) -> str:
+        return secrets.token_urlsafe()
+
+password_helper = PasswordHelper()
@@ -1,29 +1,58 @@
 # app/main.py
 
-from app.core.logging_config import setup_logging
-setup_logging() # Configure logging first! Had issues with this one...
 from dotenv import load_dotenv
-load_dotenv()
-from fastapi import FastAPI
-from app.core.db import init_db
-from app.services.scheduler_service import start_scheduler
+load_dotenv() # A .env in the repo root still lands in os.environ; runs before app.core.config builds the settings
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from app.core.db import async_cache_redis, async_engine
+from app.core.logging_config import setup_logging
+from app.core.metrics import HTTP_REQUEST_SECONDS
+from app.core.passwords import shutdown_pool
+from app.services.scheduler_service import start_scheduler, stop_scheduler
+from app.services.redis_cache_service import start_invalidation_listener
 from app.services.auth_service import fastapi_users, auth_backend
 from app.routes.user_route import router as user_router
 from app.routes.birthday_route import router as birthday_router
 from app.routes.workspace_route import router as workspace_router
 from app.routes.utils_route import router as utils_router
+from app.routes.metrics_route import router as metrics_router
 from app.schemas.user_schema import UserRead, UserCreate
 
-# ──────────────────────────────────Initialize database & seed admin user──────────────────────────────────
-init_db()
+# ──────────────────────────────────Startup & shutdown──────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Runs once per worker process, when the server starts it, not when app.main is imported, so importing
+    the app (tests, tooling, uvicorn --reload's supervisor) has no side effects. Tables and the admin user
+    are created by `python -m app.cli init`, run once per deploy before the workers start.
+    """
+    setup_logging()
+    start_invalidation_listener() # Every worker drops its in-memory cache pages when another one writes
+    start_scheduler()
+    yield
+    stop_scheduler()
+    shutdown_pool()
+    await async_engine.dispose()
+    await async_cache_redis.aclose()
 
 # ──────────────────────────────────Create the FastAPI app──────────────────────────────────
-app = FastAPI(title="Birthday Buddy")
+app = FastAPI(title="Birthday Buddy", lifespan=lifespan)
 
-# ──────────────────────────────────Start the scheduler on application startup──────────────────────────────────
-@app.on_event("startup")
-def on_startup():
-    start_scheduler()
+# ──────────────────────────────────Request latency──────────────────────────────────
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels( # Label by route template (/users/{user_id}), not raw path, to keep cardinality bounded
+            request.method, getattr(route, "path", "unmatched"), str(status_code)
+        ).observe(time.perf_counter() - started)
 
 # ──────────────────────────────────AUTHENTICATION ROUTES──────────────────────────────────
 
@@ -52,4 +81,5 @@ app.include_router(
 app.include_router(user_router)
 app.include_router(birthday_router)
 app.include_router(workspace_router)
-app.include_router(utils_router)
\ No newline at end of file
+app.include_router(utils_router)
+app.include_router(metrics_router)
\ No newline at end of file
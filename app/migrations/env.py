@@ -0,0 +1,34 @@
+# app/migrations/env.py
+#
+# Alembic environment. Run through `python -m app.cli migrate`, or plain `alembic` from the repo root (alembic.ini).
+# The database comes from DATABASE_URL (app settings), the target schema from the SQLModel models.
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+from sqlmodel import SQLModel
+from app.core.config import settings
+from app.models import birthday_model, notification_model, user_model, workspace_model  # noqa: F401 (registers the tables)
+
+target_metadata = SQLModel.metadata
+
+def run_migrations_offline() -> None: # alembic upgrade --sql: render the SQL for a DBA instead of running it
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connectable = create_engine(settings.database_url, poolclass=pool.NullPool) # One short-lived connection, not the app's pool
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,88 @@
+"""Initial schema
+
+The tables, constraints and indexes init_db built with create_all() before migrations existed.
+Databases created that way are stamped at this revision instead of running it (see app/core/migrations.py).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workspace",
+        sa.Column("id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("slack_webhook", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("timezone", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_workspace_timezone", "workspace", ["timezone"])
+
+    op.create_table(
+        "user",
+        sa.Column("user_id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("hashed_password", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("date_of_birth", sa.Date(), nullable=False),
+        sa.Column("workspace_id", sqlmodel.sql.sqltypes.GUID(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_superuser", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["workspace_id"], ["workspace.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+
+    op.create_table(
+        "birthday",
+        sa.Column("id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("user_id", sqlmodel.sql.sqltypes.GUID(), nullable=True),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("date_of_birth", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("workspace_id", sqlmodel.sql.sqltypes.GUID(), nullable=True),
+        sa.Column("month_day", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", name="uq_birthday_user"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.user_id"]),
+        sa.ForeignKeyConstraint(["workspace_id"], ["workspace.id"]),
+    )
+    op.create_index("ix_birthday_month_day", "birthday", ["month_day"])
+    op.create_index("ix_birthday_workspace_month_day", "birthday", ["workspace_id", "month_day"])
+
+    op.create_table(
+        "birthday_notification",
+        sa.Column("id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("birthday_id", sqlmodel.sql.sqltypes.GUID(), nullable=False),
+        sa.Column("local_date", sa.Date(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["birthday_id"], ["birthday.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("birthday_id", "local_date", name="uq_notification_birthday_date"),
+    )
+    op.create_index("ix_notification_status_next_attempt", "birthday_notification", ["status", "next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("birthday_notification")
+    op.drop_table("birthday")
+    op.drop_table("user")
+    op.drop_table("workspace")
@@ -0,0 +1,25 @@
+"""Index user.workspace_id
+
+Every workspace-scoped user query (list members, cache rebuilds, the workspace FK check on delete) filters on
+user.workspace_id, which had no index. Built CONCURRENTLY so a live database keeps taking writes meanwhile.
+birthday.workspace_id needs no index of its own: it leads ix_birthday_workspace_month_day, which serves those lookups.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_concurrently("ix_user_workspace_id", "user", ["workspace_id"])
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_user_workspace_id", "user")
@@ -0,0 +1,25 @@
+"""Index lower(user.email)
+
+Logins (fastapi-users get_by_email) and the bulk import's existing-email check match emails case-insensitively,
+on lower(email), which ix_user_email cannot serve. Built CONCURRENTLY so a live database keeps taking writes meanwhile.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from app.core.migrations import create_index_concurrently, drop_index_concurrently
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_concurrently("ix_user_email_lower", "user", [sa.text("lower(email)")])
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_user_email_lower", "user")
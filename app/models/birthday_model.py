@@ -3,7 +3,7 @@
 import uuid
 from datetime import date, datetime, timezone
 from typing import Optional, TYPE_CHECKING
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, Integer, UniqueConstraint, cast, extract
 from sqlmodel import SQLModel, Field, Relationship
 from app.models.workspace_model import Workspace # this causes that circular import :(
 
@@ -14,14 +14,25 @@ if TYPE_CHECKING:
 # ──────────────────────────Define birthday model──────────────────────────────────────────
 class Birthday(SQLModel, table=True):
     __tablename__ = "birthday"
-    __table_args__ = (UniqueConstraint("user_id", name="uq_birthday_user"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_birthday_user"),
+        Index("ix_birthday_workspace_month_day", "workspace_id", "month_day"), # Timezone scheduler: workspaces due this tick + today's key
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="user.user_id", unique=True) # Indexing for user_id in birthday
+    user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="user.user_id") # Unique and indexed through uq_birthday_user
     name: str = Field(nullable=False)
     date_of_birth: date = Field(nullable=False)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     workspace_id: Optional[uuid.UUID] = Field(default=None, foreign_key="workspace.id")
+    month_day: Optional[int] = Field(default=None, index=True) # MMDD key (e.g. 704 for July 4th) so the daily job can use an index instead of extract()
 
     # Establish foreign key relationships in database
     user: Optional["User"] = Relationship(back_populates="birthday") # Each user can have at most one birthday
-    workspace: Optional["Workspace"] = Relationship(back_populates="birthdays") # Each birthday can have many workspaces
\ No newline at end of file
+    workspace: Optional["Workspace"] = Relationship(back_populates="birthdays") # Each birthday can have many workspaces
+
+# ──────────────────────────Month-day key helper──────────────────────────────────────────
+def month_day_key(d: date) -> int: # Encode a date as MMDD. Feb 29 is kept as 229, the scheduler folds it into Feb 28 on non-leap years
+    return d.month * 100 + d.day
+
+def month_day_expr(d): # month_day_key as a SQL expression, for set-based UPDATE/INSERT ... SELECT
+    return cast(extract("month", d), Integer) * 100 + cast(extract("day", d), Integer)
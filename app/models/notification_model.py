@@ -0,0 +1,25 @@
+# app/models/notification_model.py
+
+import uuid
+from datetime import date, datetime, timezone
+from typing import Optional
+from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint
+from sqlmodel import SQLModel, Field
+
+# ──────────────────────────Define birthday notification (outbox) model──────────────────────────────────────────
+class BirthdayNotification(SQLModel, table=True):
+    __tablename__ = "birthday_notification"
+    __table_args__ = (
+        UniqueConstraint("birthday_id", "local_date", name="uq_notification_birthday_date"), # One notification per birthday per local day
+        Index("ix_notification_status_next_attempt", "status", "next_attempt_at"), # Drain query: pending rows that are due
+    )
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    birthday_id: uuid.UUID = Field(sa_column=Column(ForeignKey("birthday.id", ondelete="CASCADE"), nullable=False))
+    local_date: date = Field(nullable=False) # The workspace-local day being celebrated
+    name: str = Field(nullable=False) # Snapshot of the name at enqueue time
+    status: str = Field(default="pending", nullable=False) # pending -> sending (claimed by a drain) -> sent, back to pending to retry, or dead once retries run out
+    attempts: int = Field(default=0, nullable=False)
+    last_error: Optional[str] = Field(default=None)
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    sent_at: Optional[datetime] = Field(default=None)
@@ -4,7 +4,7 @@ import uuid
 from datetime import date
 from typing import Optional
 from pydantic import EmailStr
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String, func
 from sqlmodel import SQLModel, Field, Relationship
 
 # ──────────────────────────Define user model──────────────────────────────────────────
@@ -14,7 +14,7 @@ class User(SQLModel, table=True):
     name: str = Field(default="Unknown") # Need to have a value for name 
     hashed_password: str
     date_of_birth: date = Field(nullable=False)
-    workspace_id: Optional[uuid.UUID] = Field(default=None, foreign_key="workspace.id")
+    workspace_id: Optional[uuid.UUID] = Field(default=None, foreign_key="workspace.id", index=True) # Workspace member lists. Built by migration 0002
     is_active: bool = Field(default=True)
     is_superuser: bool = Field(default=False)
     is_verified: bool = Field(default=False)
@@ -26,4 +26,7 @@ class User(SQLModel, table=True):
     # Exposes "user_id" as "id" for FastAPI Users compatibility (this took a while to figure out...)
     @property
     def id(self) -> uuid.UUID: 
-        return self.user_id
\ No newline at end of file
+        return self.user_id
+
+# Case-insensitive email lookups: fastapi-users login (get_by_email) and the bulk import's existing-email check. Built by migration 0003
+Index("ix_user_email_lower", func.lower(User.__table__.c.email))
\ No newline at end of file
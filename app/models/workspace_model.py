@@ -11,6 +11,7 @@ class Workspace(SQLModel, table=True):
     timezone: str = Field(
         default="America/New_York", # Default timezone to New York
         nullable=False,
+        index=True, # Timezone scheduler groups workspaces by timezone every tick
         description="IANA timezone name; defaults to New York"
     )
 
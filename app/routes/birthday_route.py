@@ -1,14 +1,17 @@
 # app/routes/birthday_route.py
 
-from typing import List
+from typing import List, Literal
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
-from app.core.db import get_session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.db import UnitOfWork, get_async_session, get_uow
+from app.core.pagination import PageParams, set_next_cursor
 from app.models.birthday_model import Birthday
 from app.schemas.birthday_schema import BirthdayRead, BirthdayCreate, BirthdayUpdate
 from app.services.auth_service import current_active_user, current_superuser
 from app.services import birthday_service 
+from app.services import export_service
 
 # ──────────────────────────────────Router definition──────────────────────────────────
 router = APIRouter(prefix="/birthdays", tags=["Birthdays"],) # Router prefix "/birthdays". Group these bad boys under "birthdays" in the OpenAPI docs
@@ -18,29 +21,53 @@ router = APIRouter(prefix="/birthdays", tags=["Birthdays"],) # Router prefix "/b
 @router.get("/",
     response_model=List[BirthdayRead],
     summary="List birthdays in your workspace (Auth: Any active user)",
-    description="Returns all birthdays belonging to the authenticated user's workspace."
+    description="Returns one page of the birthdays belonging to the authenticated user's workspace. Follow the X-Next-Cursor header for the next page."
 )
-def list_birthdays_by_workspace(
-    session: Session = Depends(get_session),
+async def list_birthdays_by_workspace(
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session),
     user=Depends(current_active_user),
 ):
-    return birthday_service.list_birthdays_by_workspace( # Delegate to service (which handles user-scoped caching)
+    birthdays, next_cursor = await birthday_service.list_birthdays_by_workspace( # Delegate to service (which handles user-scoped caching)
         session,
         workspace_id=user.workspace_id,
         user_id=user.user_id,
+        cursor=page.cursor,
+        limit=page.limit,
     )
+    set_next_cursor(response, next_cursor)
+    return birthdays
 
 # ──────────────────────────────────GET /birthdays/all──────────────────────────────────
 @router.get("/all",
     response_model=List[BirthdayRead], # Response models defined in birthday_schema.py
     dependencies=[Depends(current_superuser)], # Needs to be an admin!
     summary="List all birthdays across all workspaces (Auth: Admin)",
-    description="Returns every birthday in the system, regardless of workspace."
+    description="Returns one page of every birthday in the system, regardless of workspace. Follow the X-Next-Cursor header for the next page."
 )
-def list_all_birthdays(
-    session: Session = Depends(get_session),
+async def list_all_birthdays(
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    return birthday_service.list_all_birthdays(session)
+    birthdays, next_cursor = await birthday_service.list_all_birthdays(session, page.cursor, page.limit)
+    set_next_cursor(response, next_cursor)
+    return birthdays
+
+# ──────────────────────────────────GET /birthdays/export──────────────────────────────────
+@router.get("/export",
+    dependencies=[Depends(current_superuser)], # Needs to be an admin!
+    response_class=StreamingResponse,
+    summary="Stream every birthday as NDJSON or CSV (Auth: Admin)",
+    description="Streams straight from a server-side cursor, so memory stays flat and the first bytes arrive immediately."
+)
+async def export_birthdays(format: Literal["ndjson", "csv"] = "ndjson"):
+    return StreamingResponse(
+        export_service.stream_birthdays(format),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers=export_service.export_headers("birthdays", format),
+    )
 
 # ──────────────────────────────────POST /birthdays──────────────────────────────────
 @router.post("/",
@@ -49,11 +76,11 @@ def list_all_birthdays(
     dependencies=[Depends(current_superuser)],
     summary="Create a new birthday (Auth: Admin)",
 )
-def create_birthday(
+async def create_birthday(
     payload: BirthdayCreate,
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_uow),
 ):
-    return birthday_service.create_birthday(session, payload.user_id, payload) # Delegate creation to the service layer. Separation of church and state right?
+    return await uow.run_sync(birthday_service.create_birthday, Birthday.model_validate(payload)) # Delegate creation to the service layer. Separation of church and state right?
 
 # ──────────────────────────────────PATCH /birthdays/{birthday_id}──────────────────────────────────
 @router.patch("/{birthday_id}",
@@ -61,13 +88,13 @@ def create_birthday(
     summary="Update a birthday (Auth: Any active user (self))",
     description=("Modify your birthday! General users may only update their own birthdays. Admins may update any.")
 )
-def update_birthday(
+async def update_birthday(
     birthday_id: UUID,
     payload: BirthdayUpdate,
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_uow),
     user=Depends(current_active_user),
 ):
-    birthday = birthday_service.update_birthday(session, user.user_id, birthday_id, payload) # Delegate creation to the service layer
+    birthday = await uow.run_sync(birthday_service.update_birthday, user, birthday_id, payload) # Delegate creation to the service layer
     if birthday is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Birthday not found or unauthorized")
     return birthday
@@ -78,12 +105,12 @@ def update_birthday(
     summary="Delete your birthday record (Auth: any active user)",
     description=("Remove your birthday. General users may only delete their own birthdays. Admins may delete any.")
 )
-def delete_birthday(
+async def delete_birthday(
     birthday_id: UUID,
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_uow),
     user=Depends(current_active_user),
 ):
-    success = birthday_service.delete_birthday(session, user, birthday_id)
+    success = await uow.run_sync(birthday_service.delete_birthday, user, birthday_id)
     if not success:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Birthday not found or unauthorized")
     return
\ No newline at end of file
@@ -0,0 +1,16 @@
+# app/routes/metrics_route.py
+
+from fastapi import APIRouter, Response
+from app.core.metrics import render_metrics
+
+# ──────────────────────────────────Router definition──────────────────────────────────
+router = APIRouter(tags=["metrics"])
+
+# ─────────────────────────────GET /metrics──────────────────────────────
+@router.get("/metrics",
+    include_in_schema=False,
+    summary="Prometheus metrics (Auth: Public, keep it off the public ingress)",
+)
+def metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,13 +1,16 @@
 # app/route/user_route.py
 
 from uuid import UUID
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.core.db import get_session
-from app.models.user_model import User
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.db import UnitOfWork, get_async_session, get_uow
+from app.core.passwords import hash_password_async
+from app.core.pagination import PageParams, set_next_cursor
 from app.schemas.user_schema import UserRead, UserUpdate
 from app.services import user_service
+from app.services import export_service
 from app.services.auth_service import current_active_user, current_superuser
 
 # ──────────────────────────────────Router definition──────────────────────────────────
@@ -17,23 +20,44 @@ router = APIRouter(prefix="/users", tags=["users"]) # Router prefix "/users". Gr
 @router.get("/",
     response_model=List[UserRead], # Response models defined in user_schema.py
     summary="List users in your workspace (Auth: Any active user)",
-    description="Returns all users belonging to the authenticated user's workspace."
+    description="Returns one page of the users belonging to the authenticated user's workspace. Follow the X-Next-Cursor header for the next page."
 )
 
-def list_users(session: Session = Depends(get_session),
+async def list_users(response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session),
     user=Depends(current_active_user)):
-    stmt = select(User).where(User.workspace_id == user.workspace_id) # Only return users belonging to the current user’s workspace
-    return session.exec(stmt).all()
+    users, next_cursor = await user_service.list_users_by_workspace(session, user.workspace_id, page.cursor, page.limit) # Only return users belonging to the current user’s workspace
+    set_next_cursor(response, next_cursor)
+    return users
 
 # ──────────────────────────────────GET /users/all──────────────────────────────────
 @router.get("/all",
     response_model=List[UserRead],
     dependencies=[Depends(current_superuser)], # Admins only!
     summary="List all users in the database (Auth: Admin)",
-    description="Returns all users belonging to the database."
+    description="Returns one page of all users in the database. Follow the X-Next-Cursor header for the next page."
 )
-def list_users(session: Session = Depends(get_session)):
-     return user_service.list_users(session) # Calls set_cached_users_all internally. This took a while to catch
+async def list_users(response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session)):
+     users, next_cursor = await user_service.list_users(session, page.cursor, page.limit) # Calls load_users_all internally. This took a while to catch
+     set_next_cursor(response, next_cursor)
+     return users
+
+# ──────────────────────────────────GET /users/export──────────────────────────────────
+@router.get("/export",
+    dependencies=[Depends(current_superuser)], # Admins only!
+    response_class=StreamingResponse,
+    summary="Stream every user as NDJSON or CSV (Auth: Admin)",
+    description="Streams public user fields straight from a server-side cursor, so memory stays flat and the first bytes arrive immediately."
+)
+async def export_users(format: Literal["ndjson", "csv"] = "ndjson"):
+    return StreamingResponse(
+        export_service.stream_users(format),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers=export_service.export_headers("users", format),
+    )
 
 # ──────────────────────────────────PATCH /users/{user_id}──────────────────────────────────
 @router.patch("/{user_id}",
@@ -41,13 +65,14 @@ def list_users(session: Session = Depends(get_session)):
     summary="Update user information (Auth: Any active user (self) or Admin (anyone))",
     description="Update user information (self) or any user's information (admin)."
 )
-def patch_user(
+async def patch_user(
     user_id: UUID,
     payload: UserUpdate,
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_uow),
     user=Depends(current_active_user),
 ):
-    updated = user_service.update_user(session, user, user_id, payload)
+    hashed = await hash_password_async(payload.password) if payload.password else None # In the hashing pool, before the sync service runs on the loop
+    updated = await uow.run_sync(user_service.update_user, user, user_id, payload, hashed)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found or unauthorized")
     return updated
@@ -59,9 +84,9 @@ def patch_user(
     summary="Delete users from the database (Auth: Admin)",
     description="Delete user based on user_id."
 )
-def delete_user(user_id: UUID,
-     session: Session = Depends(get_session)
+async def delete_user(user_id: UUID,
+     uow: UnitOfWork = Depends(get_uow)
 ):
-    success = user_service.delete_user(session, user_id)
+    success = await uow.run_sync(user_service.delete_user, user_id)
     if not success:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
\ No newline at end of file
@@ -2,11 +2,9 @@
 
 import logging
 from fastapi import APIRouter, Depends, status
-from sqlmodel import Session
-from app.core.db import get_session
 from app.services import utils_service as svc
 from app.services.auth_service import current_superuser
-from app.schemas.utils_schema import (TimezoneList, JobResult, CountResult, CacheResult,)
+from app.schemas.utils_schema import (TimezoneList, JobStatus, CacheResult, PoolStats,)
 logger = logging.getLogger(__name__)
 
 # ──────────────────────────────────Router definition──────────────────────────────────
@@ -21,32 +19,46 @@ async def list_timezones() -> TimezoneList:
     return TimezoneList(timezones=svc.get_supported_timezones())
 
 # ──────────────────────────────POST /run-birthday-job──────────────────────────────
+# Long-running utilities return 202 with a job right away; poll GET /utils/jobs/{id} for progress and counts.
+# Triggering a job that is already queued or running returns that job instead of starting a second one.
+# The job routes are plain def: job_service talks to Redis with the blocking client, so FastAPI runs them in the threadpool.
 @router.post("/run-birthday-job",
-    response_model=JobResult,
+    response_model=JobStatus,
     dependencies=[Depends(current_superuser)],
     summary="Trigger today's birthday notifications (Auth: Admin)",
     status_code=status.HTTP_202_ACCEPTED,
 )
-async def run_birthday_job() -> JobResult:
+def run_birthday_job() -> JobStatus:
     return svc.run_birthday_job()
 
 # ──────────────────────────────POST /refresh-birthday-table──────────────────────────────
 @router.post("/refresh-birthday-table",
-    response_model=CountResult,
+    response_model=JobStatus,
     dependencies=[Depends(current_superuser)],
     summary="Sync birthdays table from current User records (Auth: Admin)",
+    status_code=status.HTTP_202_ACCEPTED,
 )
-async def refresh_birthdays(session: Session = Depends(get_session)) -> CountResult:
-    return svc.refresh_birthday_table_from_users(session)
+def refresh_birthdays() -> JobStatus:
+    return svc.start_refresh_birthday_table()
 
 # ──────────────────────────────POST /backfill-birthdays──────────────────────────────
 @router.post("/backfill-birthdays",
-    response_model=CountResult,
+    response_model=JobStatus,
     dependencies=[Depends(current_superuser)],
     summary="Insert birthdays only for users who lack one (Auth: Admin)",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def backfill_birthdays() -> JobStatus:
+    return svc.start_backfill_birthdays()
+
+# ──────────────────────────────GET /jobs/{job_id}──────────────────────────────
+@router.get("/jobs/{job_id}",
+    response_model=JobStatus,
+    dependencies=[Depends(current_superuser)],
+    summary="Status, progress, duration and counts of a background job (Auth: Admin)",
 )
-async def backfill_birthdays(session: Session = Depends(get_session)) -> CountResult:
-    return svc.backfill_birthdays(session)
+def get_job(job_id: str) -> JobStatus:
+    return svc.get_job(job_id)
 
 # ──────────────────────────────GET /cache/all: ──────────────────────────────
 @router.get("/cache/all",
@@ -55,7 +67,7 @@ async def backfill_birthdays(session: Session = Depends(get_session)) -> CountRe
     summary="Return the full cache blob: users, birthdays, workspaces (Auth: Admin)",
 )
 async def cache_all() -> CacheResult:
-    return svc.get_entire_cache()
+    return await svc.get_entire_cache()
 
 # ──────────────────────────────GET /cache/birthdays/all──────────────────────────────
 @router.get("/cache/birthdays/all",
@@ -64,7 +76,7 @@ async def cache_all() -> CacheResult:
     summary="Return cached birthdays only (Auth: Admin)",
 )
 async def cache_birthdays() -> CacheResult:
-    return svc.get_cached_birthdays()
+    return await svc.get_cached_birthdays()
 
 # ──────────────────────────────GET /cache/users/all──────────────────────────────
 @router.get("/cache/users/all",
@@ -73,7 +85,7 @@ async def cache_birthdays() -> CacheResult:
     summary="Return cached users only (Auth: Admin)",
 )
 async def cache_users() -> CacheResult:
-    return svc.get_cached_users()
+    return await svc.get_cached_users()
 
 # ──────────────────────────────GET /cache/workspaces/all──────────────────────────────
 @router.get("/cache/workspaces/all",
@@ -82,4 +94,13 @@ async def cache_users() -> CacheResult:
     summary="Return cached workspaces only (Auth: Admin)",
 )
 async def cache_workspaces() -> CacheResult:
-    return svc.get_cached_workspaces()
\ No newline at end of file
+    return await svc.get_cached_workspaces()
+
+# ──────────────────────────────GET /pool-stats──────────────────────────────
+@router.get("/pool-stats",
+    response_model=PoolStats,
+    dependencies=[Depends(current_superuser)],
+    summary="Checked-out and idle Postgres/Redis connections for this worker (Auth: Admin)",
+)
+def pool_stats() -> PoolStats:
+    return svc.get_pool_stats()
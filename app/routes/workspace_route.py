@@ -1,13 +1,17 @@
 # app/routes/workspace_route.py
 
 from __future__ import annotations
-from typing import List
+from typing import List, Literal
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlmodel import Session
-from app.core.db import get_session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.db import UnitOfWork, get_async_session, get_uow
+from app.core.pagination import PageParams, set_next_cursor
+from app.schemas.utils_schema import JobStatus
 from app.schemas.workspace_schema import WorkspaceCreate, WorkspaceRead, WorkspaceUpdate
 from app.services import workspace_service as wsvc
+from app.services import import_service
 from app.services.auth_service import current_superuser
 
 # ─────────────────────────────Define router─────────────────────────────
@@ -19,36 +23,41 @@ router = APIRouter(prefix="/workspaces", tags=["workspaces"])
     response_model=List[WorkspaceRead],
     status_code=status.HTTP_200_OK,
     summary="List all workspaces (Auth: Public)",
+    description="Returns one page of workspaces. Follow the X-Next-Cursor header for the next page.",
 )
-def list_workspaces(session: Session = Depends(get_session)) -> List[WorkspaceRead]:
-    return wsvc.list_workspaces(session)
+async def list_workspaces(response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session)) -> List[WorkspaceRead]:
+    workspaces, next_cursor = await wsvc.list_workspaces(session, page.cursor, page.limit)
+    set_next_cursor(response, next_cursor)
+    return workspaces
 
 # ──────────────────────────────POST /workspaces──────────────────────────────
 @router.post(
     "/",
     response_model=WorkspaceRead,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(current_superuser)],
     summary="Create a workspace (Auth: Admin)",
 )
-def create_workspace(
+async def create_workspace(
     payload: WorkspaceCreate,
-    session: Session = Depends(get_session),) -> WorkspaceRead:
-    return wsvc.create_workspace(session, payload)
+    uow: UnitOfWork = Depends(get_uow),
+    user=Depends(current_superuser),) -> WorkspaceRead:
+    return await uow.run_sync(wsvc.create_workspace, payload, user)
 
 # ──────────────────────────────PATCH /workspaces/{workspace_id}──────────────────────────────
 @router.patch(
     "/{workspace_id}",
     response_model=WorkspaceRead,
-    dependencies=[Depends(current_superuser)],
     summary="Update a workspace (Auth: Admin)",
 )
-def patch_workspace(
+async def patch_workspace(
     workspace_id: UUID,
     payload: WorkspaceUpdate,
-    session: Session = Depends(get_session),) -> WorkspaceRead:
+    uow: UnitOfWork = Depends(get_uow),
+    user=Depends(current_superuser),) -> WorkspaceRead:
     try:
-        return wsvc.update_workspace(session, workspace_id, payload)
+        return await uow.run_sync(wsvc.update_workspace, workspace_id, payload, user)
     except KeyError:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Workspace not found")
 
@@ -57,15 +66,36 @@ def patch_workspace(
     "/{workspace_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     response_class=Response,            
-    dependencies=[Depends(current_superuser)],
     summary="Delete a workspace (Auth: Admin)",
 )
-def delete_workspace(
+async def delete_workspace(
     workspace_id: UUID,
-    session: Session = Depends(get_session),
+    uow: UnitOfWork = Depends(get_uow),
+    user=Depends(current_superuser),
 ) -> Response: 
     try:
-        wsvc.delete_workspace(session, workspace_id)
+        await uow.run_sync(wsvc.delete_workspace, workspace_id, user)
     except KeyError:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Workspace not found")
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# ──────────────────────────────POST /workspaces/{workspace_id}/import──────────────────────────────
+@router.post(
+    "/{workspace_id}/import",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(current_superuser)],
+    summary="Bulk-import users and birthdays into a workspace (Auth: Admin)",
+    description=(
+        "Send the file as the raw UTF-8 request body, e.g. `curl --data-binary @members.csv` (anything else is a 400). "
+        "Columns/keys: email, password, date_of_birth (YYYY-MM-DD), optional name. "
+        "Returns 202 with a job; poll GET /utils/jobs/{id}. Its counts hold received, users_created, birthdays_created "
+        "and rejected. Rows that fail validation or whose email already exists (in any case) are listed in `details.errors`; the rest are imported."
+    ),
+)
+async def import_members(
+    workspace_id: UUID,
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",) -> JobStatus:
+    data = await request.body()
+    return await run_in_threadpool(import_service.start_import, workspace_id, data, format) # Workspace lookup and job queueing block, keep them off the event loop
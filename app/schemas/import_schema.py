@@ -0,0 +1,31 @@
+# app/schemas/import_schema.py
+
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, field_validator
+
+# ─────────────────────────────One row of a bulk import─────────────────────────────
+class ImportRow(BaseModel): # CSV header / NDJSON keys: email, password, date_of_birth (YYYY-MM-DD), optional name
+    email: EmailStr
+    password: str
+    date_of_birth: date
+    name: Optional[str] = None
+
+    @field_validator("email")
+    @classmethod
+    def _lower_email(cls, v: str) -> str: # Logins match emails case-insensitively, so duplicates are found the same way
+        return v.lower()
+
+# ─────────────────────────────Per-row failure─────────────────────────────
+class ImportRowError(BaseModel):
+    line: int # 1-based line in the uploaded file (CSV counts the header as line 1)
+    email: Optional[str] = None
+    error: str
+
+# ─────────────────────────────Import summary─────────────────────────────
+class ImportResult(BaseModel): # Result of the import job started by POST /workspaces/{workspace_id}/import
+    received: int
+    users_created: int
+    birthdays_created: int
+    rejected: int
+    errors: List[ImportRowError] # The first MAX_REPORTED_ERRORS rejected rows, by line
@@ -11,6 +11,12 @@ class UserRead(schemas.BaseUser[uuid.UUID]):
     workspace_id: Optional[uuid.UUID] = None
     model_config = {"from_attributes": True }
 
+# ─────────────────────────────Authenticated user, as served from the principal cache─────────────────────────────
+class UserPrincipal(UserRead): # Read-only stand-in for the User row on authenticated requests. Not a table model, so it can never be saved by accident
+    @property
+    def user_id(self) -> uuid.UUID: # Same attribute name as the User model
+        return self.id
+
 # ─────────────────────────────Pydantic create model for users─────────────────────────────
 class UserCreate(schemas.BaseUserCreate):
     date_of_birth: date
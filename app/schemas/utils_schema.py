@@ -1,16 +1,44 @@
 # /app/schemas/utils_schema.py
 
-from typing import Any, List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 class TimezoneList(BaseModel): # Used by /timezones
     timezones: List[str]
 
-class JobResult(BaseModel): # Used by /run-birthday-job
-    detail: str
-
-class CountResult(BaseModel): # Used by /refresh-birthday-table & /backfill-birthdays
+class CountResult(BaseModel): # Returned by the refresh-birthday-table & backfill-birthdays jobs
     count: int 
 
+class JobStatus(BaseModel): # Used by /run-birthday-job, /refresh-birthday-table, /backfill-birthdays, /workspaces/{id}/import and /jobs/{job_id}
+    id: str
+    name: str
+    status: str                               # queued, running, then succeeded, failed or skipped
+    done: int = 0                             # Units of work finished so far, as reported by the job
+    total: Optional[int] = None               # None while the job cannot tell how much work is left
+    counts: Dict[str, int] = {}               # The job's result, e.g. {"count": 42}
+    details: Dict[str, Any] = {}              # The rest of the job's result, e.g. an import's rejected rows
+    error: Optional[str] = None               # Why it failed, or why it was skipped
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
 class CacheResult(BaseModel): # Single cache wrapper. Used by all /cache utils
-    data: Any
\ No newline at end of file
+    data: Any
+
+class DbPoolStats(BaseModel): # One SQLAlchemy engine pool
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+
+class RedisPoolStats(BaseModel):
+    max_connections: int
+    in_use: Optional[int] = None # None when this redis-py version keeps its bookkeeping elsewhere
+    idle: Optional[int] = None
+
+class PoolStats(BaseModel): # Used by /pool-stats. Numbers are for the worker process that answered
+    database: DbPoolStats
+    async_database: DbPoolStats
+    redis: RedisPoolStats
\ No newline at end of file
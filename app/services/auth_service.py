@@ -1,38 +1,52 @@
 # app/services/auth_service.py
 
+import logging
 import uuid
-from typing import AsyncGenerator
-from fastapi import Depends, HTTPException
+from typing import Any, AsyncGenerator, Dict, Optional
+import jwt
+from fastapi import Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import FastAPIUsers
 from fastapi_users.authentication import (AuthenticationBackend, BearerTransport, JWTStrategy,)
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from fastapi_users import exceptions
 from fastapi_users.manager import BaseUserManager, UUIDIDMixin
-from fastapi_users_db_sqlmodel import SQLModelUserDatabase
-from passlib.context import CryptContext
-from sqlmodel import Session
+from fastapi_users_db_sqlmodel import SQLModelUserDatabaseAsync
+from redis.exceptions import RedisError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
-from app.core.db import engine
+from app.core.passwords import hash_password_async, password_helper, verify_and_update_async
+from app.core.db import get_async_session
 from app.models.user_model import User
 from app.models.workspace_model import Workspace
-from app.models.birthday_model import Birthday
+from app.models.birthday_model import Birthday, month_day_key
+from app.schemas.user_schema import UserPrincipal
+from app.services.birthday_service import refresh_birthday_cache
+from app.services.redis_cache_service import cache_principal, get_principal, invalidate_users_cache_all, invalidate_users_by_workspace
+logger = logging.getLogger(__name__)
 
 # ─────────────────────────────User DB Dependency─────────────────────────────
-class PatchedUserDB(SQLModelUserDatabase[User, uuid.UUID]): # Wrapper around SQLModelUserDatabase that uses the SQLModel Session
-    def __init__(self, session: Session): 
-        super().__init__(session, User) # Initialize base class with the Session and the User model
+class PatchedUserDB(SQLModelUserDatabaseAsync[User, uuid.UUID]): # Wrapper around SQLModelUserDatabaseAsync so auth lookups await instead of blocking the event loop
+    def __init__(self, session: AsyncSession): 
+        super().__init__(session, User) # Initialize base class with the AsyncSession and the User model
     async def __call__(self) -> AsyncGenerator["PatchedUserDB", None]: # Allows FastAPI to use PatchedUserDB as a dependency
         yield self
 
-def get_user_db() -> PatchedUserDB: # Dependency that yields a PatchedUserDB instance and ensures the SQLModel session is closed afterwards
-    session = Session(engine)
-    try:
-        yield PatchedUserDB(session)
-    finally:
-        session.close()
-
-# ─────────────────────────────Password Hasher─────────────────────────────
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+async def get_user_db(session: AsyncSession = Depends(get_async_session)) -> AsyncGenerator[PatchedUserDB, None]: # Yields a PatchedUserDB; get_async_session closes the session afterwards
+    yield PatchedUserDB(session)
 
 # ─────────────────────────────User Manager─────────────────────────────
+def _refresh_caches_after_register(user: User, # Blocking Redis calls, run in the threadpool by UserManager.create
+                                   birthday: Birthday) -> None:
+    try:
+        invalidate_users_cache_all()
+        invalidate_users_by_workspace(user.workspace_id)
+    except RedisError as e:
+        logger.warning("Redis error invalidating user caches after registering %s: %s", user.user_id, e)
+    refresh_birthday_cache(birthday, True, None) # Writes the birthday through, drops birthdays:all and its workspace's pages
+
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     reset_password_token_secret = settings.jwt_secret
     verification_token_secret   = settings.jwt_secret
@@ -40,41 +54,140 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     async def create(self,
                      user_create,
                      safe: bool = False,
-                    request=None) -> User:
-        data = user_create.model_dump()
+                     request: Optional[Request] = None) -> User:
+        """
+        Insert the user and their birthday in one transaction (one commit), then drop only the cached lists they join.
+        With safe=True (public registration) is_superuser/is_active/is_verified from the payload are ignored.
+        """
+        await self.validate_password(user_create.password, user_create)
+        data = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        db: AsyncSession = self.user_db.session
         workspace_id = data.get("workspace_id") 
         if workspace_id is not None: # If provided a workspace_id, ensure it exists
-            db: Session = self.user_db.session
-            if not db.get(Workspace, workspace_id):
+            if not await db.get(Workspace, workspace_id):
                 raise HTTPException(
                     status_code=400,
                     detail=f"No workspace found with id={workspace_id}"
                 ) 
-        raw_password = data.pop("password") # Hash password
-        hashed       = pwd_context.hash(raw_password)
-
-        user         = User(**data, hashed_password=hashed) # Build/save user model
-        db: Session = self.user_db.session  # Persist User
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        raw_password = data.pop("password") # Hash password in the process pool, off the event loop
+        data["hashed_password"] = await hash_password_async(raw_password)
 
+        user = User(**data) # user_id is generated client-side, so the birthday can reference it before anything is sent
         birthday = Birthday( # Create a Birthday record for the newly-registered user
-            user_id=user.id,
+            user_id=user.user_id,
             name=user.email,
-            date_of_birth=user.date_of_birth
+            date_of_birth=user.date_of_birth,
+            workspace_id=user.workspace_id,
+            month_day=month_day_key(user.date_of_birth),
         )
-        db.add(birthday)
-        db.commit()
+        try:
+            db.add(user)
+            await db.flush() # Sends the user INSERT first: a taken email fails here, and the birthday's foreign key has a row to point at
+            db.add(birthday)
+            await db.commit()
+        except IntegrityError: # The unique email index does the duplicate check, no separate lookup
+            await db.rollback()
+            raise exceptions.UserAlreadyExists()
+
+        await run_in_threadpool(_refresh_caches_after_register, user, birthday)
+        await self.on_after_register(user, request)
         return user
 
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]: # Same as the base class, but awaits the hashing pool
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            await hash_password_async(credentials.password) # Spend the same time as a real check, so unknown emails can't be timed
+            return None
+
+        verified, updated_hash = await verify_and_update_async(credentials.password, user.hashed_password)
+        if not verified:
+            return None
+        if updated_hash is not None: # BCRYPT_ROUNDS or PASSWORD_SCHEME changed since this hash was made
+            await self.user_db.update(user, {"hashed_password": updated_hash})
+        return user
+
+    async def forgot_password(self, user: User, request: Optional[Request] = None) -> None: # Same as the base class, but awaits the hashing pool
+        if not user.is_active:
+            raise exceptions.UserInactive()
+        token_data = {
+            "sub": str(user.id),
+            "password_fgpt": await hash_password_async(user.hashed_password), # Token stops working once the password changes
+            "aud": self.reset_password_token_audience,
+        }
+        token = generate_jwt(token_data, self.reset_password_token_secret, self.reset_password_token_lifetime_seconds)
+        await self.on_after_forgot_password(user, token, request)
+
+    async def reset_password(self, token: str, password: str, request: Optional[Request] = None) -> User: # Same as the base class, but awaits the hashing pool
+        try:
+            data = decode_jwt(token, self.reset_password_token_secret, [self.reset_password_token_audience])
+            user_id, password_fingerprint = data["sub"], data["password_fgpt"]
+            parsed_id = self.parse_id(user_id)
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            raise exceptions.InvalidResetPasswordToken()
+
+        user = await self.get(parsed_id)
+        valid_fingerprint, _ = await verify_and_update_async(user.hashed_password, password_fingerprint)
+        if not valid_fingerprint:
+            raise exceptions.InvalidResetPasswordToken()
+        if not user.is_active:
+            raise exceptions.UserInactive()
+
+        updated_user = await self._update(user, {"password": password})
+        await self.on_after_reset_password(user, request)
+        return updated_user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User: # Used by update() and reset_password(): hash a new password in the pool, not on the loop
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {k: v for k, v in update_dict.items() if k != "password"}
+            update_dict["hashed_password"] = await hash_password_async(password)
+        return await super()._update(user, update_dict)
+
 async def get_user_manager(user_db=Depends(get_user_db)): # Allows FastAPI to inject custom UserManager into authentication endpoints
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper) # password_helper only backs paths we don't use (OAuth); the ones above await the pool
 
 # ─────────────────────────────Auth Backend & JWT─────────────────────────────
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
+
+def _claims(user: User) -> Dict[str, Any]: # Optional principal claims: workspace and superuser
+    return {"ws": str(user.workspace_id) if user.workspace_id else None, "su": user.is_superuser}
+
+class CachedJWTStrategy(JWTStrategy[User, uuid.UUID]):
+    """
+    JWTStrategy that resolves the token's user from the principal cache (worker memory, then Redis) and only loads
+    the User row on a miss. update_user/delete_user evict the entries, so role and active-flag changes apply immediately.
+    Authenticated requests get a read-only UserPrincipal, not the User row.
+    """
+    async def read_token(self, token: Optional[str], user_manager: BaseUserManager[User, uuid.UUID]) -> Optional[UserPrincipal]:
+        if token is None:
+            return None
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user_id = user_manager.parse_id(data.get("sub"))
+        except (jwt.PyJWTError, exceptions.InvalidID):
+            return None
+
+        principal = await get_principal(user_id, token)
+        if principal is not None:
+            return principal
+        try:
+            user = await user_manager.get(user_id)
+        except exceptions.UserNotExists:
+            return None
+        if "su" in data and {k: data.get(k) for k in ("ws", "su")} != _claims(user): # Claims went stale: log in again for a fresh token
+            return None
+        return await cache_principal(user_id, token, user)
+
+    async def write_token(self, user: User) -> str:
+        data = {"sub": str(user.id), "aud": self.token_audience}
+        if settings.jwt_principal_claims:
+            data.update(_claims(user))
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=settings.jwt_secret, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=settings.jwt_secret, lifetime_seconds=3600)
 auth_backend = AuthenticationBackend(
     name="jwt",
     transport=bearer_transport,
@@ -2,61 +2,42 @@
 
 from __future__ import annotations
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from redis.exceptions import RedisError
+from app.core.db import after_commit
 from app.models.user_model import User
-from app.models.birthday_model import Birthday
-from app.services.redis_cache_service import (get_cached_birthdays_all, set_cached_birthdays_all, invalidate_birthdays_all, get_cached_birthdays_by_workspace, set_cached_birthdays_by_workspace, invalidate_birthdays_by_workspace,)
+from app.core.pagination import keyset, split_page
+from app.models.birthday_model import Birthday, month_day_key
+from app.schemas.birthday_schema import BirthdayRead, BirthdayUpdate
+from app.services.redis_cache_service import (load_birthdays_all, invalidate_birthdays_all, load_birthdays_by_workspace, invalidate_birthdays_by_workspace, cache_birthday, evict_birthday,)
 logger = logging.getLogger(__name__)
 
 
 # ─────────────────────────────List birthdays─────────────────────────────
-def list_birthdays_by_workspace(session: Session, # Return birthdays for single workspace
+async def list_birthdays_by_workspace(session: AsyncSession, # Return one keyset page of birthdays for a single workspace, plus the next cursor
                                 user_id: UUID,
-                                workspace_id: UUID) -> List[Birthday]:
-    try:
-        cached = get_cached_birthdays_by_workspace(workspace_id) # Try cache
-    except RedisError as e:
-        logger.warning("Redis GET error for birthdays by workspace %s, skipping cache: %s", workspace_id, e,)
-        cached = None
-
-    if cached is not None:
-        logger.debug("list_birthdays_by_workspace: cache hit for %s", workspace_id)
-        return [Birthday.parse_obj(d) for d in cached]
-
-    birthdays = session.exec(select(Birthday).where(Birthday.workspace_id == workspace_id)).all() # Hit database
+                                workspace_id: UUID,
+                                cursor: Optional[UUID],
+                                limit: int) -> Tuple[List[BirthdayRead], Optional[UUID]]:
+    async def load(): # Hit database, only when this caller wins the page rebuild
+        stmt = keyset(select(Birthday).where(Birthday.workspace_id == workspace_id), Birthday.id, cursor, limit)
+        return split_page((await session.exec(stmt)).all(), limit, "id")
 
-    try:
-        set_cached_birthdays_by_workspace(workspace_id, birthdays) # Populate cache
-    except RedisError as e:
-        logger.warning("Redis SET error for birthdays by workspace %s: %s", workspace_id, e)
-
-    return birthdays
+    return await load_birthdays_by_workspace(workspace_id, cursor, limit, load, BirthdayRead)
 
 # ─────────────────────────────List all birthdays──────────────────────────────
-def list_all_birthdays(session: Session) -> List[Birthday]: # Returns every birthday in the database
-    try:
-        cached = get_cached_birthdays_all() # Try cache
-    except RedisError as e:
-        logger.warning("Redis GET error for all birthdays, skipping cache: %s", e)
-        cached = None
-
-    if cached is not None:
-        logger.debug("list_birthdays: cache hit")
-        return [Birthday.parse_obj(d) for d in cached]
-
-    birthdays = session.exec(select(Birthday)).all() # Hit database
-
-    try:
-        set_cached_birthdays_all(birthdays)  # Populate cache
-    except RedisError as e:
-        logger.warning("Redis SET error for all birthdays: %s", e)
+async def list_all_birthdays(session: AsyncSession, # Returns one keyset page of every birthday in the database, plus the next cursor
+                             cursor: Optional[UUID],
+                             limit: int) -> Tuple[List[BirthdayRead], Optional[UUID]]:
+    async def load(): # Hit database, only when this caller wins the page rebuild
+        return split_page((await session.exec(keyset(select(Birthday), Birthday.id, cursor, limit))).all(), limit, "id")
 
-    return birthdays
+    return await load_birthdays_all(cursor, limit, load, BirthdayRead)
 
 # ─────────────────────────────Get birthday─────────────────────────────
 def get_birthday(session: Session, # Fetch a single Birthday by ID directly from the DB (no cache)
@@ -69,18 +50,13 @@ def get_birthday(session: Session, # Fetch a single Birthday by ID directly from
 # ─────────────────────────────Create birthday─────────────────────────────
 def create_birthday(session: Session, # Create a new birthday
                     birthday: Birthday) -> Birthday:
+    birthday.month_day = month_day_key(birthday.date_of_birth) # Keep the indexed month-day key in sync
     session.add(birthday)
     try:
         session.commit()
         session.refresh(birthday)
         logger.info("Created birthday %s", birthday.id)
-
-        try:
-            invalidate_birthdays_all() # Invalidate both caches
-            if birthday.workspace_id:
-                invalidate_birthdays_by_workspace(birthday.workspace_id)
-        except RedisError as e:
-            logger.warning("Redis invalidate error after create_birthday: %s", e)
+        after_commit(session, refresh_birthday_cache, birthday, True, None) # Write through, then drop the list pages it now belongs to
 
         return birthday
 
@@ -90,27 +66,28 @@ def create_birthday(session: Session, # Create a new birthday
         raise HTTPException(status.HTTP_400_BAD_REQUEST,"Could not create birthday (invalid data or conflict)",)
 
 # ─────────────────────────────Update birthdays─────────────────────────────
-def update_birthday(session: Session, # Update an existing birthday
+def _can_edit(current_user: User, birthday: Birthday) -> bool: # Admins edit any birthday, users only their own
+    return current_user.is_superuser or birthday.user_id == current_user.user_id
+
+def update_birthday(session: Session, # Update an existing birthday. None when it does not exist or is not the caller's
+                    current_user: User,
                     birthday_id: UUID,
-                    data: dict) -> Birthday:
+                    payload: BirthdayUpdate) -> Optional[Birthday]:
     birthday = session.get(Birthday, birthday_id)
-    if not birthday:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Birthday not found")
+    if not birthday or not _can_edit(current_user, birthday):
+        return None
 
-    for field, value in data.items():
+    old_workspace_id = birthday.workspace_id
+
+    for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(birthday, field, value)
+    birthday.month_day = month_day_key(birthday.date_of_birth)
 
     try:
         session.commit()
         session.refresh(birthday)
         logger.info("Updated birthday %s", birthday.id)
-
-        try:
-            invalidate_birthdays_all()
-            if birthday.workspace_id:
-                invalidate_birthdays_by_workspace(birthday.workspace_id)
-        except RedisError as e:
-            logger.warning("Redis invalidate error after update_birthday: %s", e)
+        after_commit(session, refresh_birthday_cache, birthday, False, old_workspace_id) # Update in place. Pages only hold ids, so they stay valid
 
         return birthday
 
@@ -120,11 +97,12 @@ def update_birthday(session: Session, # Update an existing birthday
         raise HTTPException(status.HTTP_400_BAD_REQUEST,"Could not update birthday (invalid data or conflict)",)
 
 # ─────────────────────────────Delete birthdays─────────────────────────────
-def delete_birthday(session: Session, # Delete a birthday
-                    birthday_id: UUID) -> None:
+def delete_birthday(session: Session, # Delete a birthday. False when it does not exist or is not the caller's
+                    current_user: User,
+                    birthday_id: UUID) -> bool:
     birthday = session.get(Birthday, birthday_id)
-    if not birthday:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Birthday not found")
+    if not birthday or not _can_edit(current_user, birthday):
+        return False
 
     workspace_id = birthday.workspace_id
 
@@ -132,13 +110,8 @@ def delete_birthday(session: Session, # Delete a birthday
         session.delete(birthday)
         session.commit()
         logger.info("Deleted birthday %s", birthday_id)
-
-        try:
-            invalidate_birthdays_all()
-            if workspace_id:
-                invalidate_birthdays_by_workspace(workspace_id)
-        except RedisError as e:
-            logger.warning("Redis invalidate error after delete_birthday: %s", e)
+        after_commit(session, _forget_birthday, birthday_id, workspace_id)
+        return True
 
     except IntegrityError:
         session.rollback()
@@ -149,11 +122,14 @@ def delete_birthday(session: Session, # Delete a birthday
 def sync_birthday_from_user(session: Session, # Ensure Birthday table mirrors the User record
                             user: User) -> None:
     birthday = session.exec(select(Birthday).where(Birthday.user_id == user.user_id)).first()
+    created = birthday is None
+    old_workspace_id = None if created else birthday.workspace_id
 
     if birthday:
         birthday.name = user.email
         birthday.date_of_birth = user.date_of_birth
         birthday.workspace_id = user.workspace_id
+        birthday.month_day = month_day_key(user.date_of_birth)
         logger.info("Updating birthday for user_id=%s", user.user_id)
     else:
         birthday = Birthday(
@@ -161,24 +137,44 @@ def sync_birthday_from_user(session: Session, # Ensure Birthday table mirrors th
             name=user.email,
             date_of_birth=user.date_of_birth,
             workspace_id=user.workspace_id,
+            month_day=month_day_key(user.date_of_birth),
         )
         session.add(birthday)
         logger.info("Creating birthday for user_id=%s", user.user_id)
 
     try:
         session.commit()
+        session.refresh(birthday)
     except Exception:
         session.rollback()
         logger.error("Failed to sync birthday for user_id=%s", user.user_id, exc_info=True)
         raise
 
+    after_commit(session, refresh_birthday_cache, birthday, created, old_workspace_id)
+
+# ─────────────────────────────Refresh cache after a write─────────────────────────────
+def _invalidate_workspaces(*workspace_ids: Optional[UUID]) -> None: # Drop the per-workspace pages of every non-null id given
+    for ws_id in {w for w in workspace_ids if w}:
+        invalidate_birthdays_by_workspace(ws_id)
+
+def refresh_birthday_cache(birthday: Birthday, # Write the birthday through and drop only the list pages whose membership changed
+                           created: bool,
+                           old_workspace_id: Optional[UUID]) -> None:
     try:
-        invalidate_birthdays_all() # Invalidate caches so next list_all_birthdays calls repopulate
+        cache_birthday(birthday)
+        if created:
+            invalidate_birthdays_all()
+            _invalidate_workspaces(birthday.workspace_id)
+        elif birthday.workspace_id != old_workspace_id: # Moved workspace: both workspace lists change membership
+            _invalidate_workspaces(old_workspace_id, birthday.workspace_id)
     except RedisError as e:
-        logger.warning("Redis DELETE error invalidating all-birthdays cache: %s", e)
+        logger.warning("Redis error refreshing cache for birthday %s: %s", birthday.id, e)
 
-    if user.workspace_id:
-        try:
-            invalidate_birthdays_by_workspace(user.workspace_id)  #Only invalidate the per-workspace cache if the user has one
-        except RedisError as e:
-            logger.warning("Redis DELETE error invalidating birthdays-by-workspace cache for %s: %s",user.workspace_id,e,)
\ No newline at end of file
+def _forget_birthday(birthday_id: UUID, # Drop a deleted birthday's record and the list pages it was on
+                     workspace_id: Optional[UUID]) -> None:
+    try:
+        evict_birthday(birthday_id)
+        invalidate_birthdays_all()
+        _invalidate_workspaces(workspace_id)
+    except RedisError as e:
+        logger.warning("Redis invalidate error after delete_birthday: %s", e)
\ No newline at end of file
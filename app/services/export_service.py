@@ -0,0 +1,61 @@
+# app/services/export_service.py
+
+from __future__ import annotations
+import csv
+import io
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Sequence
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.db import async_engine
+from app.models.birthday_model import Birthday
+from app.models.user_model import User
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000 # Rows fetched from the server-side cursor and written per chunk
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Columns exported per entity. Users are projected onto their public fields so hashed_password never leaves the DB
+_BIRTHDAY_COLUMNS = [Birthday.id, Birthday.user_id, Birthday.name, Birthday.date_of_birth, Birthday.workspace_id, Birthday.created_at]
+_USER_COLUMNS = [User.user_id, User.email, User.name, User.date_of_birth, User.workspace_id, User.is_active, User.is_superuser, User.is_verified]
+
+# ─────────────────────────────Chunk renderers─────────────────────────────
+def _render_ndjson(fields: List[str], rows: Sequence[Any]) -> str:
+    return "".join(json.dumps(dict(zip(fields, row)), default=str) + "\n" for row in rows)
+
+def _render_csv(fields: List[str], rows: Sequence[Any], header: bool = False) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(fields)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+# ─────────────────────────────Stream rows─────────────────────────────
+async def _stream(name: str, columns: List[Any], key_column: Any, fmt: str) -> AsyncIterator[str]:
+    """
+    Yield the export chunk by chunk from a server-side cursor, so memory stays flat whatever the table size.
+    The generator owns its session because a StreamingResponse outlives request dependencies.
+    """
+    fields = [c.key for c in columns]
+    if fmt == "csv":
+        yield _render_csv(fields, [], header=True) # Header goes out before the first query returns
+    exported = 0
+    async with AsyncSession(async_engine) as session:
+        stmt = select(*columns).order_by(key_column).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        result = await session.stream(stmt)
+        async for rows in result.partitions(EXPORT_BATCH_SIZE):
+            exported += len(rows)
+            yield _render_csv(fields, rows) if fmt == "csv" else _render_ndjson(fields, rows)
+    logger.info("Exported %d %s as %s", exported, name, fmt)
+
+def stream_birthdays(fmt: str) -> AsyncIterator[str]:
+    return _stream("birthdays", _BIRTHDAY_COLUMNS, Birthday.id, fmt)
+
+def stream_users(fmt: str) -> AsyncIterator[str]:
+    return _stream("users", _USER_COLUMNS, User.user_id, fmt)
+
+def export_headers(name: str, fmt: str) -> Dict[str, str]: # Download filename for the browser / HR tooling
+    return {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
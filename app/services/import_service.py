@@ -0,0 +1,208 @@
+# app/services/import_service.py
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session, select
+from redis.exceptions import RedisError
+from app.core.db import engine
+from app.core.passwords import hash_passwords
+from app.models.birthday_model import Birthday, month_day_key
+from app.models.user_model import User
+from app.models.workspace_model import Workspace
+from app.schemas.import_schema import ImportResult, ImportRow, ImportRowError
+from app.schemas.utils_schema import JobStatus
+from app.services import job_service
+from app.services.redis_cache_service import (invalidate_birthdays_all, invalidate_birthdays_by_workspace, invalidate_users_cache_all, invalidate_users_by_workspace,)
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 1000 # Rows per INSERT ... ON CONFLICT statement (9 params per user, well under Postgres' 65535 limit)
+MAX_REPORTED_ERRORS = 1000 # Rejected rows listed in the job result; `rejected` counts them all
+
+# ─────────────────────────────Parse upload─────────────────────────────
+def _decode(data: bytes) -> str:
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Upload must be UTF-8 encoded (invalid byte at offset {e.start})")
+
+def _read_rows(data: bytes, fmt: str) -> Iterator[Tuple[int, object]]: # (line number, raw record or None when the line is not parseable)
+    text = _decode(data)
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, None
+
+def parse_rows(data: bytes, fmt: str) -> Tuple[List[Tuple[int, ImportRow]], List[ImportRowError]]: # Valid rows (emails lowercased) and per-row errors; the first occurrence of an email wins
+    rows: List[Tuple[int, ImportRow]] = []
+    errors: List[ImportRowError] = []
+    seen: Dict[str, int] = {}
+    for line, record in _read_rows(data, fmt):
+        if not isinstance(record, dict):
+            errors.append(ImportRowError(line=line, error="Not a JSON object"))
+            continue
+        try:
+            row = ImportRow.model_validate(record)
+        except ValidationError as e:
+            err = e.errors()[0]
+            errors.append(ImportRowError(line=line, email=record.get("email"), error=f"{'.'.join(map(str, err['loc']))}: {err['msg']}"))
+            continue
+        if row.email in seen:
+            errors.append(ImportRowError(line=line, email=row.email, error=f"Duplicate of line {seen[row.email]}"))
+            continue
+        seen[row.email] = line
+        rows.append((line, row))
+    return rows, errors
+
+# ─────────────────────────────Insert one batch─────────────────────────────
+def _insert_batch(session: Session, # Returns (users created, birthdays created, row errors). Existing emails are reported, not overwritten
+                  workspace_id: UUID,
+                  batch: List[Tuple[int, ImportRow]],
+                  hashes: List[str]) -> Tuple[int, int, List[ImportRowError]]:
+    users = [
+        {
+            "user_id": uuid.uuid4(),
+            "email": row.email,
+            "name": row.name or "Unknown",
+            "hashed_password": hashed,
+            "date_of_birth": row.date_of_birth,
+            "workspace_id": workspace_id,
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": False,
+        }
+        for (_, row), hashed in zip(batch, hashes)
+    ]
+    created = session.exec(
+        insert(User).values(users).on_conflict_do_nothing(index_elements=["email"]).returning(User.user_id)
+    ).scalars().all()
+    created_ids = set(created)
+    errors = [
+        ImportRowError(line=line, email=row.email, error="A user with this email already exists")
+        for (line, row), user in zip(batch, users) if user["user_id"] not in created_ids
+    ]
+
+    now = datetime.now(timezone.utc)
+    birthdays = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user["user_id"],
+            "name": user["email"],
+            "date_of_birth": user["date_of_birth"],
+            "workspace_id": workspace_id,
+            "month_day": month_day_key(user["date_of_birth"]),
+            "created_at": now,
+        }
+        for user in users if user["user_id"] in created_ids
+    ]
+    added = 0
+    if birthdays:
+        added = session.exec(insert(Birthday).values(birthdays).on_conflict_do_nothing(constraint="uq_birthday_user")).rowcount
+    session.commit()
+    return len(created_ids), added, errors
+
+# ─────────────────────────────Import one batch─────────────────────────────
+def _import_batch(session: Session, # Skip emails already taken, hash the rest, insert. A failing batch is retried row by row
+                  workspace_id: UUID,
+                  batch: List[Tuple[int, ImportRow]]) -> Tuple[int, int, List[ImportRowError]]:
+    taken = session.exec(select(User.email).where(func.lower(User.email).in_([row.email for _, row in batch]))).all() # Served by ix_user_email_lower
+    existing = {email.lower() for email in taken} # Registered users keep the case they signed up with
+    errors = [ImportRowError(line=line, email=row.email, error="A user with this email already exists") for line, row in batch if row.email in existing]
+    batch = [(line, row) for line, row in batch if row.email not in existing]
+    if not batch:
+        return 0, 0, errors
+    hashes = hash_passwords([row.password for _, row in batch]) # Spread over the shared hashing pool
+
+    try:
+        users, birthdays, batch_errors = _insert_batch(session, workspace_id, batch, hashes)
+        return users, birthdays, errors + batch_errors
+    except DBAPIError:
+        session.rollback()
+        logger.exception("Import batch of %d rows failed, retrying row by row", len(batch))
+
+    users = birthdays = 0
+    for (line, row), hashed in zip(batch, hashes):
+        try:
+            row_users, row_birthdays, row_errors = _insert_batch(session, workspace_id, [(line, row)], [hashed])
+        except DBAPIError as e:
+            session.rollback()
+            errors.append(ImportRowError(line=line, email=row.email, error=f"Insert failed: {e.orig}"))
+            continue
+        users += row_users
+        birthdays += row_birthdays
+        errors.extend(row_errors)
+    return users, birthdays, errors
+
+# ─────────────────────────────Import members into a workspace─────────────────────────────
+def import_members(workspace_id: UUID, data: bytes, fmt: str) -> ImportResult:
+    """
+    Bulk-create users and their birthdays in one workspace from a CSV or NDJSON upload.
+    Bad rows are reported in `errors` and skipped; the rest of the file still imports. Caches are invalidated once at the end.
+    Progress is rows processed out of the valid rows, when run as a job.
+    """
+    with Session(engine) as session:
+        if not session.get(Workspace, workspace_id):
+            raise HTTPException(status.HTTP_404_NOT_FOUND, f"Workspace with id={workspace_id} not found")
+
+        rows, errors = parse_rows(data, fmt)
+        received = len(rows) + len(errors)
+        job_service.report_progress(0, len(rows))
+
+        users_created = birthdays_created = 0
+        for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+            users, birthdays, batch_errors = _import_batch(session, workspace_id, rows[start:start + IMPORT_BATCH_SIZE])
+            users_created += users
+            birthdays_created += birthdays
+            errors.extend(batch_errors)
+            job_service.report_progress(min(start + IMPORT_BATCH_SIZE, len(rows)), len(rows))
+
+    if users_created:
+        try:
+            invalidate_users_cache_all()
+            invalidate_users_by_workspace(workspace_id)
+            invalidate_birthdays_all()
+            invalidate_birthdays_by_workspace(workspace_id)
+        except RedisError as e:
+            logger.warning("Redis invalidate error after import into %s: %s", workspace_id, e)
+
+    logger.info("Imported %d users and %d birthdays into workspace %s (%d rows rejected)", users_created, birthdays_created, workspace_id, len(errors))
+    return ImportResult(
+        received=received,
+        users_created=users_created,
+        birthdays_created=birthdays_created,
+        rejected=len(errors),
+        errors=sorted(errors, key=lambda e: e.line)[:MAX_REPORTED_ERRORS],
+    )
+
+# ─────────────────────────────Start an import job─────────────────────────────
+def start_import(workspace_id: UUID, data: bytes, fmt: str) -> JobStatus:
+    """
+    Reject undecodable files and unknown workspaces up front, then run import_members on the job pool: hashing a large
+    file's passwords takes minutes, too long to hold the request. Sending the same file again while it is still
+    importing returns that job instead of importing it twice.
+    """
+    _decode(data)
+    with Session(engine) as session:
+        if not session.get(Workspace, workspace_id):
+            raise HTTPException(status.HTTP_404_NOT_FOUND, f"Workspace with id={workspace_id} not found")
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    return job_service.submit(f"import-members:{workspace_id}:{digest}", lambda: import_members(workspace_id, data, fmt))
@@ -0,0 +1,155 @@
+# app/services/job_service.py
+
+from __future__ import annotations
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from redis import RedisError
+from app.core.config import settings
+from app.core.db import redis
+from app.schemas.utils_schema import JobStatus
+from app.services.lock_service import RedisLock
+logger = logging.getLogger(__name__)
+
+# Job state lives in a Redis hash, so whichever worker answers GET /utils/jobs/{id} sees it, not just the one running it
+_JOB_KEY = lambda job_id: f"job:{job_id}"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_current = threading.local() # The job the calling worker thread is running, for report_progress()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.job_max_workers, thread_name_prefix="job")
+    return _executor
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _write(job_id: str, **fields: Any) -> None:
+    key = _JOB_KEY(job_id)
+    pipe = redis.pipeline()
+    pipe.hset(key, mapping={k: "" if v is None else str(v) for k, v in fields.items()})
+    pipe.expire(key, settings.job_ttl)
+    pipe.execute()
+
+def _to_status(job_id: str, fields: Dict[str, str]) -> JobStatus:
+    return JobStatus(
+        id=job_id,
+        name=fields["name"],
+        status=fields["status"],
+        done=int(fields.get("done") or 0),
+        total=int(fields["total"]) if fields.get("total") else None,
+        counts=json.loads(fields.get("counts") or "{}"),
+        details=json.loads(fields.get("details") or "{}"),
+        error=fields.get("error") or None,
+        created_at=fields["created_at"],
+        started_at=fields.get("started_at") or None,
+        finished_at=fields.get("finished_at") or None,
+        duration_seconds=float(fields["duration_seconds"]) if fields.get("duration_seconds") else None,
+    )
+
+def _counts(result: Any) -> Dict[str, int]: # Jobs return a CountResult-style model, a dict of counts, or nothing
+    if isinstance(result, BaseModel):
+        result = result.model_dump()
+    return {k: v for k, v in (result or {}).items() if isinstance(v, int)}
+
+def _details(result: Any) -> Dict[str, Any]: # Whatever else a model result carries, e.g. an import's rejected rows
+    if not isinstance(result, BaseModel):
+        return {}
+    return {k: v for k, v in result.model_dump(mode="json").items() if not isinstance(v, int)}
+
+class JobSkipped(Exception): # Raised by a job that had nothing to do because another run got there first; recorded as "skipped"
+    pass
+
+# ─────────────────────────────Progress from inside a job─────────────────────────────
+def report_progress(done: int, total: Optional[int] = None) -> None: # No-op outside a job, so shared code (e.g. drain_outbox) can call it freely
+    job_id = getattr(_current, "job_id", None)
+    if job_id is None:
+        return
+    try:
+        _write(job_id, done=done, total=total)
+    except RedisError as e:
+        logger.warning("Redis error reporting progress for job %s: %s", job_id, e)
+
+# ─────────────────────────────Run one job─────────────────────────────
+def _run(job_id: str, name: str, fn: Callable[[], Any], lock: RedisLock) -> None:
+    started = time.perf_counter()
+    _current.job_id = job_id
+    try:
+        _write(job_id, status="running", started_at=_now())
+        result = fn()
+        _write(job_id, status="succeeded", counts=json.dumps(_counts(result)), details=json.dumps(_details(result)),
+               finished_at=_now(), duration_seconds=round(time.perf_counter() - started, 3))
+        logger.info("Job %s (%s) finished in %.2fs", job_id, name, time.perf_counter() - started)
+    except JobSkipped as e:
+        logger.info("Job %s (%s) skipped: %s", job_id, name, e)
+        try:
+            _write(job_id, status="skipped", error=str(e),
+                   finished_at=_now(), duration_seconds=round(time.perf_counter() - started, 3))
+        except RedisError:
+            logger.warning("Redis error recording skip of job %s", job_id)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job_id, name)
+        try:
+            _write(job_id, status="failed", error=f"{type(e).__name__}: {e}",
+                   finished_at=_now(), duration_seconds=round(time.perf_counter() - started, 3))
+        except RedisError:
+            logger.warning("Redis error recording failure of job %s", job_id)
+    finally:
+        _current.job_id = None
+        lock.release() # Lets the next trigger start a fresh run
+
+# ─────────────────────────────Submit a job─────────────────────────────
+def submit(name: str, fn: Callable[[], Any]) -> JobStatus:
+    """
+    Queue `fn` on the job pool and return its status right away.
+    Only one run per name at a time across all replicas: while one is queued or running, triggering it again
+    returns the existing job instead of starting another.
+    """
+    job_id = uuid.uuid4().hex
+    lock = RedisLock(f"job:{name}", token=job_id) # Held for the whole run; its value is the id of the run holding it
+    try:
+        for _ in range(2): # Second pass only if the other run finished between our SET NX and GET
+            if lock.acquire():
+                break
+            running_id = redis.get(lock.key)
+            if running_id and redis.exists(_JOB_KEY(running_id)):
+                logger.info("Job %s already running as %s, not starting another", name, running_id)
+                return get_job(running_id)
+        else:
+            raise HTTPException(status.HTTP_409_CONFLICT, f"Job {name} is already starting, try again shortly")
+    except RedisError as e:
+        logger.error("Redis error queueing job %s: %s", name, e)
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Job queue unavailable, try again later")
+
+    try:
+        _write(job_id, name=name, status="queued", done=0, created_at=_now())
+    except RedisError as e:
+        lock.release()
+        logger.error("Redis error queueing job %s: %s", name, e)
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Job queue unavailable, try again later")
+
+    _get_executor().submit(_run, job_id, name, fn, lock)
+    logger.info("Queued job %s (%s)", job_id, name)
+    return get_job(job_id)
+
+# ─────────────────────────────Poll a job─────────────────────────────
+def get_job(job_id: str) -> JobStatus:
+    try:
+        fields = redis.hgetall(_JOB_KEY(job_id))
+    except RedisError as e:
+        logger.error("Redis error reading job %s: %s", job_id, e)
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Job queue unavailable, try again later")
+    if not fields:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, f"Job with id={job_id} not found (unknown or expired)")
+    return _to_status(job_id, fields)
@@ -0,0 +1,127 @@
+# app/services/lock_service.py
+
+from __future__ import annotations
+import functools
+import logging
+import threading
+import uuid
+from typing import Callable, Optional
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+from app.core.config import settings
+from app.core.db import async_cache_redis, redis
+logger = logging.getLogger(__name__)
+
+# Only touch the key if we still own it (compare token, then act)
+_REFRESH_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# ─────────────────────────────Distributed lock─────────────────────────────
+class RedisLock:
+    """
+    SET NX lock with a TTL and a heartbeat thread that keeps extending it while the holder is alive.
+    If the holder dies the key simply expires and the next replica to try wins.
+    Pass `client` to run against another Redis (e.g. fakeredis.FakeRedis() in tests), and `token` to store something
+    other callers can read back while the lock is held (the job service stores the running job's id).
+    """
+    def __init__(self, name: str, ttl: Optional[int] = None, client: Optional[Redis] = None, token: Optional[str] = None):
+        self.client = client if client is not None else redis
+        self.key = f"lock:{name}"
+        self.ttl = ttl or settings.scheduler_lock_ttl
+        self.token = token or uuid.uuid4().hex # Identifies this holder, so we never extend/delete someone else's lock
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def acquire(self) -> bool:
+        if not self.client.set(self.key, self.token, nx=True, ex=self.ttl):
+            return False
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._beat, name=f"heartbeat-{self.key}", daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def refresh(self) -> bool: # Push the expiry out by another TTL, False if the lock was lost
+        return bool(self.client.eval(_REFRESH_SCRIPT, 1, self.key, self.token, self.ttl * 1000))
+
+    def release(self, keep: bool = False) -> None: # keep=True stops the heartbeat but leaves the key to expire on its own
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.join(timeout=1)
+        if keep:
+            return
+        try:
+            self.client.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+        except RedisError as e:
+            logger.warning("Redis error releasing %s (will expire in %ds): %s", self.key, self.ttl, e)
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                if not self.refresh():
+                    logger.error("Lost %s while still running, another replica may take over", self.key)
+                    return
+            except RedisError as e:
+                logger.warning("Redis error refreshing %s: %s", self.key, e)
+
+# ─────────────────────────────Short lock for coroutines─────────────────────────────
+class AsyncRedisLock:
+    """
+    Plain SET NX EX lock for short critical sections on the event loop (e.g. one cache page rebuild).
+    No heartbeat: the holder is expected to finish well within `ttl`, after which the key expires on its own.
+    """
+    def __init__(self, name: str, ttl: int, client: Optional[AsyncRedis] = None):
+        self.client = client if client is not None else async_cache_redis
+        self.key = f"lock:{name}"
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+
+    async def acquire(self) -> bool:
+        return bool(await self.client.set(self.key, self.token, nx=True, ex=self.ttl))
+
+    async def release(self) -> None:
+        try:
+            await self.client.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+        except RedisError as e:
+            logger.warning("Redis error releasing %s (will expire in %ds): %s", self.key, self.ttl, e)
+
+# ─────────────────────────────Single-replica job decorator─────────────────────────────
+SKIPPED = object() # What an @exclusive job returns on the replicas that did not get the lock
+
+def exclusive(name: str, tick: Optional[Callable[..., str]] = None, ttl: Optional[int] = None,
+              client: Optional[Redis] = None) -> Callable:
+    """
+    Run the wrapped job only on the replica that wins the lock; the others log and return SKIPPED.
+    With `tick` (called with the job's arguments, e.g. the date or the 15-minute slot being run) the lock is per tick,
+    and it is left to expire after the job rather than deleted, so a replica whose scheduler fires late for the same
+    tick still skips instead of running the job a second time.
+    If Redis is unreachable the job runs anyway: the notification outbox already makes reruns idempotent,
+    so a duplicate run is cheaper than a missed day.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            lock = RedisLock(f"{name}:{tick(*args, **kwargs)}" if tick else name, ttl, client)
+            try:
+                acquired = lock.acquire()
+            except RedisError as e:
+                logger.warning("Redis error acquiring %s, running %s without the lock: %s", lock.key, fn.__name__, e)
+                return fn(*args, **kwargs)
+            if not acquired:
+                logger.info("Skipping %s: another replica holds %s", fn.__name__, lock.key)
+                return SKIPPED
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                lock.release(keep=tick is not None)
+        return wrapper
+    return decorator
@@ -0,0 +1,122 @@
+# app/services/outbox_service.py
+
+import logging
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.core.db import engine
+from app.models.birthday_model import Birthday
+from app.models.notification_model import BirthdayNotification
+from app.models.workspace_model import Workspace
+from app.services.job_service import report_progress
+from app.services.slack_delivery_service import SlackMessage, deliver
+from app.services.slack_service import render_birthday_messages
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = 500                 # Outbox rows claimed per pass
+RETRY_BACKOFF = timedelta(minutes=5)   # Doubled after every failed attempt
+CLAIM_LEASE = timedelta(minutes=10)    # A claimed row whose drain died mid-send is picked up again after this
+
+# ─────────────────────────────Enqueue notifications─────────────────────────────
+def enqueue_notifications(session: Session, # Record one pending notification per birthday for local_date. Returns rows actually added
+                          birthdays: Sequence[Birthday],
+                          local_date: date) -> int:
+    if not birthdays:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "birthday_id": b.id,
+            "local_date": local_date,
+            "name": b.name,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+        for b in birthdays
+    ]
+    stmt = insert(BirthdayNotification).values(rows).on_conflict_do_nothing(constraint="uq_notification_birthday_date") # Reruns are no-ops
+    added = session.exec(stmt).rowcount
+    session.commit()
+    logger.info("Enqueued %d of %d birthday notifications for %s", added, len(birthdays), local_date)
+    return added
+
+# ─────────────────────────────Record a failed attempt─────────────────────────────
+def _record_failure(n: BirthdayNotification, error: str, now: datetime) -> None: # Back off exponentially, dead-letter after max attempts
+    n.attempts += 1
+    n.last_error = error
+    if n.attempts >= settings.outbox_max_attempts:
+        n.status = "dead"
+        logger.error("Dead-lettered birthday notification %s for %s after %d attempts: %s", n.id, n.name, n.attempts, error)
+    else:
+        n.status = "pending"
+        n.next_attempt_at = now + RETRY_BACKOFF * (2 ** (n.attempts - 1))
+
+# ─────────────────────────────Drain outbox─────────────────────────────
+def drain_outbox(now: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Send every due notification, one batched Slack message per workspace and day.
+    Each batch is claimed first (FOR UPDATE SKIP LOCKED, marked "sending" with a lease, committed), so no row lock is held
+    during the Slack posts and concurrent drains never pick the same rows. Returns (sent, failed).
+    """
+    now = now or datetime.now(timezone.utc)
+    sent = failed = 0
+    with Session(engine, expire_on_commit=False) as session: # Claimed rows stay usable after the claim commit
+        while True:
+            rows = session.exec(
+                select(BirthdayNotification, Birthday.workspace_id, Workspace.slack_webhook)
+                .join(Birthday, BirthdayNotification.birthday_id == Birthday.id)
+                .outerjoin(Workspace, Birthday.workspace_id == Workspace.id)
+                .where(BirthdayNotification.status.in_(("pending", "sending"))) # "sending" and due: a lease that ran out
+                .where(BirthdayNotification.next_attempt_at <= now)
+                .order_by(BirthdayNotification.created_at)
+                .limit(DRAIN_BATCH_SIZE)
+                .with_for_update(skip_locked=True, of=BirthdayNotification)
+            ).all()
+            if not rows:
+                break
+
+            groups: Dict[Tuple, List[BirthdayNotification]] = defaultdict(list)
+            for n, workspace_id, webhook_url in rows:
+                if not webhook_url:
+                    _record_failure(n, "No webhook configured", now)
+                    failed += 1
+                    continue
+                n.status = "sending"
+                n.next_attempt_at = now + CLAIM_LEASE
+                groups[(workspace_id, webhook_url, n.local_date)].append(n)
+            session.commit() # Claim the batch and release the row locks before any HTTP call
+
+            messages = []
+            for (workspace_id, webhook_url, _), group in groups.items():
+                offset = 0
+                for rendered in render_birthday_messages([n.name for n in group]): # Chunks keep input order, slice the rows to match
+                    chunk = group[offset:offset + rendered.count]
+                    offset += rendered.count
+                    messages.append(SlackMessage(webhook_url=webhook_url, text=rendered.text, blocks=rendered.blocks, key=chunk))
+
+            report = deliver(messages)
+            for msg in report.succeeded:
+                for n in msg.key:
+                    n.attempts += 1
+                    n.status = "sent"
+                    n.sent_at = now
+                sent += len(msg.key)
+            for msg in report.failed:
+                for n in msg.key:
+                    _record_failure(n, "Slack post failed", now)
+                failed += len(msg.key)
+
+            session.commit() # Persist outcomes
+            report_progress(sent + failed) # Shows up on GET /utils/jobs/{id} when run as a job
+            if len(rows) < DRAIN_BATCH_SIZE:
+                break
+
+    logger.info("Outbox drained: %d sent, %d failed", sent, failed)
+    return sent, failed
@@ -1,117 +1,532 @@
 # app/services/redis_cache_service.py
 
 from __future__ import annotations
-import json
+import asyncio
+import functools
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional, Sequence
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
-from redis import Redis, RedisError
-from app.core.db import redis
+from pydantic import TypeAdapter, ValidationError
+from redis import RedisError
+from app.core.codecs import PayloadCodec
+from app.core.config import settings
+from app.core.db import async_cache_redis, cache_redis, redis
+from app.core.metrics import CACHE_CODEC_SECONDS, CACHE_ERRORS, CACHE_HITS, CACHE_MISSES, CACHE_PAYLOAD_BYTES
+from app.core.pagination import cursor_from_cache
+from app.schemas.user_schema import UserPrincipal, UserRead
+from app.services.lock_service import AsyncRedisLock
 logger = logging.getLogger(__name__)
 
 CACHE_TTL = 300  # Cache time - 5 minutes
+STALE_TTL = 60            # Pages are kept this long past their TTL so callers can be served a stale copy during a rebuild
+TTL_JITTER = 0.1          # +/-10% on every page TTL so pages cached together don't expire together
+EARLY_REFRESH_BETA = 1.0  # Probabilistic early refresh (XFetch). Higher refreshes earlier
+REBUILD_LOCK_TTL = 10     # Seconds one caller may spend rebuilding a page
+REBUILD_WAIT = 2.0        # How long a caller with no stale copy waits on someone else's rebuild before querying itself
+REBUILD_POLL = 0.05
+INVALIDATION_CHANNEL = "cache:invalidate" # Pub/sub channel telling every worker which in-memory pages to drop
+
+Loader = Callable[[], Awaitable[Tuple[List[Any], Optional[UUID]]]] # Runs the DB query for one page: (items, next_cursor)
 ###──────────────────────────────────────────────────────────Key Templates──────────────────────────────────────────────────────────###
 _BIRTHDAYS_ALL = "birthdays:all"
 _BIRTHDAYS_BY_WS = lambda ws_id: f"birthdays:ws:{ws_id}"
 _USERS_ALL = "users:all"
+_USERS_BY_WS = lambda ws_id: f"users:ws:{ws_id}"
 _WORKSPACES_ALL = "workspaces:all"
+_BIRTHDAY, _USER, _WORKSPACE = "birthday", "user", "workspace" # Per-record key prefixes
+_PRINCIPAL = "principal"
+_PRINCIPALS_OF = lambda user_id: f"principal:{user_id}"
 
 ###──────────────────────────────────────────────────────────Helper Functions for caching──────────────────────────────────────────────────────────###
+#─────────────────────────────_to_dict helper─────────────────────────────
+def _to_dict(x: Any) -> Any: # Convert SQLModel/Pydantic objects and projected rows to a dict; the codec handles UUIDs and dates
+    if hasattr(x, "_mapping"): # Row from select(col, col, ...)
+        return dict(x._mapping)
+    if hasattr(x, "model_dump"): # SQLModel / Pydantic v2
+        return x.model_dump()
+    if hasattr(x, "dict"): # Pydantic v1
+        return x.dict()
+    return x
+
+_codec = PayloadCodec(settings.cache_codec, settings.cache_compress_min_bytes)
+
+#─────────────────────────────_family helper─────────────────────────────
+def _family(key: str) -> str: # Metric label without ids: "birthdays:ws" for "birthdays:ws:<id>:page:...", the kind for "user:<id>"
+    parts = key.split(":")
+    return parts[0] if parts[0] in (_BIRTHDAY, _USER, _WORKSPACE, _PRINCIPAL) else ":".join(parts[:2])
+
 #─────────────────────────────_serialize helper─────────────────────────────
-def _serialise(items: Sequence[Any]) -> str: # Return a JSON string, converting SQLModel/Pydantic objects to dict
-    def to_dict(x: Any) -> Any:
-        if hasattr(x, "model_dump"): # SQLModel / Pydantic v2
-            return x.model_dump(mode="json")
-        if hasattr(x, "dict"): # Pydantic v1
-            return x.dict()
-        return x
-
-    return json.dumps([to_dict(i) for i in items], default=str)
+def _serialise(value: Any, family: str) -> bytes: # Return an encoded blob for one record or one page of ids
+    started = time.perf_counter()
+    payload = _codec.encode(value)
+    CACHE_CODEC_SECONDS.labels(family, "encode").observe(time.perf_counter() - started)
+    CACHE_PAYLOAD_BYTES.labels(family, "write").observe(len(payload))
+    return payload
 #─────────────────────────────_deserialize helper─────────────────────────────
-def _deserialise(raw: Optional[str]) -> Optional[List[Dict[str, Any]]]: # String to list
-    return json.loads(raw) if raw else None
+def _deserialise(raw: Optional[bytes], family: str) -> Optional[Any]:
+    if not raw:
+        return None
+    started = time.perf_counter()
+    value = _codec.decode(raw)
+    CACHE_CODEC_SECONDS.labels(family, "decode").observe(time.perf_counter() - started)
+    CACHE_PAYLOAD_BYTES.labels(family, "read").observe(len(raw))
+    return value
+
+#─────────────────────────────_validate helper─────────────────────────────
+@functools.lru_cache(maxsize=None)
+def _list_adapter(schema: type) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+def _validate(schema: type, rows: List[Dict[str, Any]]) -> List[Any]: # One validation call for the whole page, straight into response models
+    return _list_adapter(schema).validate_python(rows)
+
+def _from_page(schema: type, page: Dict[str, Any]) -> Optional[Tuple[List[Any], Optional[UUID]]]: # None if the cached rows no longer fit the schema
+    try:
+        return _validate(schema, page["items"]), cursor_from_cache(page["next_cursor"])
+    except ValidationError as e:
+        logger.warning("Cached page no longer matches %s, rebuilding: %s", schema.__name__, e.errors()[:1])
+        return None
 
 #─────────────────────────────_safe_get helper─────────────────────────────
-def _safe_get(key: str) -> Optional[str]: # Catch on error to log a failed GET
+async def _safe_get(key: str) -> Optional[bytes]: # Catch on error to log a failed GET
     try:
-        return redis.get(key)
+        return await async_cache_redis.get(key)
     except RedisError as e:
+        CACHE_ERRORS.labels(_family(key), "get").inc()
         logger.warning("Redis GET %s failed: %s", key, e)
         return None
 
 #─────────────────────────────_safe_set helper─────────────────────────────
-def _safe_set(key: str, payload: str, ttl: int = CACHE_TTL) -> None: # Catch on error to log a failed SET
+def _safe_set(key: str, payload: bytes, ttl: int = CACHE_TTL) -> None: # Catch on error to log a failed SET
     try:
-        redis.set(key, payload, ex=ttl)
+        cache_redis.set(key, payload, ex=ttl)
     except RedisError as e:
+        CACHE_ERRORS.labels(_family(key), "set").inc()
         logger.warning("Redis SET %s failed: %s", key, e)
 
 #─────────────────────────────_safe_del helper─────────────────────────────
-def _safe_del(key: str) -> None: # Catch on error to log a failed DELETE
+def _safe_del(*keys: str) -> None: # Catch on error to log a failed DELETE
+    try:
+        cache_redis.delete(*keys)
+    except RedisError as e:
+        CACHE_ERRORS.labels(_family(keys[0]), "del").inc()
+        logger.warning("Redis DEL %s failed: %s", keys, e)
+
+###──────────────────────────────────────────────────────────In-process (L1) cache──────────────────────────────────────────────────────────###
+class _LocalCache:
+    """
+    Bounded LRU of parsed pages for this worker, checked before Redis. Entries are tagged with their list and record kind
+    so an invalidation can drop them; their TTL bounds staleness if an invalidation message is ever missed.
+    Hits hand back the cached model instances themselves, so callers must treat them as read-only.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, str, Any]]" = OrderedDict() # key -> (expires, base, kind, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[3]
+
+    def set(self, key: str, base: str, kind: str, value: Any, ttl: float) -> None:
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, base, kind, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop(self, base: Optional[str] = None, kind: Optional[str] = None) -> None: # Drop every page of a list, or every page holding a kind of record
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e[1] == base or e[2] == kind]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+_local = _LocalCache(settings.l1_cache_max_entries)
+
+#─────────────────────────────Invalidate L1 on every worker─────────────────────────────
+def _apply_invalidation(message: str) -> None: # "base:<list base>" or "kind:<record kind>"
+    scope, _, value = message.partition(":")
+    if scope == "base":
+        _local.drop(base=value)
+    elif scope == "kind":
+        _local.drop(kind=value)
+
+def _broadcast_invalidation(message: str) -> None: # Drop locally right away, then tell the other workers
+    _apply_invalidation(message)
+    try:
+        redis.publish(INVALIDATION_CHANNEL, message)
+    except RedisError as e:
+        logger.warning("Redis PUBLISH %s failed, other workers keep it for up to their L1 TTL: %s", message, e)
+
+def _listen_for_invalidations() -> None:
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            _local.clear() # Messages sent while we were not subscribed are lost, so start clean
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    _apply_invalidation(message["data"])
+        except RedisError as e:
+            logger.warning("Cache invalidation listener lost Redis, resubscribing: %s", e)
+            time.sleep(1)
+        finally:
+            pubsub.close()
+
+_listener: Optional[threading.Thread] = None
+
+def start_invalidation_listener() -> None: # Call once per worker process on startup
+    global _listener
+    if _listener is not None and _listener.is_alive():
+        return
+    _listener = threading.Thread(target=_listen_for_invalidations, name="cache-invalidation", daemon=True)
+    _listener.start()
+    logger.info("Subscribed to %s", INVALIDATION_CHANNEL)
+
+###──────────────────────────────────────────────────────────Per-record helpers──────────────────────────────────────────────────────────###
+# Every cached row lives once under "<kind>:<id>" (birthday:<id>, user:<id>, workspace:<id>).
+# List pages only hold ids, so a write rewrites one record in place instead of dropping whole lists.
+def _record_key(kind: str, record_id: Any) -> str:
+    return f"{kind}:{record_id}"
+
+#─────────────────────────────Write-through one record─────────────────────────────
+def _set_record(kind: str, id_field: str, item: Any, ttl: int = CACHE_TTL) -> None:
+    data = _to_dict(item)
+    _safe_set(_record_key(kind, data[id_field]), _serialise(data, kind), ttl)
+    _broadcast_invalidation(f"kind:{kind}") # In-memory pages hold whole records, not ids
+
+def _evict_records(kind: str, ids: Sequence[Any]) -> None:
+    if ids:
+        _safe_del(*(_record_key(kind, i) for i in ids))
+        _broadcast_invalidation(f"kind:{kind}")
+
+#─────────────────────────────Fetch many records in one round trip─────────────────────────────
+async def _get_records(kind: str, ids: Sequence[Any]) -> Optional[List[Dict[str, Any]]]: # None if any record expired or was evicted
+    if not ids:
+        return []
+    try:
+        values = await async_cache_redis.mget([_record_key(kind, i) for i in ids])
+    except RedisError as e:
+        CACHE_ERRORS.labels(kind, "mget").inc()
+        logger.warning("Redis MGET %s records failed: %s", kind, e)
+        return None
+    if any(v is None for v in values):
+        return None
+    return [_deserialise(v, kind) for v in values]
+
+###──────────────────────────────────────────────────────────Page-aware helpers──────────────────────────────────────────────────────────###
+# Every list is cached one keyset page at a time under "<base>:page:<cursor>:<limit>" as
+# {"ids": [...], "next_cursor": ..., "expires_at": <unix time>, "delta": <seconds the rebuild took>}.
+# "<base>:pages" is a set of the page keys currently cached so a membership change can drop all of them at once.
+def _page_key(base: str, cursor: Optional[UUID], limit: int) -> str:
+    return f"{base}:page:{cursor or 'first'}:{limit}"
+
+def _pages_index(base: str) -> str:
+    return f"{base}:pages"
+
+#─────────────────────────────GET one cached page─────────────────────────────
+async def _get_page(base: str, kind: str, cursor: Optional[UUID], limit: int) -> Optional[Dict[str, Any]]: # Page ids, then one MGET for the records
+    page = _deserialise(await _safe_get(_page_key(base, cursor, limit)), _family(base))
+    if page is None:
+        return None
+    items = await _get_records(kind, page["ids"])
+    if items is None: # A record fell out of the cache, rebuild the page from the DB
+        return None
+    return {"items": items, "next_cursor": page["next_cursor"], "expires_at": page["expires_at"], "delta": page["delta"]}
+
+#─────────────────────────────SET one cached page─────────────────────────────
+async def _set_page(base: str, # Store the records, the page of ids and its index entry, in one round trip
+              kind: str,
+              id_field: str,
+              cursor: Optional[UUID],
+              limit: int,
+              records: Sequence[Dict[str, Any]],
+              next_cursor: Optional[UUID],
+              delta: float = 0.0,
+              ttl: int = CACHE_TTL) -> None:
+    key = _page_key(base, cursor, limit)
+    ttl = _jittered(ttl)
+    page = {"ids": [r[id_field] for r in records], "next_cursor": next_cursor, "expires_at": time.time() + ttl, "delta": delta}
+    try:
+        async with async_cache_redis.pipeline() as pipe:
+            for r in records:
+                pipe.set(_record_key(kind, r[id_field]), _serialise(r, kind), ex=ttl + STALE_TTL)
+            pipe.set(key, _serialise(page, _family(base)), ex=ttl + STALE_TTL) # Logically fresh for ttl, then served stale while one caller rebuilds
+            pipe.sadd(_pages_index(base), key)
+            pipe.expire(_pages_index(base), ttl + STALE_TTL) # Index never outlives its pages by more than one TTL
+            await pipe.execute()
+    except RedisError as e:
+        CACHE_ERRORS.labels(_family(base), "set").inc()
+        logger.warning("Redis SET %s failed: %s", key, e)
+
+#─────────────────────────────DELETE every cached page of a list─────────────────────────────
+def _invalidate_pages(base: str) -> None:
+    _broadcast_invalidation(f"base:{base}")
+    index = _pages_index(base)
     try:
-        redis.delete(key)
+        keys = cache_redis.smembers(index)
+        cache_redis.delete(index, *keys)
     except RedisError as e:
-        logger.warning("Redis DEL %s failed: %s", key, e)
- 
+        CACHE_ERRORS.labels(_family(base), "del").inc()
+        logger.warning("Redis DEL %s pages failed: %s", base, e)
+
+#─────────────────────────────Dump every cached page of a list─────────────────────────────
+async def _dump_pages(base: str, kind: str) -> Dict[str, Any]: # {page key: page} for the /utils/cache inspectors
+    try:
+        keys = sorted(await async_cache_redis.smembers(_pages_index(base)))
+        values = await async_cache_redis.mget(keys) if keys else []
+    except RedisError as e:
+        logger.warning("Redis dump of %s failed: %s", base, e)
+        return {}
+    pages = {}
+    for k, v in zip(keys, values):
+        page = _deserialise(v, _family(base))
+        if page:
+            pages[k.decode()] = {"items": await _get_records(kind, page["ids"]), "next_cursor": page["next_cursor"]}
+    return pages
+
+###──────────────────────────────────────────────────────────Stampede protection──────────────────────────────────────────────────────────###
+def _jittered(ttl: int) -> int:
+    return max(1, round(ttl * random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER)))
+
+def _should_refresh(page: Dict[str, Any]) -> bool:
+    """
+    XFetch: refresh before expiry with a probability that rises as expiry nears and with how slow the last rebuild was,
+    so one request rebuilds the page early instead of every request missing together when it expires.
+    """
+    return time.time() - page["delta"] * EARLY_REFRESH_BETA * math.log(1.0 - random.random()) >= page["expires_at"]
+
+async def _wait_for_page(base: str, kind: str, cursor: Optional[UUID], limit: int) -> Optional[Dict[str, Any]]: # Poll until another caller's rebuild lands
+    deadline = time.monotonic() + REBUILD_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(REBUILD_POLL)
+        page = await _get_page(base, kind, cursor, limit)
+        if page is not None:
+            return page
+    return None
+
+#─────────────────────────────GET a page, rebuilding it at most once across replicas─────────────────────────────
+async def _load_page(base: str,
+                     kind: str,
+                     id_field: str,
+                     cursor: Optional[UUID],
+                     limit: int,
+                     load: Loader,
+                     schema: type,
+                     l1_ttl: Optional[float] = None) -> Tuple[List[Any], Optional[UUID]]:
+    """
+    Serve the page from worker memory, then Redis, or rebuild it with `load` under a per-page Redis lock (single-flight).
+    Rows come back as `schema` instances (the route's response model) however the page was served.
+    Callers that lose the lock get the stale copy if there is one, otherwise wait for the winner's result.
+    If Redis is down or the wait runs out, the caller queries the DB itself rather than failing the request.
+    """
+    key = _page_key(base, cursor, limit)
+    l1_ttl = settings.l1_cache_ttl if l1_ttl is None else l1_ttl
+    family = _family(base)
+    hit = _local.get(key)
+    if hit is not None:
+        CACHE_HITS.labels(family, "l1").inc()
+        return hit
+
+    page = await _get_page(base, kind, cursor, limit)
+    result = _from_page(schema, page) if page is not None else None
+    if result is None:
+        page = None
+    elif not _should_refresh(page):
+        CACHE_HITS.labels(family, "redis").inc()
+        _local.set(key, base, kind, result, l1_ttl)
+        return result
+
+    lock = AsyncRedisLock(f"rebuild:{key}", REBUILD_LOCK_TTL, async_cache_redis)
+    try:
+        acquired = await lock.acquire()
+    except RedisError as e:
+        CACHE_ERRORS.labels(family, "lock").inc()
+        logger.warning("Redis error acquiring %s, rebuilding without it: %s", lock.key, e)
+        acquired = False
+    else:
+        if not acquired:
+            if result is None:
+                page = await _wait_for_page(base, kind, cursor, limit)
+                result = _from_page(schema, page) if page is not None else None
+            if result is not None:
+                CACHE_HITS.labels(family, "stale" if page is not None and time.time() >= page["expires_at"] else "redis").inc()
+                logger.debug("%s rebuild in progress elsewhere, serving cached page", base)
+                return result
+            logger.warning("Timed out waiting for %s rebuild, querying directly", base)
+
+    CACHE_MISSES.labels(family).inc()
+    try:
+        started = time.perf_counter()
+        rows, next_cursor = await load()
+        records = [_to_dict(r) for r in rows]
+        await _set_page(base, kind, id_field, cursor, limit, records, next_cursor, delta=time.perf_counter() - started)
+        logger.info("Cached %d rows for %s (page after %s)", len(records), base, cursor)
+    finally:
+        if acquired:
+            await lock.release()
+    items = _validate(schema, records) # Detached response models, safe to share through the L1 cache
+    _local.set(key, base, kind, (items, next_cursor), l1_ttl)
+    return items, next_cursor
+
 ###──────────────────────────────────────────────────────────Birthdays (all)──────────────────────────────────────────────────────────###
 #─────────────────────────────GET cached birthdays (all)─────────────────────────────
-def get_cached_birthdays_all() -> Optional[List[Dict[str, Any]]]:
-    return _deserialise(_safe_get(_BIRTHDAYS_ALL))
-
-#  ─────────────────────────────SET cached birthdays (all)─────────────────────────────
-def set_cached_birthdays_all(items: Sequence[Any], ttl: int = CACHE_TTL) -> None:
-    _safe_set(_BIRTHDAYS_ALL, _serialise(items), ttl)
-    logger.info("Cached %d birthdays (all workspaces)", len(items))
+async def load_birthdays_all(cursor: Optional[UUID], limit: int, load: Loader, schema: type) -> Tuple[List[Any], Optional[UUID]]:
+    return await _load_page(_BIRTHDAYS_ALL, _BIRTHDAY, "id", cursor, limit, load, schema)
 
 #  ─────────────────────────────DELETE cached birthdays (all)─────────────────────────────
 def invalidate_birthdays_all() -> None:
-    _safe_del(_BIRTHDAYS_ALL)
+    _invalidate_pages(_BIRTHDAYS_ALL)
     logger.info("Invalidated birthdays:all cache")
 
+async def dump_cached_birthdays_all() -> Dict[str, Any]:
+    return await _dump_pages(_BIRTHDAYS_ALL, _BIRTHDAY)
+
+#─────────────────────────────Write-through one birthday─────────────────────────────
+def cache_birthday(birthday: Any, ttl: int = CACHE_TTL) -> None: # Overwrite the record in place; cached pages pick it up on their next read
+    _set_record(_BIRTHDAY, "id", birthday, ttl)
+
+def evict_birthday(*birthday_ids: UUID) -> None:
+    _evict_records(_BIRTHDAY, birthday_ids)
+
 ### ──────────────────────────────────────────────────────────Birthdays – per workspace──────────────────────────────────────────────────────────###
 #─────────────────────────────GET cached birthdays (workspace)─────────────────────────────
-def get_cached_birthdays_by_workspace(workspace_id: UUID) -> Optional[List[Dict[str, Any]]]:
-    return _deserialise(_safe_get(_BIRTHDAYS_BY_WS(workspace_id)))
-
-#─────────────────────────────SET cached birthdays (workspace)─────────────────────────────
-def set_cached_birthdays_by_workspace(workspace_id: UUID,
-                                      items: Sequence[Any],
-                                      ttl: int = CACHE_TTL) -> None:
-    _safe_set(_BIRTHDAYS_BY_WS(workspace_id), _serialise(items), ttl)
-    logger.info("Cached %d birthdays for workspace %s", len(items), workspace_id)
+async def load_birthdays_by_workspace(workspace_id: UUID, cursor: Optional[UUID], limit: int, load: Loader, schema: type) -> Tuple[List[Any], Optional[UUID]]:
+    return await _load_page(_BIRTHDAYS_BY_WS(workspace_id), _BIRTHDAY, "id", cursor, limit, load, schema)
 
 #─────────────────────────────DELETE cached birthdays (workspace)─────────────────────────────
 def invalidate_birthdays_by_workspace(workspace_id: UUID) -> None:
-    _safe_del(_BIRTHDAYS_BY_WS(workspace_id))
+    _invalidate_pages(_BIRTHDAYS_BY_WS(workspace_id))
     logger.info("Invalidated birthday cache for workspace %s", workspace_id)
 
 
 ### ──────────────────────────────────────────────────────────Users (all)──────────────────────────────────────────────────────────###
 #─────────────────────────────GET cached users (all)─────────────────────────────
-def get_cached_users_all() -> Optional[List[Dict[str, Any]]]:
-    return _deserialise(_safe_get(_USERS_ALL))
-
-#─────────────────────────────SET cached users (all)─────────────────────────────
-def set_cached_users_all(items: Sequence[Any], ttl: int = CACHE_TTL) -> None:
-    _safe_set(_USERS_ALL, _serialise(items), ttl)
-    logger.info("Cached %d users", len(items))
+async def load_users_all(cursor: Optional[UUID], limit: int, load: Loader, schema: type) -> Tuple[List[Any], Optional[UUID]]:
+    return await _load_page(_USERS_ALL, _USER, "id", cursor, limit, load, schema)
 
 #─────────────────────────────DELETE cached users (all)─────────────────────────────
 def invalidate_users_cache_all() -> None:
-    _safe_del(_USERS_ALL)
+    _invalidate_pages(_USERS_ALL)
     logger.info("Invalidated users:all cache")
 
-### ──────────────────────────────────────────────────────────Workspaces (all)──────────────────────────────────────────────────────────###
-#─────────────────────────────GET cached workspaces (all)─────────────────────────────
-def get_cached_workspaces() -> Optional[List[Dict[str, Any]]]:
-    return _deserialise(_safe_get(_WORKSPACES_ALL))
+async def dump_cached_users_all() -> Dict[str, Any]:
+    return await _dump_pages(_USERS_ALL, _USER)
+
+#─────────────────────────────Write-through one user─────────────────────────────
+def cache_user(user: Any, ttl: int = CACHE_TTL) -> None: # Projected onto UserRead first, so hashed_password never reaches Redis
+    _set_record(_USER, "id", UserRead.model_validate(user, from_attributes=True), ttl)
+
+def evict_user(*user_ids: UUID) -> None:
+    _evict_records(_USER, user_ids)
 
-#─────────────────────────────SET cached workspaces (all)─────────────────────────────
-def set_cached_workspaces(items: Sequence[Any], ttl: int = CACHE_TTL) -> None:
-    _safe_set(_WORKSPACES_ALL, _serialise(items), ttl)
-    logger.info("Cached %d workspaces", len(items))
+### ──────────────────────────────────────────────────────────Users – per workspace──────────────────────────────────────────────────────────###
+#─────────────────────────────GET cached users (workspace)─────────────────────────────
+async def load_users_by_workspace(workspace_id: Optional[UUID], cursor: Optional[UUID], limit: int, load: Loader, schema: type) -> Tuple[List[Any], Optional[UUID]]:
+    return await _load_page(_USERS_BY_WS(workspace_id), _USER, "id", cursor, limit, load, schema)
 
+#─────────────────────────────DELETE cached users (workspace)─────────────────────────────
+def invalidate_users_by_workspace(workspace_id: Optional[UUID]) -> None:
+    _invalidate_pages(_USERS_BY_WS(workspace_id))
+    logger.info("Invalidated user cache for workspace %s", workspace_id)
+
+### ──────────────────────────────────────────────────────────Workspaces (all)──────────────────────────────────────────────────────────###
 #─────────────────────────────GET cached workspaces (all)─────────────────────────────
+async def load_workspaces(cursor: Optional[UUID], limit: int, load: Loader, schema: type) -> Tuple[List[Any], Optional[UUID]]:
+    return await _load_page(_WORKSPACES_ALL, _WORKSPACE, "id", cursor, limit, load, schema, l1_ttl=settings.l1_workspaces_ttl)
+
+#─────────────────────────────DELETE cached workspaces (all)─────────────────────────────
 def invalidate_workspaces_cache() -> None:
-    _safe_del(_WORKSPACES_ALL)
-    logger.info("Invalidated workspaces:all cache")
\ No newline at end of file
+    _invalidate_pages(_WORKSPACES_ALL)
+    logger.info("Invalidated workspaces:all cache")
+
+async def dump_cached_workspaces() -> Dict[str, Any]:
+    return await _dump_pages(_WORKSPACES_ALL, _WORKSPACE)
+
+#─────────────────────────────Write-through one workspace─────────────────────────────
+def cache_workspace(workspace: Any, ttl: int = CACHE_TTL) -> None:
+    _set_record(_WORKSPACE, "id", workspace, ttl)
+
+def evict_workspace(workspace_id: UUID) -> None:
+    _evict_records(_WORKSPACE, [workspace_id])
+
+### ──────────────────────────────────────────────────────────Principals (authenticated users)──────────────────────────────────────────────────────────###
+# "principal:<user_id>:<token digest>" holds the UserRead projection a bearer token resolved to, so authenticated requests skip the user lookup.
+# "principal:<user_id>:tokens" indexes them, so updating or deleting the user drops the entry of every token they hold at once.
+def _principal_key(user_id: UUID, token: str) -> str: # Digest, so raw tokens never show up in Redis keys
+    return f"{_PRINCIPALS_OF(user_id)}:{hashlib.sha256(token.encode()).hexdigest()[:32]}"
+
+def _principal_index(user_id: UUID) -> str:
+    return f"{_PRINCIPALS_OF(user_id)}:tokens"
+
+#─────────────────────────────GET cached principal─────────────────────────────
+async def get_principal(user_id: UUID, token: str) -> Optional[UserPrincipal]:
+    key = _principal_key(user_id, token)
+    hit = _local.get(key)
+    if hit is not None:
+        CACHE_HITS.labels(_PRINCIPAL, "l1").inc()
+        return hit
+    data = _deserialise(await _safe_get(key), _PRINCIPAL)
+    try:
+        principal = UserPrincipal.model_validate(data) if data is not None else None
+    except ValidationError:
+        principal = None
+    if principal is None:
+        CACHE_MISSES.labels(_PRINCIPAL).inc()
+        return None
+    CACHE_HITS.labels(_PRINCIPAL, "redis").inc()
+    _local.set(key, _PRINCIPALS_OF(user_id), _PRINCIPAL, principal, settings.l1_cache_ttl)
+    return principal
+
+#─────────────────────────────SET cached principal─────────────────────────────
+async def cache_principal(user_id: UUID, token: str, user: Any, ttl: Optional[int] = None) -> UserPrincipal: # Projected first, so hashed_password never reaches Redis
+    principal = UserPrincipal.model_validate(user, from_attributes=True)
+    key, index = _principal_key(user_id, token), _principal_index(user_id)
+    ttl = ttl or settings.principal_cache_ttl
+    try:
+        async with async_cache_redis.pipeline() as pipe:
+            pipe.set(key, _serialise(_to_dict(principal), _PRINCIPAL), ex=ttl)
+            pipe.sadd(index, key)
+            pipe.expire(index, ttl)
+            await pipe.execute()
+    except RedisError as e:
+        CACHE_ERRORS.labels(_PRINCIPAL, "set").inc()
+        logger.warning("Redis SET %s failed: %s", key, e)
+    _local.set(key, _PRINCIPALS_OF(user_id), _PRINCIPAL, principal, min(settings.l1_cache_ttl, ttl))
+    return principal
+
+#─────────────────────────────DELETE cached principals (every token of each user)─────────────────────────────
+def evict_principals(*user_ids: UUID) -> None:
+    if not user_ids:
+        return
+    for user_id in user_ids:
+        _broadcast_invalidation(f"base:{_PRINCIPALS_OF(user_id)}")
+    indexes = [_principal_index(user_id) for user_id in user_ids]
+    try:
+        pipe = cache_redis.pipeline()
+        for index in indexes:
+            pipe.smembers(index)
+        keys = [k for members in pipe.execute() for k in members]
+        cache_redis.delete(*indexes, *keys)
+    except RedisError as e:
+        CACHE_ERRORS.labels(_PRINCIPAL, "del").inc()
+        logger.warning("Redis DEL %s failed: %s", indexes, e)
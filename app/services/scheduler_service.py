@@ -1,71 +1,165 @@
 # app/services/scheduler_service.py
 
+import calendar
 import logging
 import zoneinfo
-from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional
 from sqlmodel import Session, select
-from sqlalchemy import extract
-from sqlalchemy.orm import selectinload
+from app.core.config import settings
 from app.core.db import engine
-from app.models.birthday_model import Birthday
-from app.services.slack_service import post_birthday_message
+from app.models.birthday_model import Birthday, month_day_key
+from app.models.workspace_model import Workspace
+from app.services.lock_service import exclusive
+from app.services.outbox_service import drain_outbox, enqueue_notifications
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.background import BackgroundScheduler
 
 logger = logging.getLogger(__name__)
 
+NOTIFY_HOUR = 9     # Local hour at which birthday messages go out
+TICK_MINUTES = 15   # Timezone mode tick. 15 minutes catches the :30 and :45 offsets too (India, Nepal, ...)
+RETRY_MINUTES = 5   # Outbox retry tick
+
 # ───────────────────────────── Module-level scheduler instance ─────────────────────────────
-_sched: BackgroundScheduler | None = None
+_sched: Optional["BackgroundScheduler"] = None
+
+# ───────────────────────────── Month-day keys for a given day ─────────────────────────────
+def _month_day_keys(today: date) -> List[int]: # Keys to look up for "today". Feb 29 birthdays get celebrated on Feb 28 in non-leap years
+    keys = [month_day_key(today)]
+    if today.month == 2 and today.day == 28 and not calendar.isleap(today.year):
+        keys.append(229)
+    return keys
+
+# ───────────────────────────── Lock keys per tick ─────────────────────────────
+def _ny_today() -> str: # The daily job's tick: today's date in New York
+    return datetime.now(zoneinfo.ZoneInfo("America/New_York")).date().isoformat()
+
+def _slot(now: Optional[datetime], minutes: int) -> str: # Start of the `minutes`-long UTC slot `now` falls in, e.g. "2026-10-17T13:15"
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    return now.replace(minute=now.minute - now.minute % minutes, second=0, microsecond=0).strftime("%Y-%m-%dT%H:%M")
 
 # ───────────────────────────── Birthday job ─────────────────────────────
-def birthday_job() -> None: # Query today’s birthdays and post Slack messages at 9 AM ET daily. Uses try/except wrapper so scheduler doesn't crash
+@exclusive("birthday-job", tick=_ny_today) # Every replica runs the scheduler, only the first to lock today's run does the work
+def birthday_job() -> Optional[Dict[str, int]]: # Query today’s birthdays and post Slack messages at 9 AM ET daily. Uses try/except wrapper so scheduler doesn't crash
     logger.info("Running daily birthday job...")
     try:
         tz = zoneinfo.ZoneInfo("America/New_York")
         today = datetime.now(tz).date()
-        month, day = today.month, today.day
 
         with Session(engine) as session:
             stmt = (
                 select(Birthday)
-                .options(selectinload(Birthday.workspace))
-                .where(extract("month", Birthday.date_of_birth) == month)
-                .where(extract("day", Birthday.date_of_birth) == day)
+                .where(Birthday.month_day.in_(_month_day_keys(today))) # Served by ix_birthday_month_day
+                .where(Birthday.workspace_id.is_not(None)) # No workspace means no webhook to post to
             )
-            birthdays = session.exec(stmt).all()
-
-            for b in birthdays:
-                if b.workspace and b.workspace.slack_webhook:
-                    try:
-                        post_birthday_message(
-                            f":partying_face: Happy Birthday, *{b.name}*! :tada:",
-                            webhook_url=b.workspace.slack_webhook
-                        )
-                        logger.info(f"Posted birthday for {b.name}")
-                    except Exception:
-                        logger.exception(f"Slack post failed for {b.name}")
-                else:
-                    logger.warning(f"Skipping {b.name}: No webhook configured")
+            enqueued = enqueue_notifications(session, session.exec(stmt).all(), today) # Already-enqueued birthdays are skipped, so reruns don't re-post
 
+        sent, failed = drain_outbox()
         logger.info("Birthday job complete.")
+        return {"enqueued": enqueued, "sent": sent, "failed": failed}
     except Exception:
         logger.exception("Unhandled error in birthday_job")
+        return None
+
+# ───────────────────────────── Offset groups due this tick ─────────────────────────────
+def _due_offset_groups(session: Session, # Group workspace timezones by current UTC offset, keep the groups whose local clock just hit 09:00
+                       now_utc: datetime,
+                       catch_up: bool = False) -> Dict[timedelta, List[str]]: # catch_up: every group already past 09:00 today (manual runs)
+    groups: Dict[timedelta, List[str]] = defaultdict(list)
+    for tz_name in session.exec(select(Workspace.timezone).distinct()).all(): # Served by ix_workspace_timezone
+        try:
+            offset = now_utc.astimezone(zoneinfo.ZoneInfo(tz_name)).utcoffset()
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            logger.warning("Skipping unknown workspace timezone %r", tz_name)
+            continue
+        local = now_utc + offset
+        due = local.hour >= NOTIFY_HOUR if catch_up else (local.hour == NOTIFY_HOUR and local.minute < TICK_MINUTES)
+        if due:
+            groups[offset].append(tz_name)
+    return groups
+
+def _fmt_offset(offset: timedelta) -> str: # timedelta(hours=-4) -> "-04:00"
+    minutes = int(offset.total_seconds() // 60)
+    sign = "+" if minutes >= 0 else "-"
+    return f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+
+# ───────────────────────────── Timezone-aware birthday job ─────────────────────────────
+@exclusive("timezone-birthday-job", tick=lambda now=None, catch_up=False: _slot(now, TICK_MINUTES))
+def timezone_birthday_job(now: Optional[datetime] = None, # Runs every TICK_MINUTES and only notifies workspaces where it is 09:00 local
+                          catch_up: bool = False) -> Optional[Dict[str, int]]: # catch_up: workspaces past 09:00 local, for manual runs. The rest wait for their tick
+    now_utc = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    try:
+        enqueued = 0
+        with Session(engine) as session:
+            groups = _due_offset_groups(session, now_utc, catch_up)
+            if not groups:
+                logger.debug("No workspaces at %02d:00 local for tick %s", NOTIFY_HOUR, now_utc.isoformat())
+                return {"enqueued": 0, "sent": 0, "failed": 0}
+
+            for offset, tz_names in groups.items():
+                local_today = (now_utc + offset).date()
+                logger.info("Running birthday job for UTC%s (%d timezones, local date %s)", _fmt_offset(offset), len(tz_names), local_today)
+                stmt = (
+                    select(Birthday)
+                    .join(Workspace, Birthday.workspace_id == Workspace.id)
+                    .where(Workspace.timezone.in_(tz_names))
+                    .where(Birthday.month_day.in_(_month_day_keys(local_today))) # Served by ix_birthday_workspace_month_day
+                )
+                enqueued += enqueue_notifications(session, session.exec(stmt).all(), local_today)
+
+        sent, failed = drain_outbox()
+
+        logger.info("Timezone birthday job complete for tick %s.", now_utc.isoformat())
+        return {"enqueued": enqueued, "sent": sent, "failed": failed}
+    except Exception:
+        logger.exception("Unhandled error in timezone_birthday_job")
+        return None
+
+# ───────────────────────────── Outbox retry job ─────────────────────────────
+@exclusive("outbox-retry-job", tick=lambda: _slot(None, RETRY_MINUTES))
+def outbox_retry_job() -> None: # Re-send notifications whose earlier attempts failed and are now due
+    try:
+        drain_outbox()
+    except Exception:
+        logger.exception("Unhandled error in outbox_retry_job")
 
 # ───────────────────────────── Start Scheduler ─────────────────────────────
 def start_scheduler() -> None: # Initialize and start the background scheduler
     global _sched
     if _sched and _sched.running:
         return
+    from apscheduler.schedulers.background import BackgroundScheduler # Imported here: the API process pays for APScheduler only once it starts
+    from apscheduler.triggers.cron import CronTrigger
+
+    if settings.scheduler_mode == "timezone":
+        _sched = BackgroundScheduler(timezone="UTC")
+        _sched.add_job(
+            timezone_birthday_job,
+            CronTrigger(minute=f"*/{TICK_MINUTES}"),
+            id="timezone-birthday-job",
+            replace_existing=True,
+        )
+        logger.info("Scheduler started, job runs every %d minutes for workspaces at %02d:00 local.", TICK_MINUTES, NOTIFY_HOUR)
+    else:
+        _sched = BackgroundScheduler(timezone="America/New_York")
+        _sched.add_job(
+            birthday_job,
+            CronTrigger(hour=NOTIFY_HOUR, minute=0),
+            id="daily-birthday-job",
+            replace_existing=True,
+        )
+        logger.info("Scheduler started, job scheduled at 09:00 ET daily.")
 
-    _sched = BackgroundScheduler(timezone="America/New_York")
     _sched.add_job(
-        birthday_job,
-        CronTrigger(hour=9, minute=0),
-        id="daily-birthday-job",
+        outbox_retry_job,
+        CronTrigger(minute=f"*/{RETRY_MINUTES}"),
+        id="outbox-retry-job",
         replace_existing=True,
     )
     _sched.start()
-    logger.info("Scheduler started, job scheduled at 09:00 ET daily.")
 
 
 # ───────────────────────────── Stop Scheduler ─────────────────────────────
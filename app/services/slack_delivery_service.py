@@ -0,0 +1,124 @@
+# app/services/slack_delivery_service.py
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+from app.core.config import settings
+from app.services.slack_service import post_birthday_message
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────Outgoing message─────────────────────────────
+@dataclass
+class SlackMessage:
+    webhook_url: str
+    text: str
+    blocks: Optional[List[Dict[str, Any]]] = None # Block Kit payload, text is then the notification fallback
+    key: Any = None # Caller-defined handle (e.g. birthday id) so results can be mapped back
+
+# ─────────────────────────────Per-webhook token bucket─────────────────────────────
+class TokenBucket: # Thread-safe token bucket. acquire() blocks until a token is available
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+_buckets: Dict[str, TokenBucket] = {} # One bucket per webhook URL, shared across runs
+_buckets_lock = threading.Lock()
+
+def _get_bucket(webhook_url: str) -> TokenBucket:
+    with _buckets_lock:
+        if webhook_url not in _buckets:
+            _buckets[webhook_url] = TokenBucket(settings.slack_rate_per_sec, settings.slack_burst)
+        return _buckets[webhook_url]
+
+# ─────────────────────────────Run report─────────────────────────────
+@dataclass
+class DeliveryReport:
+    succeeded: List[SlackMessage] = field(default_factory=list)
+    failed: List[SlackMessage] = field(default_factory=list)
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list)) # webhook URL -> seconds per post
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float: # Messages per second over the whole run
+        total = len(self.succeeded) + len(self.failed)
+        return total / self.elapsed if self.elapsed else 0.0
+
+    def log(self) -> None:
+        logger.info(
+            "Slack delivery: %d sent, %d failed across %d webhooks in %.2fs (%.1f msg/s)",
+            len(self.succeeded), len(self.failed), len(self.latencies), self.elapsed, self.throughput,
+        )
+        for url, samples in self.latencies.items():
+            logger.info(
+                "  %s: %d posts, avg %.0fms, max %.0fms",
+                _redact(url), len(samples), 1000 * sum(samples) / len(samples), 1000 * max(samples),
+            )
+
+def _redact(webhook_url: str) -> str: # Webhook URLs are credentials, only log the host and the first path segments
+    parts = urlsplit(webhook_url)
+    segments = parts.path.strip("/").split("/")
+    return f"{parts.netloc}/{'/'.join(segments[:-1])}/***" if len(segments) > 1 else f"{parts.netloc}/***"
+
+# ─────────────────────────────Deliver one webhook's queue─────────────────────────────
+def _drain_webhook(webhook_url: str, # Post this webhook's messages in order, paced by its token bucket
+                   messages: List[SlackMessage],
+                   report: DeliveryReport,
+                   report_lock: threading.Lock) -> None:
+    bucket = _get_bucket(webhook_url)
+    for msg in messages:
+        bucket.acquire()
+        started = time.perf_counter()
+        try:
+            ok = post_birthday_message(msg.text, webhook_url=webhook_url, blocks=msg.blocks)
+        except Exception:
+            logger.exception("Slack post failed for %s", msg.key)
+            ok = False
+        took = time.perf_counter() - started
+        with report_lock:
+            report.latencies[webhook_url].append(took)
+            (report.succeeded if ok else report.failed).append(msg)
+
+# ─────────────────────────────Concurrent fan-out─────────────────────────────
+def deliver(messages: Sequence[SlackMessage], max_workers: Optional[int] = None) -> DeliveryReport:
+    """
+    Post messages concurrently: one queue per webhook, drained by a bounded thread pool.
+    A slow or rate-limited workspace only delays its own queue.
+    """
+    report = DeliveryReport()
+    if not messages:
+        return report
+
+    by_webhook: Dict[str, List[SlackMessage]] = defaultdict(list)
+    for msg in messages:
+        by_webhook[msg.webhook_url].append(msg)
+
+    report_lock = threading.Lock()
+    started = time.perf_counter()
+    workers = min(max_workers or settings.slack_max_workers, len(by_webhook))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slack-fanout") as pool:
+        futures = [pool.submit(_drain_webhook, url, queue, report, report_lock) for url, queue in by_webhook.items()]
+        for f in futures:
+            f.result() # _drain_webhook swallows per-message errors, this only surfaces bugs
+    report.elapsed = time.perf_counter() - started
+    report.log()
+    return report
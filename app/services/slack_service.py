@@ -2,21 +2,89 @@
 
 import logging
 import time
-from typing import Dict
-from slack_sdk.webhook import WebhookClient
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from app.core.metrics import SLACK_POST_SECONDS
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from slack_sdk.webhook import WebhookClient
 
-_clients: Dict[str, WebhookClient] = {} # Cache WebhookClient instances by URL
+
+_clients: Dict[str, "WebhookClient"] = {} # Cache WebhookClient instances by URL
+
+# Slack Block Kit limits (https://api.slack.com/reference/block-kit/blocks)
+MAX_BLOCKS_PER_MESSAGE = 50
+MAX_SECTION_CHARS = 3000
+MAX_MESSAGE_CHARS = 40000
 
 # ─────────────────────────────Local cache for WebhookClient─────────────────────────────
-def _get_client(webhook_url: str) -> WebhookClient: # Return a WebhookClient for each URL
+def _get_client(webhook_url: str) -> "WebhookClient": # Return a WebhookClient for each URL
     if webhook_url not in _clients:
+        from slack_sdk.webhook import WebhookClient # Imported on the first post, not at API startup
         _clients[webhook_url] = WebhookClient(webhook_url)
     return _clients[webhook_url]
 
+# ─────────────────────────────Retry-After helper─────────────────────────────
+def _retry_after(resp) -> Optional[int]: # Seconds Slack asked us to wait on a 429, if it said so
+    for name, value in (resp.headers or {}).items():
+        if name.lower() == "retry-after":
+            try:
+                return max(int(float(value[0] if isinstance(value, list) else value)), 0)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+# ─────────────────────────────Render batched birthday messages─────────────────────────────
+def _escape(text: str) -> str: # Slack mrkdwn control characters
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+class BirthdayMessage(NamedTuple):
+    text: str                     # Notification fallback text
+    blocks: List[Dict[str, Any]]  # Block Kit payload
+    count: int                    # How many of the input names this chunk covers (chunks keep input order)
+
+def render_birthday_messages(names: Sequence[str]) -> List[BirthdayMessage]:
+    """
+    Render one workspace's birthdays as Block Kit messages: a header plus sections of one line per person.
+    Split so every message stays within Slack's block and character limits.
+    """
+    # One line per person: collapse any whitespace (newlines included) inside a name so it can't break the layout
+    lines = [f":partying_face: Happy Birthday, *{_escape(' '.join(n.split()))}*! :tada:" for n in names]
+
+    sections: List[Tuple[str, int]] = [] # Pack lines into sections of at most MAX_SECTION_CHARS, as (text, names covered)
+    current, covered = "", 0
+    for line in lines:
+        line = line[:MAX_SECTION_CHARS]
+        if current and len(current) + 1 + len(line) > MAX_SECTION_CHARS:
+            sections.append((current, covered))
+            current, covered = "", 0
+        current = f"{current}\n{line}" if current else line
+        covered += 1
+    if current:
+        sections.append((current, covered))
+
+    header = {"type": "header", "text": {"type": "plain_text", "text": ":birthday: Today's birthdays", "emoji": True}}
+    messages: List[Tuple[List[Dict[str, Any]], int]] = [] # (blocks, names covered)
+    blocks: List[Dict[str, Any]] = [header]
+    chars = count = 0
+    for section, covered in sections: # Pack sections into messages
+        if len(blocks) == MAX_BLOCKS_PER_MESSAGE or chars + len(section) > MAX_MESSAGE_CHARS:
+            messages.append((blocks, count))
+            blocks, chars, count = [header], 0, 0
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": section}})
+        chars += len(section)
+        count += covered
+    if len(blocks) > 1:
+        messages.append((blocks, count))
+
+    return [
+        BirthdayMessage(f":birthday: {count} birthday{'s' if count != 1 else ''} today!", blocks, count)
+        for blocks, count in messages
+    ]
+
 # ─────────────────────────────Post birthday message─────────────────────────────
-def post_birthday_message(text: str, webhook_url: str) -> bool: # Send message to the Slack webhook at. Retries up to 3 times on rate-limit responses.
+def post_birthday_message(text: str, webhook_url: str, # Send message to the Slack webhook at. Retries up to 3 times on rate-limit responses.
+                          blocks: Optional[List[Dict[str, Any]]] = None) -> bool:
     if not webhook_url:
         logger.warning("Slack webhook URL missing — skipping message.")
         return False
@@ -29,20 +97,25 @@ def post_birthday_message(text: str, webhook_url: str) -> bool: # Send message t
     backoff = 1  # seconds
 
     for attempt in range(1, max_retries + 1):
+        started = time.perf_counter()
         try:
-            resp = client.send(text=text)
+            resp = client.send(text=text, blocks=blocks)
             code = resp.status_code
+            SLACK_POST_SECONDS.labels(str(code)).observe(time.perf_counter() - started)
 
             if code == 200:
                 logger.info("Birthday message posted to Slack successfully.")
                 return True
 
             if code >= 500 or code == 429: # Retry on server errors or rate limits
+                if attempt == max_retries:
+                    break
+                delay = (_retry_after(resp) if code == 429 else None) or backoff # Slack's Retry-After wins over our own backoff
                 logger.warning(
                     "Slack returned %d; retrying in %ds (attempt %d/%d).",
-                    code, backoff, attempt, max_retries
+                    code, delay, attempt, max_retries
                 )
-                time.sleep(backoff)
+                time.sleep(delay)
                 backoff *= 2
                 continue
 
@@ -50,7 +123,10 @@ def post_birthday_message(text: str, webhook_url: str) -> bool: # Send message t
             return False
 
         except Exception:
+            SLACK_POST_SECONDS.labels("error").observe(time.perf_counter() - started)
             logger.exception("Exception while posting to Slack (attempt %d/%d)", attempt, max_retries)
+            if attempt == max_retries:
+                break
             time.sleep(backoff)
             backoff *= 2
 
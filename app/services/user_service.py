@@ -1,21 +1,25 @@
 # app/services/user_service.py
 
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from uuid import UUID
 from sqlmodel import Session, select
-from passlib.context import CryptContext
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
 from sqlalchemy.exc import IntegrityError
 from redis.exceptions import RedisError
+from app.core.db import after_commit
+from app.core.pagination import keyset, split_page
+from app.core.passwords import hash_password
 from app.models.user_model import User
-from app.models.birthday_model import Birthday
-from app.schemas.user_schema import UserCreate, UserUpdate
-from app.services.redis_cache_service import ( get_cached_users_all, set_cached_users_all, invalidate_users_cache_all,)
+from app.models.birthday_model import Birthday, month_day_key
+from app.schemas.user_schema import UserCreate, UserRead, UserUpdate
+from app.services.birthday_service import refresh_birthday_cache
+from app.services.redis_cache_service import ( load_users_all, invalidate_users_cache_all, load_users_by_workspace, invalidate_users_by_workspace, cache_user, evict_user, evict_principals,)
 logger = logging.getLogger(__name__)
 
-# ─────────────────────────────Password hasher─────────────────────────────
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Columns behind UserRead. List queries select only these, so hashed_password is never loaded or cached
+_USER_READ_COLUMNS = [User.user_id.label("id"), User.email, User.is_active, User.is_superuser, User.is_verified, User.date_of_birth, User.workspace_id]
 
 # ─────────────────────────────Birthday Sync Helper─────────────────────────────
 def _sync_user_birthday(session: Session, # Ensure there's a birthday record matching this User. Creates/updates the record
@@ -23,44 +27,80 @@ def _sync_user_birthday(session: Session, # Ensure there's a birthday record mat
     b = session.exec(
         select(Birthday).where(Birthday.user_id == user_obj.user_id)
     ).first()
+    created = b is None
+    old_workspace_id = None if created else b.workspace_id
     if b:
         b.name = user_obj.email
         b.date_of_birth = user_obj.date_of_birth
         b.workspace_id = user_obj.workspace_id
+        b.month_day = month_day_key(user_obj.date_of_birth)
     else:
         b = Birthday(
             user_id=user_obj.user_id,
             name=user_obj.email,
             date_of_birth=user_obj.date_of_birth,
             workspace_id=user_obj.workspace_id,
+            month_day=month_day_key(user_obj.date_of_birth),
         )
         session.add(b)
     try:
         session.commit()
+        session.refresh(b)
     except Exception:
         session.rollback()
         logger.exception("Failed to sync birthday for user %s", user_obj.user_id)
+        return
+    after_commit(session, refresh_birthday_cache, b, created, old_workspace_id)
 
-# ─────────────────────────────Return all users─────────────────────────────
-def list_users(session: Session) -> List[User]: # Return every user in the system
+# ─────────────────────────────Cache upkeep after a write─────────────────────────────
+def _cache_new_user(user: User) -> None:
     try:
-        cached = get_cached_users_all() # Try cache
+        cache_user(user)
+        invalidate_users_cache_all()  # New member, so next list_users() pages are rebuilt
+        invalidate_users_by_workspace(user.workspace_id)
     except RedisError as e:
-        logger.warning("Redis GET error in list_users, skipping cache: %s", e)
-        cached = None
-
-    if cached is not None:
-        logger.debug("list_users: cache hit")
-        return [User.parse_obj(d) for d in cached]
+        logger.warning("Redis DELETE error invalidating users cache: %s", e)
 
-    users = session.exec(select(User)).all()  # Hit database if no cache
+def _refresh_user_cache(user: User,
+                        old_workspace_id: Optional[UUID]) -> None:
+    try:
+        cache_user(user) # Write through. The cached pages only hold ids, so they stay valid
+        evict_principals(user.user_id) # Their next request re-reads role, active flag and workspace
+        if user.workspace_id != old_workspace_id: # Unless the user moved workspace
+            invalidate_users_by_workspace(old_workspace_id)
+            invalidate_users_by_workspace(user.workspace_id)
+    except RedisError as e:
+        logger.warning("Redis SET error caching user %s: %s", user.user_id, e)
 
+def _forget_user(user_id: UUID,
+                 workspace_id: Optional[UUID]) -> None:
     try:
-        set_cached_users_all(users) # Populate cache
+        evict_user(user_id)
+        evict_principals(user_id) # Outstanding tokens stop resolving now, not when their cache entry expires
+        invalidate_users_cache_all() # Invalidate the all-users cache
+        invalidate_users_by_workspace(workspace_id)
     except RedisError as e:
-        logger.warning("Redis SET error in list_users: %s", e)
+        logger.warning("Redis DELETE error invalidating users cache: %s", e)
+
+# ─────────────────────────────Return all users─────────────────────────────
+async def list_users(session: AsyncSession, # Return one keyset page of every user in the system, plus the next cursor
+                     cursor: Optional[UUID],
+                     limit: int) -> Tuple[List[UserRead], Optional[UUID]]:
+    async def load(): # Hit database, only when this caller wins the page rebuild
+        return split_page((await session.exec(keyset(select(*_USER_READ_COLUMNS), User.user_id, cursor, limit))).all(), limit, "id")
 
-    return users
+    return await load_users_all(cursor, limit, load, UserRead)
+
+# ─────────────────────────────Return users in a workspace─────────────────────────────
+async def list_users_by_workspace(session: AsyncSession, # One keyset page of the users in a workspace, plus the next cursor
+                                  workspace_id: Optional[UUID],
+                                  cursor: Optional[UUID],
+                                  limit: int) -> Tuple[List[UserRead], Optional[UUID]]:
+    async def load(): # Hit database, only when this caller wins the page rebuild
+        stmt = keyset(select(*_USER_READ_COLUMNS).where(User.workspace_id == workspace_id), User.user_id, cursor, limit)
+        return split_page((await session.exec(stmt)).all(), limit, "id")
+
+    return await load_users_by_workspace(workspace_id, cursor, limit, load, UserRead)
 
 # ─────────────────────────────Get user by id─────────────────────────────
 def get_user(session: Session, # Fetch single user by ID directly from the database
@@ -80,7 +120,7 @@ def create_user(session: Session,
         )
     user = User(
         email=payload.email,
-        hashed_password=pwd_context.hash(payload.password),
+        hashed_password=hash_password(payload.password),
         date_of_birth=payload.date_of_birth,
         workspace_id=payload.workspace_id,
     )
@@ -89,10 +129,7 @@ def create_user(session: Session,
         session.commit()
         session.refresh(user)
         logger.info("Created user %s", user.user_id)
-        try:
-            invalidate_users_cache_all()  # Invalidate cache so next list_users() is fresh
-        except RedisError as e:
-            logger.warning("Redis DELETE error invalidating users cache: %s", e)
+        after_commit(session, _cache_new_user, user)
         return user
     except IntegrityError:
         session.rollback()
@@ -107,17 +144,20 @@ def create_user(session: Session,
 def update_user(session: Session,
     current_user: User,
     target_user_id: UUID,
-    payload: UserUpdate) -> Optional[User]:
+    payload: UserUpdate,
+    hashed_password: Optional[str] = None) -> Optional[User]: # Pass hashed_password when payload.password was already hashed (e.g. off the event loop)
     user_obj = session.get(User, target_user_id)
     if not user_obj: # Is a user?
         return None
     if not (current_user.is_superuser or current_user.user_id == target_user_id): # Self or admin
         return None
 
+    old_workspace_id = user_obj.workspace_id
     data = payload.model_dump(exclude_unset=True, mode="json")
 
     if "password" in data: 
-        data["hashed_password"] = pwd_context.hash(data.pop("password")) # Hash new password if provided
+        password = data.pop("password")
+        data["hashed_password"] = hashed_password or hash_password(password) # Hash new password if provided
 
     needs_bday_sync = any(f in data for f in ("email", "name", "date_of_birth", "workspace_id"))
 
@@ -129,11 +169,7 @@ def update_user(session: Session,
         session.commit()
         session.refresh(user_obj)
         logger.info("Updated user %s", target_user_id)
-
-        try:
-            invalidate_users_cache_all() # Invalidate the all-users cache
-        except RedisError as e:
-            logger.warning("Redis DELETE error invalidating users cache: %s", e)
+        after_commit(session, _refresh_user_cache, user_obj, old_workspace_id)
 
     except IntegrityError:
         session.rollback()
@@ -151,16 +187,12 @@ def delete_user(session: Session, # Delete a user
     if not user:
         return False
 
+    workspace_id = user.workspace_id
     session.delete(user)
     try:
         session.commit()
         logger.info("Deleted user %s", user_id)
-
-        try:
-            invalidate_users_cache_all() # Invalidate the all-users cache
-        except RedisError as e:
-            logger.warning("Redis DELETE error invalidating users cache: %s", e)
-
+        after_commit(session, _forget_user, user_id, workspace_id)
         return True
 
     except IntegrityError:
@@ -3,77 +3,198 @@
 from __future__ import annotations
 from app.services import redis_cache_service as cache
 import logging
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
 from zoneinfo import available_timezones
+from redis.exceptions import RedisError
+from sqlalchemy import exists, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
 from app.models.user_model import User
-from app.models.birthday_model import Birthday
-from app.services.scheduler_service import birthday_job
-from app.schemas.utils_schema import (JobResult, CountResult,CacheResult,)
+from app.models.birthday_model import Birthday, month_day_expr
+from app.core.config import settings
+from app.services.lock_service import SKIPPED
+from app.services.scheduler_service import birthday_job, timezone_birthday_job
+from app.core.db import engine, async_engine, redis_pool
+from app.services import job_service
+from app.schemas.utils_schema import (JobStatus, CountResult, CacheResult, DbPoolStats, RedisPoolStats, PoolStats,)
 logger = logging.getLogger(__name__)
 
+SYNC_BATCH_SIZE = 5000 # Rows per statement in the refresh/backfill jobs, so they commit and report progress as they go
+
 # ─────────────────────────────Get Timezones──────────────────────────────
 def get_supported_timezones() -> List[str]:
     return sorted(available_timezones())
 
-# ─────────────────────Sync birthday from user────────────────────────
-def sync_birthday_from_user(session: Session, # Build birthday if info exists in user
-                            user: User) -> None:
-    birthday = session.exec(select(Birthday).where(Birthday.user_id == user.user_id)).first()
-    if birthday:
-        birthday.name = user.email
-        birthday.date_of_birth = user.date_of_birth
-        birthday.workspace_id = user.workspace_id
-    else:
-        session.add(
-            Birthday(
-                user_id=user.user_id,
-                name=user.email,
-                date_of_birth=user.date_of_birth,
-                workspace_id=user.workspace_id,))
-    session.commit()
+# ─────────────────────Keyset batches for the bulk jobs────────────────────────
+def _id_ranges(session: Session, column: Any) -> Iterator[Tuple[Optional[UUID], Optional[UUID]]]: # (after, upto] ranges of SYNC_BATCH_SIZE ids, the last one open-ended
+    after = None
+    while True:
+        stmt = select(column).order_by(column).offset(SYNC_BATCH_SIZE - 1).limit(1)
+        if after is not None:
+            stmt = stmt.where(column > after)
+        upto = session.exec(stmt).first()
+        yield after, upto
+        if upto is None:
+            return
+        after = upto
+
+def _in_range(column: Any, after: Optional[UUID], upto: Optional[UUID]) -> List[Any]:
+    return ([column > after] if after is not None else []) + ([column <= upto] if upto is not None else [])
 
 # ─────────────────────Refresh birthday db from user────────────────────────
 def refresh_birthday_table_from_users(session: Session) -> CountResult: # Return # of rows updated
-    updated = 0
-    for bd in session.exec(select(Birthday)).all():
-        user = session.get(User, bd.user_id)
-        if user:
-            sync_birthday_from_user(session, user)
-            updated += 1
-    return CountResult(count=updated) 
+    """
+    Copy email, date of birth and workspace from every user onto their birthday, one UPDATE ... FROM "user" per
+    SYNC_BATCH_SIZE birthdays. Rows that already match are skipped, so the count is the number of birthdays that actually changed.
+    Progress is birthdays checked out of the total.
+    """
+    total = session.exec(select(func.count()).select_from(Birthday)).one()
+    job_service.report_progress(0, total)
+    old = aliased(Birthday, name="old") # Self-join: sees the row as it was before this UPDATE, for the workspace it is leaving
+    updated = checked = 0
+    for after, upto in _id_ranges(session, Birthday.id):
+        stmt = (
+            update(Birthday)
+            .where(Birthday.user_id == User.user_id, old.id == Birthday.id, *_in_range(Birthday.id, after, upto))
+            .where(or_(
+                Birthday.name.is_distinct_from(User.email),
+                Birthday.date_of_birth.is_distinct_from(User.date_of_birth),
+                Birthday.workspace_id.is_distinct_from(User.workspace_id),
+                Birthday.month_day.is_distinct_from(month_day_expr(User.date_of_birth)),
+            ))
+            .values(
+                name=User.email,
+                date_of_birth=User.date_of_birth,
+                workspace_id=User.workspace_id,
+                month_day=month_day_expr(User.date_of_birth),
+            )
+            .returning(Birthday.id, old.workspace_id, Birthday.workspace_id)
+        )
+        changed = session.exec(stmt).all()
+        session.commit()
+
+        moved = {ws for _, before, after_ws in changed if before != after_ws for ws in (before, after_ws)} # Only these workspace lists change membership
+        _refresh_birthday_caches([bd_id for bd_id, _, _ in changed], moved, created=False)
+        updated += len(changed)
+        checked = total if upto is None else checked + SYNC_BATCH_SIZE
+        job_service.report_progress(min(checked, total), total)
+
+    logger.info("Refreshed %d birthdays from users", updated)
+    return CountResult(count=updated)
 
 # ─────────────────────Backfill birthday────────────────────────
 def backfill_birthdays(session: Session) -> CountResult: # Return # of new rows created.
-    created = 0
-    for user in session.exec(select(User)): # Pull all users
-        exists = session.exec(select(Birthday).where(Birthday.user_id == user.user_id)).first()
-        if not exists:
-            sync_birthday_from_user(session, user)
-            created += 1
-    return CountResult(count=created)  
-
-# ────────────────────────Run birthday job manually────────────────────────
-def run_birthday_job() -> JobResult:
-    birthday_job()
+    """
+    Create a birthday for every user that has none, one INSERT ... SELECT ... WHERE NOT EXISTS per SYNC_BATCH_SIZE users.
+    Progress is users checked out of the total.
+    """
+    total = session.exec(select(func.count()).select_from(User)).one()
+    job_service.report_progress(0, total)
+    backfilled = checked = 0
+    for after, upto in _id_ranges(session, User.user_id):
+        missing = (
+            select(
+                func.gen_random_uuid(),
+                User.user_id,
+                User.email,
+                User.date_of_birth,
+                User.workspace_id,
+                month_day_expr(User.date_of_birth),
+                func.now(),
+            )
+            .where(~exists().where(Birthday.user_id == User.user_id), *_in_range(User.user_id, after, upto))
+        )
+        stmt = (
+            insert(Birthday)
+            .from_select(["id", "user_id", "name", "date_of_birth", "workspace_id", "month_day", "created_at"], missing)
+            .on_conflict_do_nothing(constraint="uq_birthday_user") # A concurrent registration got there first
+            .returning(Birthday.workspace_id)
+        )
+        created = session.exec(stmt).scalars().all()
+        session.commit()
+
+        _refresh_birthday_caches([], set(created), created=bool(created))
+        backfilled += len(created)
+        checked = total if upto is None else checked + SYNC_BATCH_SIZE
+        job_service.report_progress(min(checked, total), total)
+
+    logger.info("Backfilled %d birthdays", backfilled)
+    return CountResult(count=backfilled)
+
+def _refresh_birthday_caches(evicted: List[UUID], # Once per bulk statement: drop changed records and the list pages whose membership changed
+                             workspace_ids: Set[Optional[UUID]],
+                             created: bool) -> None:
+    try:
+        if evicted:
+            cache.evict_birthday(*evicted)
+        if created:
+            cache.invalidate_birthdays_all()
+        for ws_id in {w for w in workspace_ids if w}:
+            cache.invalidate_birthdays_by_workspace(ws_id)
+    except RedisError as e:
+        logger.warning("Redis error refreshing birthday caches after bulk sync: %s", e)
+
+# ────────────────────────Background admin jobs────────────────────────
+def _in_session(fn) -> CountResult: # Jobs run on the job pool, outside any request, so they open their own session
+    with Session(engine) as session:
+        return fn(session)
+
+def _birthday_job() -> Dict[str, int]: # Whichever job SCHEDULER_MODE schedules; timezone mode covers every workspace already past 09:00 local
+    result = timezone_birthday_job(catch_up=True) if settings.scheduler_mode == "timezone" else birthday_job()
+    if result is SKIPPED:
+        raise job_service.JobSkipped("The scheduled birthday job is running right now, its notifications are already going out")
+    if result is None:
+        raise RuntimeError("Birthday job failed, see the logs")
+    return result
+
+def run_birthday_job() -> JobStatus: # counts: enqueued/sent/failed. Status "skipped" if the scheduled run holds the job lock
     logger.info("Triggered manual birthday job")
-    return JobResult(detail="Birthday job triggered")
+    return job_service.submit("birthday-job", _birthday_job)
+
+def start_refresh_birthday_table() -> JobStatus:
+    return job_service.submit("refresh-birthday-table", lambda: _in_session(refresh_birthday_table_from_users))
+
+def start_backfill_birthdays() -> JobStatus:
+    return job_service.submit("backfill-birthdays", lambda: _in_session(backfill_birthdays))
+
+def get_job(job_id: str) -> JobStatus:
+    return job_service.get_job(job_id)
 
 # ──────────────────────── Job Cache helpers ────────────────────────
-def get_entire_cache() -> CacheResult: # Return the whole cache blob (users, birthdays, workspaces)
+async def get_entire_cache() -> CacheResult: # Return the whole cache blob (users, birthdays, workspaces)
     return CacheResult(
         data={
-            "users":      cache.get_cached_users_all(),
-            "birthdays":  cache.get_cached_birthdays_all(),
-            "workspaces": cache.get_cached_workspaces(),
+            "users":      await cache.dump_cached_users_all(),
+            "birthdays":  await cache.dump_cached_birthdays_all(),
+            "workspaces": await cache.dump_cached_workspaces(),
         }
     )
 
-def get_cached_birthdays() -> CacheResult:
-    return CacheResult(data=cache.get_cached_birthdays_all())
+async def get_cached_birthdays() -> CacheResult:
+    return CacheResult(data=await cache.dump_cached_birthdays_all())
 
-def get_cached_users() -> CacheResult:
-    return CacheResult(data=cache.get_cached_users_all())
+async def get_cached_users() -> CacheResult:
+    return CacheResult(data=await cache.dump_cached_users_all())
 
-def get_cached_workspaces() -> CacheResult:
-    return CacheResult(data=cache.get_cached_workspaces())
\ No newline at end of file
+async def get_cached_workspaces() -> CacheResult:
+    return CacheResult(data=await cache.dump_cached_workspaces())
+
+# ──────────────────────── Connection pool stats ────────────────────────
+def _db_pool_stats(pool) -> DbPoolStats:
+    return DbPoolStats(size=pool.size(), checked_out=pool.checkedout(), idle=pool.checkedin(), overflow=max(pool.overflow(), 0))
+
+def _count(connections: Optional[Any]) -> Optional[int]:
+    return len(connections) if connections is not None else None
+
+def get_pool_stats() -> PoolStats:
+    return PoolStats(
+        database=_db_pool_stats(engine.pool),
+        async_database=_db_pool_stats(async_engine.pool),
+        redis=RedisPoolStats( # redis-py keeps no public counters. Its private bookkeeping has moved between versions, so read it defensively
+            max_connections=redis_pool.max_connections,
+            in_use=_count(getattr(redis_pool, "_in_use_connections", None)),
+            idle=_count(getattr(redis_pool, "_available_connections", None)),
+        ),
+    )
@@ -2,38 +2,31 @@
 
 from __future__ import annotations
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
 from fastapi import HTTPException, status
 from sqlmodel import Session, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from redis.exceptions import RedisError
+from app.core.db import after_commit
+from app.core.pagination import keyset, split_page
 from app.models.birthday_model import Birthday
 from app.models.user_model import User
 from app.models.workspace_model import Workspace
-from app.schemas.workspace_schema import WorkspaceCreate, WorkspaceUpdate
-from app.services.redis_cache_service import (get_cached_workspaces, set_cached_workspaces, invalidate_workspaces_cache,)
+from app.schemas.workspace_schema import WorkspaceCreate, WorkspaceRead, WorkspaceUpdate
+from app.services.redis_cache_service import (load_workspaces, invalidate_workspaces_cache, cache_workspace, evict_workspace, evict_birthday, invalidate_birthdays_by_workspace,
+                                              evict_user, evict_principals, invalidate_users_by_workspace,)
 logger = logging.getLogger(__name__)
 
 # ───────────────────────────List workspaces────────────────────────────
-def list_workspaces(session: Session) -> List[Workspace]: # Return every workspace
-    try:
-        cached = get_cached_workspaces() # Get workspaces cache
-    except RedisError as e:
-        logger.warning("Redis GET error in list_workspaces, skipping cache: %s", e)
-        cached = None
-
-    if cached is not None:
-        logger.debug("list_workspaces: cache hit")
-        return [Workspace.parse_obj(d) for d in cached] # Deserialize into instances
+async def list_workspaces(session: AsyncSession, # Return one keyset page of workspaces, plus the next cursor
+                          cursor: Optional[UUID],
+                          limit: int) -> Tuple[List[WorkspaceRead], Optional[UUID]]:
+    async def load(): # Hit database, only when this caller wins the page rebuild
+        return split_page((await session.exec(keyset(select(Workspace), Workspace.id, cursor, limit))).all(), limit, "id")
 
-    workspaces = session.exec(select(Workspace)).all() # Hit database if nothing in cache
-
-    try:
-        set_cached_workspaces(workspaces) # Populate Redis cache for next list
-    except RedisError as e:
-        logger.warning("Redis SET error in list_workspaces: %s", e)
-    return workspaces
+    return await load_workspaces(cursor, limit, load, WorkspaceRead) # Served as response models, never as table objects
 
 # ─────────────────────────────Create workspace─────────────────────────────
 def create_workspace(session: Session, # Insert and return a new workspace
@@ -50,11 +43,7 @@ def create_workspace(session: Session, # Insert and return a new workspace
         session.commit()
         session.refresh(ws)
         logger.info("Workspace %s created", ws.id)
-        
-        try:
-            invalidate_workspaces_cache() # Clear stale cache
-        except RedisError as e:
-            logger.warning("Redis DELETE error in create_workspace: %s", e)
+        after_commit(session, _cache_workspace, ws, True)
         return ws
     
     except IntegrityError:
@@ -87,11 +76,7 @@ def update_workspace(session: Session, # Apply updates
         session.commit()
         session.refresh(ws)
         logger.info("Workspace %s updated", ws.id)
-        try:
-            invalidate_workspaces_cache()
-        except RedisError as e:
-            logger.warning("Redis DELETE error in update_workspace: %s", e)
-        
+        after_commit(session, _cache_workspace, ws, False)
         return ws
     
     except IntegrityError:
@@ -102,7 +87,7 @@ def update_workspace(session: Session, # Apply updates
             detail="Could not update workspace (invalid data or conflict)",)
     
 # ─────────────────────────────Delete workspace─────────────────────────────
-def delete_workspace(session: Session, # Delete a workspace, null out workspace_id in Birthday table
+def delete_workspace(session: Session, # Delete a workspace, null out workspace_id on its birthdays and members
     workspace_id: UUID,
     current_user: User,) -> None:
     if not current_user.is_superuser:
@@ -118,22 +103,51 @@ def delete_workspace(session: Session, # Delete a workspace, null out workspace_
 
     
     try: # Null out workspace_id in Birthday table
-        session.exec(
+        orphaned = session.exec(
         update(Birthday)
         .where(Birthday.workspace_id == workspace_id)
         .values(workspace_id=None)
-        )
+        .returning(Birthday.id)
+        ).scalars().all()
+        members = session.exec( # Explicitly, not via the ORM on delete, so we know whose cached state to drop
+        update(User)
+        .where(User.workspace_id == workspace_id)
+        .values(workspace_id=None)
+        .returning(User.user_id)
+        ).scalars().all()
         session.delete(ws)
         session.commit()
-        logger.info("Workspace %s deleted; orphaned birthdays updated", workspace_id)
-        try:
-            invalidate_workspaces_cache()
-        except RedisError as e:
-            logger.warning("Redis DELETE error in delete_workspace: %s", e)
+        logger.info("Workspace %s deleted; %d orphaned birthdays and %d members updated", workspace_id, len(orphaned), len(members))
+        after_commit(session, _forget_workspace, workspace_id, orphaned, members)
         
     except IntegrityError:
         session.rollback()
         logger.exception("Integrity error deleting workspace %s", workspace_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Could not delete workspace (integrity error)",)
\ No newline at end of file
+            detail="Could not delete workspace (integrity error)",)
+
+# ─────────────────────────────Cache upkeep after a write─────────────────────────────
+def _cache_workspace(ws: Workspace, # Write through; a new workspace also clears the cached pages
+                     created: bool) -> None:
+    try:
+        cache_workspace(ws) # The cached pages only hold ids, so updates leave them valid
+        if created:
+            invalidate_workspaces_cache()
+    except RedisError as e:
+        logger.warning("Redis error caching workspace %s: %s", ws.id, e)
+
+def _forget_workspace(workspace_id: UUID,
+                      orphaned: List[UUID],
+                      members: List[UUID]) -> None:
+    try:
+        evict_workspace(workspace_id)
+        invalidate_workspaces_cache()
+        evict_birthday(*orphaned) # Their cached records still carry the old workspace_id
+        invalidate_birthdays_by_workspace(workspace_id)
+        evict_user(*members) # Same for the members' records
+        evict_principals(*members) # Their tokens must stop resolving to the deleted workspace
+        invalidate_users_by_workspace(workspace_id)
+        invalidate_users_by_workspace(None) # They now list under "no workspace"
+    except RedisError as e:
+        logger.warning("Redis DELETE error in delete_workspace: %s", e)
\ No newline at end of file
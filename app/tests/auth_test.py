@@ -0,0 +1,100 @@
+# app/tests/auth_test.py
+#
+# UserManager password paths go through the async hashing pool, never the blocking PasswordHelper,
+# and registration's blocking cache upkeep runs in the threadpool.
+
+import asyncio
+import threading
+from datetime import date
+import pytest
+from fastapi_users import exceptions
+from app.core.passwords import hash_password, shutdown_pool, verify_and_update
+from app.models.user_model import User
+from app.schemas.user_schema import UserCreate
+from app.services import auth_service
+from app.services.auth_service import UserManager
+
+class BlockingHelper: # Stands in for PasswordHelper: any call would block the event loop
+    def hash(self, password):
+        raise AssertionError("blocking hash on the event loop")
+
+    def verify_and_update(self, plain_password, hashed_password):
+        raise AssertionError("blocking verify on the event loop")
+
+    def generate(self):
+        raise AssertionError("unexpected")
+
+class FakeSession: # The AsyncSession calls UserManager.create makes
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        pass
+
+class FakeUserDB:
+    def __init__(self, user: User = None):
+        self.user = user
+        self.session = FakeSession()
+
+    async def get(self, id):
+        return self.user if id == self.user.id else None
+
+    async def update(self, user, update_dict):
+        for field, value in update_dict.items():
+            setattr(user, field, value)
+        return user
+
+class RecordingManager(UserManager):
+    reset_tokens = []
+
+    async def on_after_forgot_password(self, user, token, request=None):
+        self.reset_tokens.append(token)
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    yield
+    shutdown_pool()
+
+@pytest.fixture
+def user():
+    return User(email="ada@example.com", hashed_password=hash_password("old-password"), date_of_birth=date(1815, 12, 10))
+
+def test_forgot_and_reset_password(user):
+    manager = RecordingManager(FakeUserDB(user), BlockingHelper())
+
+    async def main():
+        await manager.forgot_password(user)
+        token = manager.reset_tokens[-1]
+        await manager.reset_password(token, "new-password")
+        with pytest.raises(exceptions.InvalidResetPasswordToken): # The token is tied to the old password
+            await manager.reset_password(token, "newer-password")
+
+    asyncio.run(main())
+    assert verify_and_update("new-password", user.hashed_password)[0]
+
+def test_update_hashes_in_the_pool(user):
+    manager = UserManager(FakeUserDB(user), BlockingHelper())
+    asyncio.run(manager._update(user, {"password": "changed", "email": user.email}))
+    assert verify_and_update("changed", user.hashed_password)[0]
+    assert not hasattr(user, "password")
+
+def test_create_refreshes_caches_off_the_loop(monkeypatch):
+    calls = []
+    monkeypatch.setattr(auth_service, "_refresh_caches_after_register", lambda user, birthday: calls.append((user, birthday, threading.get_ident())))
+    user_db = FakeUserDB()
+    manager = UserManager(user_db, BlockingHelper())
+
+    async def main():
+        user = await manager.create(UserCreate(email="grace@example.com", password="pw", date_of_birth=date(1906, 12, 9)), safe=True)
+        return user, threading.get_ident()
+
+    user, loop_thread = asyncio.run(main())
+    assert [(u, b) for u, b, _ in calls] == [tuple(user_db.session.added)]
+    assert calls[0][1].user_id == user.user_id
+    assert calls[0][2] != loop_thread
@@ -0,0 +1,90 @@
+# app/tests/birthday_test.py
+#
+# Birthday writes against in-memory SQLite: who may edit what, and cache upkeep deferred off the event loop.
+
+import asyncio
+import threading
+from datetime import date
+from uuid import uuid4
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from app.core.db import UnitOfWork
+from app.models.user_model import User
+from app.models.birthday_model import Birthday
+from app.schemas.birthday_schema import BirthdayUpdate
+from app.services import birthday_service
+
+class SyncAsyncSession: # Just enough of AsyncSession for UnitOfWork: run_sync on one sync session
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.sync_session, *args, **kwargs)
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+@pytest.fixture
+def cache_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(birthday_service, "refresh_birthday_cache", lambda *args: calls.append(("refresh", threading.get_ident())))
+    monkeypatch.setattr(birthday_service, "_forget_birthday", lambda *args: calls.append(("forget", threading.get_ident())))
+    return calls
+
+def make_user(session, **fields):
+    user = User(email=f"{uuid4()}@example.com", hashed_password="x", date_of_birth=date(2000, 1, 1), **fields)
+    session.add(user)
+    session.commit()
+    return user
+
+def make_birthday(session, owner):
+    birthday = Birthday(user_id=owner.user_id, name=owner.email, date_of_birth=owner.date_of_birth)
+    session.add(birthday)
+    session.commit()
+    return birthday
+
+def test_users_edit_only_their_own_birthday(session, cache_calls):
+    owner, other = make_user(session), make_user(session)
+    birthday = make_birthday(session, owner)
+
+    assert birthday_service.update_birthday(session, other, birthday.id, BirthdayUpdate(name="Mallory")) is None
+    assert birthday_service.delete_birthday(session, other, birthday.id) is False
+    assert birthday_service.update_birthday(session, owner, uuid4(), BirthdayUpdate(name="Nobody")) is None
+
+    updated = birthday_service.update_birthday(session, owner, birthday.id, BirthdayUpdate(date_of_birth=date(2000, 7, 4)))
+    assert updated.month_day == 704
+    assert updated.name == owner.email # Fields left out of the payload are kept
+    assert [name for name, _ in cache_calls] == ["refresh"]
+
+def test_admins_edit_any_birthday(session, cache_calls):
+    admin, owner = make_user(session, is_superuser=True), make_user(session)
+    birthday = make_birthday(session, owner)
+
+    assert birthday_service.update_birthday(session, admin, birthday.id, BirthdayUpdate(name="Renamed")).name == "Renamed"
+    assert birthday_service.delete_birthday(session, admin, birthday.id) is True
+    assert session.get(Birthday, birthday.id) is None
+    assert [name for name, _ in cache_calls] == ["refresh", "forget"]
+
+def test_unit_of_work_defers_cache_upkeep_to_a_thread(session, cache_calls):
+    owner = make_user(session)
+    birthday = make_birthday(session, owner)
+    uow = UnitOfWork(SyncAsyncSession(session))
+
+    def update(sync_session, *args):
+        result = birthday_service.update_birthday(sync_session, *args)
+        assert cache_calls == [] # Queued, not run on the event loop
+        return result
+
+    async def main():
+        await uow.run_sync(update, owner, birthday.id, BirthdayUpdate(name="Later"))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert [name for name, _ in cache_calls] == ["refresh"]
+    assert cache_calls[0][1] != loop_thread
+    assert "after_commit" not in session.info
@@ -0,0 +1,97 @@
+# app/tests/cache_test.py
+#
+# Cached list pages and principals against fakeredis: single-flight rebuilds, the async rebuild lock, principal eviction.
+
+import asyncio
+from datetime import date
+import fakeredis
+import pytest
+from pydantic import BaseModel
+from app.models.user_model import User
+from app.services import redis_cache_service as cache
+from app.services.lock_service import AsyncRedisLock
+
+class Row(BaseModel):
+    id: str
+
+class CountingQuery:
+    def __init__(self, delay: float = 0.05):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [{"id": "a"}, {"id": "b"}], None
+
+@pytest.fixture(autouse=True)
+def fake_cache(monkeypatch):
+    server = fakeredis.FakeServer() # One server behind the async, sync and pub/sub clients, like the real Redis
+    client = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(cache, "async_cache_redis", client)
+    monkeypatch.setattr(cache, "cache_redis", fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(cache, "redis", fakeredis.FakeRedis(server=server, decode_responses=True))
+    cache._local.clear()
+    yield client
+    cache._local.clear()
+
+def load(query):
+    return cache._load_page("test:all", "test", "id", None, 10, query, Row)
+
+def test_concurrent_misses_query_once(fake_cache):
+    query = CountingQuery()
+
+    async def main():
+        return await asyncio.gather(*(load(query) for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert query.calls == 1
+    assert all(items == [Row(id="a"), Row(id="b")] for items, _ in results)
+
+def test_served_from_redis_after_rebuild(fake_cache):
+    query = CountingQuery(delay=0)
+
+    async def main():
+        await load(query)
+        cache._local.clear() # Another worker: nothing in memory, page in Redis
+        items, _ = await load(query)
+        return items, await fake_cache.keys("lock:*")
+
+    items, locks = asyncio.run(main())
+    assert query.calls == 1
+    assert items == [Row(id="a"), Row(id="b")]
+    assert locks == [] # Rebuild lock released
+
+def test_rebuild_lock_excludes_and_releases(fake_cache):
+    async def main():
+        first = AsyncRedisLock("rebuild:x", 10, fake_cache)
+        second = AsyncRedisLock("rebuild:x", 10, fake_cache)
+        held = await first.acquire(), await second.acquire()
+        await second.release() # Not the holder: must not delete first's lock
+        still_held = await fake_cache.exists("lock:rebuild:x")
+        await first.release()
+        return held, still_held, await fake_cache.ttl("lock:rebuild:x")
+
+    held, still_held, ttl = asyncio.run(main())
+    assert held == (True, False)
+    assert still_held
+    assert ttl == -2 # Gone after the holder released it
+
+def test_principal_cached_then_evicted(fake_cache):
+    users = [User(email=f"{i}@example.com", hashed_password="x", date_of_birth=date(2000, 1, 1)) for i in range(2)]
+    user_ids = [u.user_id for u in users]
+
+    async def cached():
+        cache._local.clear() # Force the Redis lookup
+        return [await cache.get_principal(uid, "token") for uid in user_ids]
+
+    async def main():
+        for uid, user in zip(user_ids, users):
+            await cache.cache_principal(uid, "token", user)
+        before = await cached()
+        cache.evict_principals(*user_ids)
+        return before, await cached()
+
+    before, after = asyncio.run(main())
+    assert [p.email for p in before] == ["0@example.com", "1@example.com"]
+    assert after == [None, None]
@@ -0,0 +1,33 @@
+# app/tests/codecs_test.py
+#
+# PayloadCodec: round trips, and unreadable payloads coming back as cache misses.
+
+import uuid
+import zlib
+import pytest
+from app.core.codecs import Codec, PayloadCodec
+
+VALUE = {"id": str(uuid.uuid4()), "name": "Ada", "ids": list(range(50))}
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+@pytest.mark.parametrize("compress_min_bytes", [0, 1])
+def test_round_trip(name, compress_min_bytes):
+    codec = PayloadCodec(name, compress_min_bytes)
+    assert codec.decode(codec.encode(VALUE)) == VALUE
+
+def test_reads_payloads_written_with_another_codec():
+    assert PayloadCodec("orjson").decode(PayloadCodec("json").encode(VALUE)) == VALUE
+
+@pytest.mark.parametrize("payload", [
+    b"oz" + b"not zlib",                    # Corrupt compressed body
+    b"oz" + zlib.compress(b"{")[:-2],       # Truncated compressed body
+    b"o-" + b'{"id": ',                     # Truncated JSON
+    b"j-" + b"\xff\xfe",                    # Not UTF-8
+    b"?-" + b"{}",                          # Unknown codec tag
+])
+def test_unreadable_payload_is_a_miss(payload):
+    assert PayloadCodec("orjson").decode(payload) is None
+
+def test_codec_is_abstract():
+    with pytest.raises(TypeError):
+        Codec()
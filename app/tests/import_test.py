@@ -0,0 +1,87 @@
+# app/tests/import_test.py
+#
+# Member uploads: per-row errors, case-insensitive duplicates and undecodable files; against Postgres
+# (TEST_DATABASE_URL), emails already registered in another case, and imports queued as jobs.
+
+import uuid
+from datetime import date
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, select
+from app.core.passwords import shutdown_pool
+from app.models.user_model import User
+from app.models.workspace_model import Workspace
+from app.services import import_service
+from app.services.import_service import parse_rows
+
+CSV = (
+    "email,password,date_of_birth,name\n"
+    "ada@example.com,secret,1815-12-10,Ada\n"
+    "ADA@example.com,secret,1815-12-10,Ada again\n"
+    "grace@example.com,secret,not-a-date,Grace\n"
+    "alan@example.com,secret,1912-06-23,\n"
+)
+
+def test_csv_rows_and_errors():
+    rows, errors = parse_rows(CSV.encode(), "csv")
+    assert [(line, row.email) for line, row in rows] == [(2, "ada@example.com"), (5, "alan@example.com")]
+    assert errors[0].email == "ada@example.com" # Stored and compared lowercase
+    assert [(e.line, e.error.startswith("Duplicate of line 2")) for e in errors][0] == (3, True)
+    assert errors[1].line == 4 and errors[1].error.startswith("date_of_birth")
+
+def test_ndjson_rejects_non_objects():
+    data = b'{"email": "ada@example.com", "password": "secret", "date_of_birth": "1815-12-10"}\n[1, 2]\n{oops\n'
+    rows, errors = parse_rows(data, "ndjson")
+    assert len(rows) == 1
+    assert [e.line for e in errors] == [2, 3]
+
+def test_non_utf8_upload_is_a_client_error():
+    with pytest.raises(HTTPException) as e:
+        parse_rows(CSV.encode("utf-16"), "csv")
+    assert e.value.status_code == 400
+
+@pytest.fixture(scope="module", autouse=True)
+def pool():
+    yield
+    shutdown_pool()
+
+@pytest.fixture
+def workspace(pg_engine, monkeypatch):
+    monkeypatch.setattr(import_service, "engine", pg_engine)
+    for name in ("invalidate_users_cache_all", "invalidate_users_by_workspace", "invalidate_birthdays_all", "invalidate_birthdays_by_workspace"):
+        monkeypatch.setattr(import_service, name, lambda *args: None)
+    with Session(pg_engine, expire_on_commit=False) as session:
+        ws = Workspace(name="Team", slack_webhook="https://hooks.slack.com/services/T000/B000/team")
+        session.add(ws)
+        session.add(User(email="Grace@Example.com", hashed_password="x", date_of_birth=date(1906, 12, 9))) # Registered as typed
+        session.commit()
+    return ws
+
+def test_existing_email_in_another_case_is_reported(pg_engine, workspace):
+    data = b"email,password,date_of_birth\nGRACE@example.com,secret,1906-12-09\nAda@Example.com,secret,1815-12-10\n"
+    result = import_service.import_members(workspace.id, data, "csv")
+
+    assert (result.received, result.users_created, result.birthdays_created, result.rejected) == (2, 1, 1, 1)
+    assert [(e.line, e.error) for e in result.errors] == [(2, "A user with this email already exists")]
+    with Session(pg_engine) as session:
+        assert sorted(session.exec(select(User.email)).all()) == ["Grace@Example.com", "ada@example.com"]
+
+def test_import_runs_as_a_job(pg_engine, workspace, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(import_service.job_service, "submit", lambda name, fn: submitted.append((name, fn)) or name)
+    data = b"email,password,date_of_birth\nalan@example.com,secret,1912-06-23\n"
+
+    name = import_service.start_import(workspace.id, data, "csv")
+    assert name.startswith(f"import-members:{workspace.id}:")
+    assert import_service.start_import(workspace.id, data, "csv") == name # Same file, same job
+    assert import_service.start_import(workspace.id, data + b"ada@example.com,secret,1815-12-10\n", "csv") != name
+    assert submitted[0][1]().users_created == 1 # Nothing is inserted until the job runs
+
+def test_bad_uploads_fail_before_queueing(pg_engine, workspace, monkeypatch):
+    monkeypatch.setattr(import_service.job_service, "submit", lambda name, fn: pytest.fail("queued a job"))
+    with pytest.raises(HTTPException) as e:
+        import_service.start_import(workspace.id, CSV.encode("utf-16"), "csv")
+    assert e.value.status_code == 400
+    with pytest.raises(HTTPException) as e:
+        import_service.start_import(uuid.uuid4(), CSV.encode(), "csv")
+    assert e.value.status_code == 404
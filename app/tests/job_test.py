@@ -0,0 +1,72 @@
+# app/tests/job_test.py
+#
+# Background jobs against fakeredis: final statuses, and which birthday job a manual trigger runs.
+
+import time
+import fakeredis
+import pytest
+from app.services import job_service, lock_service, utils_service
+from app.services.lock_service import SKIPPED
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(job_service, "redis", client)
+    monkeypatch.setattr(lock_service, "redis", client)
+    return client
+
+def finished(job):
+    deadline = time.monotonic() + 5
+    while job.status in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+        job = job_service.get_job(job.id)
+    return job
+
+def test_succeeded_with_counts_and_progress():
+    def fn():
+        job_service.report_progress(3, 4)
+        return {"count": 3}
+
+    job = finished(job_service.submit("test-ok", fn))
+    assert (job.status, job.counts, job.done, job.total) == ("succeeded", {"count": 3}, 3, 4)
+
+def test_model_result_splits_into_counts_and_details():
+    from app.schemas.import_schema import ImportResult, ImportRowError
+    result = ImportResult(received=2, users_created=1, birthdays_created=1, rejected=1,
+                          errors=[ImportRowError(line=3, email="ada@example.com", error="A user with this email already exists")])
+
+    job = finished(job_service.submit("test-details", lambda: result))
+    assert job.counts == {"received": 2, "users_created": 1, "birthdays_created": 1, "rejected": 1}
+    assert job.details == {"errors": [{"line": 3, "email": "ada@example.com", "error": "A user with this email already exists"}]}
+
+def test_skipped_is_not_success():
+    def fn():
+        raise job_service.JobSkipped("another run holds the lock")
+
+    job = finished(job_service.submit("test-skip", fn))
+    assert job.status == "skipped"
+    assert job.error == "another run holds the lock"
+
+def test_failed():
+    def fn():
+        raise RuntimeError("boom")
+
+    job = finished(job_service.submit("test-fail", fn))
+    assert job.status == "failed"
+    assert "boom" in job.error
+
+@pytest.mark.parametrize("mode, ran", [("daily", "daily"), ("timezone", "timezone")])
+def test_manual_birthday_job_follows_scheduler_mode(monkeypatch, mode, ran):
+    calls = []
+    monkeypatch.setattr(utils_service.settings, "scheduler_mode", mode)
+    monkeypatch.setattr(utils_service, "birthday_job", lambda: calls.append("daily") or {"sent": 1})
+    monkeypatch.setattr(utils_service, "timezone_birthday_job", lambda catch_up: calls.append("timezone") or {"sent": 2})
+    utils_service._birthday_job()
+    assert calls == [ran]
+
+@pytest.mark.parametrize("result, error", [(SKIPPED, job_service.JobSkipped), (None, RuntimeError)])
+def test_manual_birthday_job_surfaces_skips_and_errors(monkeypatch, result, error):
+    monkeypatch.setattr(utils_service.settings, "scheduler_mode", "daily")
+    monkeypatch.setattr(utils_service, "birthday_job", lambda: result)
+    with pytest.raises(error):
+        utils_service._birthday_job()
@@ -0,0 +1,72 @@
+# app/tests/lock_test.py
+#
+# RedisLock and @exclusive against fakeredis: mutual exclusion, heartbeat, failover and per-tick keys.
+
+import time
+import fakeredis
+import pytest
+from app.services.lock_service import SKIPPED, RedisLock, exclusive
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+@pytest.fixture
+def client(server):
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+def test_only_one_holder(client):
+    first, second = RedisLock("job", ttl=5, client=client), RedisLock("job", ttl=5, client=client)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+    assert client.get("lock:job") is None
+
+def test_release_never_deletes_another_holders_lock(client):
+    stale = RedisLock("job", ttl=5, client=client)
+    client.set("lock:job", "someone-else", ex=5)
+    stale.release()
+    assert client.get("lock:job") == "someone-else"
+
+def test_heartbeat_keeps_the_lock_past_its_ttl(client):
+    holder = RedisLock("job", ttl=1, client=client)
+    assert holder.acquire()
+    time.sleep(1.5)
+    assert not RedisLock("job", ttl=1, client=client).acquire()
+    holder.release()
+
+def test_fails_over_when_the_holder_dies(client):
+    holder = RedisLock("job", ttl=1, client=client)
+    assert holder.acquire()
+    holder._stop.set() # Holder process gone: no more heartbeats, no release
+    holder._heartbeat.join()
+    standby = RedisLock("job", ttl=1, client=client)
+    assert not standby.acquire()
+    time.sleep(1.2)
+    assert standby.acquire()
+    standby.release()
+
+def test_exclusive_runs_each_tick_once(client):
+    runs = []
+
+    @exclusive("tick-job", tick=lambda slot: slot, ttl=5, client=client)
+    def job(slot):
+        runs.append(slot)
+        return slot
+
+    assert job("09:00") == "09:00"
+    assert job("09:00") is SKIPPED # A late replica for the same tick skips, the key outlives the run
+    assert client.ttl("lock:tick-job:09:00") > 0
+    assert job("09:15") == "09:15"
+    assert runs == ["09:00", "09:15"]
+
+def test_exclusive_runs_without_redis(server, client):
+    server.connected = False
+
+    @exclusive("tick-job", tick=lambda: "09:00", ttl=5, client=client)
+    def job():
+        return "ran"
+
+    assert job() == "ran"
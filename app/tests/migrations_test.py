@@ -0,0 +1,26 @@
+# app/tests/migrations_test.py
+#
+# One unique constraint on birthday.user_id: in the models, and on legacy databases adopted into migrations.
+
+from sqlalchemy import UniqueConstraint, inspect, text
+from app.core import db
+from app.models.birthday_model import Birthday
+
+def user_id_uniques(engine):
+    return sorted(u["name"] for u in inspect(engine).get_unique_constraints("birthday") if u["column_names"] == ["user_id"])
+
+def test_model_declares_one_unique_on_user_id():
+    table = Birthday.__table__
+    uniques = [c.name for c in table.constraints if isinstance(c, UniqueConstraint) and [col.name for col in c.columns] == ["user_id"]]
+    assert uniques == ["uq_birthday_user"]
+    assert not table.c.user_id.unique
+
+def test_legacy_duplicate_is_dropped(pg_engine, monkeypatch):
+    monkeypatch.setattr(db, "engine", pg_engine)
+    with pg_engine.begin() as conn: # What create_all built from Field(unique=True) before
+        conn.execute(text("ALTER TABLE birthday ADD CONSTRAINT birthday_user_id_key UNIQUE (user_id)"))
+    assert user_id_uniques(pg_engine) == ["birthday_user_id_key", "uq_birthday_user"]
+
+    assert db.drop_duplicate_birthday_user_unique() == 1
+    assert user_id_uniques(pg_engine) == ["uq_birthday_user"]
+    assert db.drop_duplicate_birthday_user_unique() == 0 # Safe to re-run
@@ -0,0 +1,122 @@
+# app/tests/outbox_test.py
+#
+# The delivery outbox against Postgres (TEST_DATABASE_URL): one notification per birthday and day, claims that
+# concurrent drains skip, lease expiry, and dead-lettering. Slack is replaced by a recorder.
+
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from sqlmodel import Session, select
+from app.core.config import settings
+from app.models.birthday_model import Birthday
+from app.models.notification_model import BirthdayNotification
+from app.models.workspace_model import Workspace
+from app.services import outbox_service
+from app.services.slack_delivery_service import DeliveryReport
+
+TODAY = date(2026, 10, 17)
+NOW = datetime(2026, 10, 17, 13, 0, tzinfo=timezone.utc)
+
+class FakeSlack: # Stands in for slack_delivery_service.deliver
+    def __init__(self):
+        self.posted = [] # Names, in the order they went out
+        self.fail = False
+        self.during = None # Called mid-delivery, after the drain committed its claim
+
+    def __call__(self, messages, max_workers=None):
+        if self.during:
+            self.during()
+        report = DeliveryReport()
+        for msg in messages:
+            if self.fail:
+                report.failed.append(msg)
+            else:
+                report.succeeded.append(msg)
+                self.posted.extend(n.name for n in msg.key)
+        return report
+
+@pytest.fixture
+def slack(pg_engine, monkeypatch):
+    fake = FakeSlack()
+    monkeypatch.setattr(outbox_service, "engine", pg_engine)
+    monkeypatch.setattr(outbox_service, "deliver", fake)
+    return fake
+
+@pytest.fixture
+def birthdays(pg_engine):
+    with Session(pg_engine, expire_on_commit=False) as session:
+        ws = Workspace(name="Team", slack_webhook="https://hooks.slack.com/services/T000/B000/team")
+        session.add(ws)
+        session.flush()
+        rows = [Birthday(name=name, date_of_birth=date(2000, 10, 17), workspace_id=ws.id) for name in ("Ada", "Grace")]
+        session.add_all(rows)
+        session.commit()
+    return rows
+
+def enqueue(pg_engine, birthdays):
+    with Session(pg_engine) as session:
+        return outbox_service.enqueue_notifications(session, birthdays, TODAY)
+
+def statuses(pg_engine):
+    with Session(pg_engine) as session:
+        return {n.name: (n.status, n.attempts) for n in session.exec(select(BirthdayNotification)).all()}
+
+def test_enqueue_twice_sends_once(pg_engine, birthdays, slack):
+    assert enqueue(pg_engine, birthdays) == 2
+    assert enqueue(pg_engine, birthdays) == 0 # ON CONFLICT (birthday_id, local_date) DO NOTHING
+    assert outbox_service.drain_outbox(NOW) == (2, 0)
+
+    assert enqueue(pg_engine, birthdays) == 0 # Not even once the first rows are sent
+    assert outbox_service.drain_outbox(NOW) == (0, 0)
+    assert sorted(slack.posted) == ["Ada", "Grace"]
+    assert statuses(pg_engine) == {"Ada": ("sent", 1), "Grace": ("sent", 1)}
+
+def test_concurrent_drain_skips_claimed_rows(pg_engine, birthdays, slack):
+    enqueue(pg_engine, birthdays)
+    overlapping = []
+    slack.during = lambda: overlapping.append(outbox_service.drain_outbox(NOW)) if not overlapping else None
+
+    assert outbox_service.drain_outbox(NOW) == (2, 0)
+    assert overlapping == [(0, 0)] # Started while the first drain was posting: everything was already claimed
+    assert sorted(slack.posted) == ["Ada", "Grace"]
+
+def test_drain_skips_rows_locked_by_another_drain(pg_engine, birthdays, slack):
+    enqueue(pg_engine, birthdays)
+    with Session(pg_engine) as other: # Another drain between its SELECT ... FOR UPDATE and its claim commit
+        other.exec(select(BirthdayNotification).where(BirthdayNotification.name == "Ada").with_for_update()).one()
+        assert outbox_service.drain_outbox(NOW) == (1, 0)
+        assert slack.posted == ["Grace"]
+        other.rollback()
+    assert outbox_service.drain_outbox(NOW) == (1, 0)
+
+def test_claim_is_reclaimed_after_its_lease(pg_engine, birthdays, slack):
+    enqueue(pg_engine, birthdays)
+
+    def crash():
+        raise RuntimeError("worker died mid-send")
+
+    slack.during = crash
+    with pytest.raises(RuntimeError):
+        outbox_service.drain_outbox(NOW)
+    assert statuses(pg_engine) == {"Ada": ("sending", 0), "Grace": ("sending", 0)}
+
+    slack.during = None
+    just_before = NOW + outbox_service.CLAIM_LEASE - timedelta(seconds=1)
+    assert outbox_service.drain_outbox(just_before) == (0, 0) # Lease still held
+    assert outbox_service.drain_outbox(NOW + outbox_service.CLAIM_LEASE) == (2, 0)
+    assert statuses(pg_engine) == {"Ada": ("sent", 1), "Grace": ("sent", 1)}
+
+def test_dead_letter_after_max_attempts(pg_engine, birthdays, slack, monkeypatch):
+    monkeypatch.setattr(settings, "outbox_max_attempts", 3)
+    enqueue(pg_engine, birthdays[:1])
+    slack.fail = True
+
+    now = NOW
+    for attempt in range(1, 4):
+        assert outbox_service.drain_outbox(now) == (0, 1)
+        assert outbox_service.drain_outbox(now) == (0, 0) # Backing off until the next attempt is due
+        now += outbox_service.RETRY_BACKOFF * 2 ** (attempt - 1)
+    assert statuses(pg_engine) == {"Ada": ("dead", 3)}
+
+    slack.fail = False
+    assert outbox_service.drain_outbox(now + timedelta(days=1)) == (0, 0) # Dead rows are never retried
+    assert slack.posted == []
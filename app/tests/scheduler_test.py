@@ -0,0 +1,91 @@
+# app/tests/scheduler_test.py
+#
+# Who gets notified when: the month-day keys looked up for a day (Feb 29 in non-leap years), and which workspaces
+# the timezone scheduler notifies on a tick: the 15-minute window after 09:00 local, :30/:45 offsets, catch-up runs.
+
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+from app.models.birthday_model import month_day_expr, month_day_key
+from app.models.workspace_model import Workspace
+from app.services import scheduler_service
+
+TIMEZONES = [
+    "America/New_York",   # UTC-04:00 in October
+    "UTC",
+    "Asia/Kolkata",       # UTC+05:30
+    "Asia/Kathmandu",     # UTC+05:45
+    "Australia/Adelaide", # UTC+10:30 (daylight saving from early October)
+    "Mars/Olympus_Mons",  # Not a timezone, skipped
+]
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Workspace(name=tz, slack_webhook="https://hooks.slack.com/services/T000/B000/x", timezone=tz) for tz in TIMEZONES)
+        session.add(Workspace(name="Second NY team", slack_webhook="https://hooks.slack.com/services/T000/B000/y"))
+        session.commit()
+        yield session
+
+@pytest.mark.parametrize("day, key", [
+    (date(2000, 1, 1), 101),
+    (date(1990, 7, 4), 704),
+    (date(1999, 12, 31), 1231),
+    (date(2000, 2, 29), 229),
+])
+def test_month_day_key(session, day, key):
+    assert month_day_key(day) == key
+    assert session.exec(select(month_day_expr(day))).one()[0] == key # The SQL twin used by the bulk jobs agrees
+
+@pytest.mark.parametrize("today, keys", [
+    (date(2026, 2, 28), [228, 229]), # Non-leap year: Feb 29 birthdays are celebrated on the 28th
+    (date(2100, 2, 28), [228, 229]), # Divisible by 100, not by 400: not a leap year
+    (date(2028, 2, 28), [228]),      # Leap year: they wait for their own day
+    (date(2028, 2, 29), [229]),
+    (date(2000, 2, 28), [228]),      # Divisible by 400: a leap year
+    (date(2026, 3, 1), [301]),       # Never celebrated twice
+    (date(2026, 10, 17), [1017]),
+])
+def test_month_day_keys_fold_feb_29_into_feb_28(today, keys):
+    assert scheduler_service._month_day_keys(today) == keys
+
+def due(session, hour, minute, catch_up=False, day=17):
+    now = datetime(2026, 10, day, hour, minute, tzinfo=timezone.utc)
+    return {tz for tz_names in scheduler_service._due_offset_groups(session, now, catch_up).values() for tz in tz_names}
+
+@pytest.mark.parametrize("hour, minute, expected", [
+    (12, 59, set()),
+    (13, 0, {"America/New_York"}),
+    (13, 14, {"America/New_York"}),
+    (13, 15, set()), # The next tick must not notify New York again
+    (9, 0, {"UTC"}),
+    (3, 14, set()),
+    (3, 15, {"Asia/Kathmandu"}),   # 09:00 at +05:45
+    (3, 29, {"Asia/Kathmandu"}),
+    (3, 30, {"Asia/Kolkata"}),     # 09:00 at +05:30, Kathmandu is already at 09:15
+    (3, 44, {"Asia/Kolkata"}),
+    (3, 45, set()),
+])
+def test_window_is_the_first_tick_after_nine_local(session, hour, minute, expected):
+    assert due(session, hour, minute) == expected
+
+def test_half_hour_offset_across_the_date_line(session):
+    assert due(session, 22, 30, day=16) == {"Australia/Adelaide"} # 09:00 on the 17th in Adelaide
+    groups = scheduler_service._due_offset_groups(session, datetime(2026, 10, 16, 22, 30, tzinfo=timezone.utc))
+    assert list(groups) == [timedelta(hours=10, minutes=30)]
+
+def test_every_tick_of_a_day_notifies_each_timezone_once(session):
+    seen = []
+    for tick in range(24 * 60 // scheduler_service.TICK_MINUTES):
+        now = datetime(2026, 10, 17, tzinfo=timezone.utc) + tick * timedelta(minutes=scheduler_service.TICK_MINUTES)
+        seen += [tz for tz_names in scheduler_service._due_offset_groups(session, now).values() for tz in tz_names]
+    assert sorted(seen) == sorted(TIMEZONES[:-1])
+
+def test_catch_up_only_includes_workspaces_past_nine(session):
+    assert due(session, 5, 0, catch_up=True) == {"Asia/Kolkata", "Asia/Kathmandu", "Australia/Adelaide"} # 10:30, 10:45, 15:30 local
+    assert due(session, 13, 0, catch_up=True) == set(TIMEZONES[:-1]) # New York just reached 09:00
+    assert due(session, 12, 59, catch_up=True) == set(TIMEZONES[:-1]) - {"America/New_York"}
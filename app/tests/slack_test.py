@@ -0,0 +1,61 @@
+# app/tests/slack_test.py
+#
+# post_birthday_message against the local stub webhook server: retries, backoff and Slack's Retry-After.
+
+import pytest
+from app.services import slack_service
+from benchmarks.stub_webhook_server import StubWebhookServer
+
+@pytest.fixture
+def stub():
+    server = StubWebhookServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def sleeps(monkeypatch): # Record retry delays instead of waiting them out
+    delays = []
+    monkeypatch.setattr(slack_service.time, "sleep", delays.append)
+    return delays
+
+def hits(stub, name):
+    return stub.hits.get(stub.webhook_url(name)[len(stub.base_url):], 0)
+
+def test_posts_once_on_success(stub, sleeps):
+    assert slack_service.post_birthday_message("hi", stub.webhook_url("ok"))
+    assert hits(stub, "ok") == 1
+    assert sleeps == []
+
+def test_waits_for_retry_after_on_429(stub, sleeps):
+    stub.respond_with("limited", (429, 7))
+    assert slack_service.post_birthday_message("hi", stub.webhook_url("limited"))
+    assert hits(stub, "limited") == 2
+    assert sleeps == [7]
+
+def test_backs_off_on_429_without_retry_after(stub, sleeps):
+    stub.respond_with("limited", 429, 429)
+    assert slack_service.post_birthday_message("hi", stub.webhook_url("limited"))
+    assert sleeps == [1, 2]
+
+def test_gives_up_after_three_server_errors(stub, sleeps):
+    stub.respond_with("down", 503, 503, 503)
+    assert not slack_service.post_birthday_message("hi", stub.webhook_url("down"))
+    assert hits(stub, "down") == 3
+    assert sleeps == [1, 2]
+
+def test_does_not_retry_client_errors(stub, sleeps):
+    stub.respond_with("bad", 400)
+    assert not slack_service.post_birthday_message("hi", stub.webhook_url("bad"))
+    assert hits(stub, "bad") == 1
+    assert sleeps == []
+
+def test_render_counts_names_with_newlines():
+    names = ["Ada\nLovelace", "Grace\r\n\nHopper", "Alan"] * 400 # Enough lines to need several messages
+    rendered = slack_service.render_birthday_messages(names)
+    assert len(rendered) > 1
+    assert sum(m.count for m in rendered) == len(names)
+    for m in rendered:
+        lines = [line for b in m.blocks if b["type"] == "section" for line in b["text"]["text"].split("\n")]
+        assert len(lines) == m.count
+    assert "*Ada Lovelace*" in rendered[0].blocks[1]["text"]["text"]
@@ -0,0 +1,119 @@
+# app/tests/utils_test.py
+#
+# The bulk birthday sync jobs against Postgres (TEST_DATABASE_URL): which rows the chunked UPDATE ... FROM and
+# INSERT ... SELECT touch, and the cache invalidations their RETURNING rows drive. Batches of 2 to cross ranges.
+# Also pool stats on redis-py pools with and without the private counters.
+
+from datetime import date
+import pytest
+from redis import ConnectionPool
+from sqlmodel import Session, select
+from app.models.birthday_model import Birthday, month_day_key
+from app.models.user_model import User
+from app.models.workspace_model import Workspace
+from app.services import redis_cache_service as cache
+from app.services import utils_service
+
+@pytest.fixture
+def session(pg_engine, monkeypatch):
+    monkeypatch.setattr(utils_service, "SYNC_BATCH_SIZE", 2)
+    with Session(pg_engine, expire_on_commit=False) as session:
+        yield session
+
+@pytest.fixture
+def invalidations(monkeypatch): # Records the cache calls instead of talking to Redis
+    calls = {"evicted": set(), "all": 0, "workspaces": set()}
+    monkeypatch.setattr(cache, "evict_birthday", lambda *ids: calls["evicted"].update(ids))
+    monkeypatch.setattr(cache, "invalidate_birthdays_all", lambda: calls.__setitem__("all", calls["all"] + 1))
+    monkeypatch.setattr(cache, "invalidate_birthdays_by_workspace", lambda ws: calls["workspaces"].add(ws))
+    return calls
+
+def workspaces(session, count):
+    rows = [Workspace(name=f"Team {i}", slack_webhook="https://hooks.slack.com/services/T000/B000/x") for i in range(count)]
+    session.add_all(rows)
+    session.commit()
+    return rows
+
+def user(session, email, dob, workspace=None, birthday=None):
+    u = User(email=email, hashed_password="x", date_of_birth=dob, workspace_id=workspace.id if workspace else None)
+    session.add(u)
+    session.flush()
+    if birthday is not None:
+        birthday.user_id = u.user_id
+        session.add(birthday)
+    session.commit()
+    return u
+
+def birthday_of(session, u):
+    session.expire_all()
+    return session.exec(select(Birthday).where(Birthday.user_id == u.user_id)).one()
+
+def test_refresh_updates_only_stale_birthdays(session, invalidations):
+    home, away = workspaces(session, 2)
+    dob = date(1990, 3, 4)
+    in_sync = user(session, "same@example.com", dob, home,
+                   Birthday(name="same@example.com", date_of_birth=dob, workspace_id=home.id, month_day=month_day_key(dob)))
+    renamed = user(session, "new@example.com", dob, home,
+                   Birthday(name="old@example.com", date_of_birth=dob, workspace_id=home.id, month_day=month_day_key(dob)))
+    moved = user(session, "moved@example.com", date(1984, 2, 29), away,
+                 Birthday(name="moved@example.com", date_of_birth=date(1984, 1, 1), workspace_id=home.id, month_day=101))
+    no_key = user(session, "nokey@example.com", dob, None,
+                  Birthday(name="nokey@example.com", date_of_birth=dob, workspace_id=None, month_day=None))
+    standalone = Birthday(name="Not a user", date_of_birth=dob, workspace_id=home.id, month_day=month_day_key(dob))
+    session.add(standalone)
+    session.commit()
+
+    result = utils_service.refresh_birthday_table_from_users(session)
+
+    assert result.count == 3
+    assert birthday_of(session, renamed).name == "new@example.com"
+    moved_bd = birthday_of(session, moved)
+    assert (moved_bd.workspace_id, moved_bd.date_of_birth, moved_bd.month_day) == (away.id, date(1984, 2, 29), 229)
+    assert birthday_of(session, no_key).month_day == month_day_key(dob)
+    assert session.get(Birthday, standalone.id).name == "Not a user" # No user behind it, left alone
+
+    assert invalidations["evicted"] == {birthday_of(session, u).id for u in (renamed, moved, no_key)}
+    assert birthday_of(session, in_sync).id not in invalidations["evicted"]
+    assert invalidations["workspaces"] == {home.id, away.id} # Only the move changed list membership
+    assert invalidations["all"] == 0
+
+    assert utils_service.refresh_birthday_table_from_users(session).count == 0 # Everything matches now
+
+def test_backfill_inserts_only_missing_birthdays(session, invalidations):
+    home, other = workspaces(session, 2)
+    existing = Birthday(name="Keep me", date_of_birth=date(1970, 1, 1), workspace_id=other.id, month_day=101)
+    has_one = user(session, "has@example.com", date(1970, 1, 1), other, existing)
+    missing = [user(session, f"m{i}@example.com", date(2000, 12, i + 1), home) for i in range(3)]
+    loner = user(session, "loner@example.com", date(1996, 2, 29))
+
+    result = utils_service.backfill_birthdays(session)
+
+    assert result.count == 4
+    for u in missing + [loner]:
+        bd = birthday_of(session, u)
+        assert (bd.name, bd.date_of_birth, bd.workspace_id) == (u.email, u.date_of_birth, u.workspace_id)
+        assert bd.month_day == month_day_key(u.date_of_birth)
+    kept = birthday_of(session, has_one)
+    assert (kept.id, kept.name) == (existing.id, "Keep me")
+
+    assert invalidations["workspaces"] == {home.id} # From RETURNING: the loner has no workspace, `other` gained nobody
+    assert invalidations["all"] >= 1
+    assert invalidations["evicted"] == set()
+
+    invalidations["all"] = 0
+    invalidations["workspaces"].clear()
+    assert utils_service.backfill_birthdays(session).count == 0
+    assert invalidations == {"evicted": set(), "all": 0, "workspaces": set()} # Nothing created, nothing dropped
+
+def test_pool_stats_reads_redis_counters_when_present(monkeypatch):
+    monkeypatch.setattr(utils_service, "redis_pool", ConnectionPool(max_connections=7))
+    redis = utils_service.get_pool_stats().redis
+    assert (redis.max_connections, redis.in_use, redis.idle) == (7, 0, 0)
+
+def test_pool_stats_without_private_redis_counters(monkeypatch):
+    class BarePool: # A redis-py whose pool bookkeeping lives elsewhere
+        max_connections = 7
+
+    monkeypatch.setattr(utils_service, "redis_pool", BarePool())
+    redis = utils_service.get_pool_stats().redis
+    assert (redis.max_connections, redis.in_use, redis.idle) == (7, None, None)
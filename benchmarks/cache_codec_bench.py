@@ -0,0 +1,67 @@
+# benchmarks/cache_codec_bench.py
+#
+# Encode/decode time and payload size of each cache codec, with and without zlib, plus the cost of turning
+# decoded rows back into objects: per-row Birthday.parse_obj (old hit path) vs one TypeAdapter call into BirthdayRead.
+#
+#   python -m benchmarks.cache_codec_bench --rows 10000 100000
+
+import argparse
+import json
+import time
+import uuid
+from datetime import date, datetime, timezone
+
+from benchmarks import use_bench_env
+use_bench_env() # Settings() needs these, the benchmark never touches Postgres/Redis
+
+from app.core.codecs import CODECS, PayloadCodec
+from app.models.birthday_model import Birthday
+from app.schemas.birthday_schema import BirthdayRead
+from app.services.redis_cache_service import _validate
+
+def make_rows(n: int):
+    now = datetime.now(timezone.utc)
+    return [
+        Birthday(id=uuid.uuid4(), user_id=uuid.uuid4(), name=f"user{i}@example.com", date_of_birth=date(1990, 1 + i % 12, 1 + i % 28),
+                 workspace_id=uuid.uuid4(), month_day=100 + i % 1200, created_at=now).model_dump()
+        for i in range(n)
+    ]
+
+def timed(fn, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for n in args.rows:
+        rows = make_rows(n)
+        print(f"\n{n} rows")
+        print(f"  {'codec':<16}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}")
+        for name in CODECS:
+            for compress in (0, 1):
+                label = name + (" + zlib" if compress else "")
+                try:
+                    codec = PayloadCodec(name, compress_min_bytes=compress)
+                except RuntimeError as e:
+                    print(f"  {label:<16}skipped: {e}")
+                    break
+                enc, payload = timed(lambda: codec.encode(rows))
+                dec, _ = timed(lambda: codec.decode(payload))
+                print(f"  {label:<16}{len(payload):>12}{enc * 1000:>12.1f}{dec * 1000:>12.1f}")
+
+        blob = json.dumps([Birthday(**r).model_dump(mode="json") for r in rows], default=str)
+        old, _ = timed(lambda: [Birthday.parse_obj(d) for d in json.loads(blob)])
+        codec = PayloadCodec("orjson")
+        payload = codec.encode(rows)
+        new, _ = timed(lambda: _validate(BirthdayRead, codec.decode(payload)))
+        print(f"  hit path: json + parse_obj per row {old * 1000:.1f} ms, orjson + one TypeAdapter {new * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/cache_stampede_bench.py
+#
+# DB queries per cache expiry: naive get-or-rebuild vs the single-flight loader, against the Redis in REDIS_URL.
+# The "query" is a sleep that counts how often it runs, so Postgres is not needed.
+#
+#   python -m benchmarks.cache_stampede_bench --concurrency 200 --expiries 5 --query-ms 200
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks import use_bench_env
+use_bench_env() # Settings() needs these, the benchmark never touches Postgres
+
+from pydantic import BaseModel
+from app.services import redis_cache_service as cache
+
+BASE = "bench:stampede"
+
+class Row(BaseModel):
+    id: str
+    name: str
+
+class CountingQuery:
+    def __init__(self, rows: int, query_ms: float):
+        self.rows = [{"id": str(uuid.uuid4()), "name": f"row {i}"} for i in range(rows)]
+        self.delay = query_ms / 1000
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.rows, None
+
+async def naive(query: CountingQuery, limit: int): # What every list endpoint did before: GET, and on a miss query + SET
+    page = await cache._get_page(BASE, "bench", None, limit)
+    if page is not None:
+        return page["items"]
+    items, next_cursor = await query()
+    await cache._set_page(BASE, "bench", "id", None, limit, items, next_cursor)
+    return items
+
+async def single_flight(query: CountingQuery, limit: int):
+    items, _ = await cache._load_page(BASE, "bench", "id", None, limit, query, Row)
+    return items
+
+async def run(name: str, fetch, args) -> None:
+    query = CountingQuery(args.rows, args.query_ms)
+    per_expiry = []
+    started = time.perf_counter()
+    for _ in range(args.expiries):
+        cache._invalidate_pages(BASE) # Simulate the page expiring under load
+        before = query.calls
+        await asyncio.gather(*(fetch(query, args.rows) for _ in range(args.concurrency)))
+        per_expiry.append(query.calls - before)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<13} DB queries per expiry: {per_expiry} (mean {sum(per_expiry) / len(per_expiry):.1f}) in {elapsed:.2f}s")
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests arriving together right after expiry")
+    parser.add_argument("--expiries", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--query-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    await run("naive", naive, args)
+    await run("single-flight", single_flight, args)
+    cache._invalidate_pages(BASE)
+
+if __name__ == "__main__":
+    asyncio.run(main())
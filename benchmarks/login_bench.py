@@ -0,0 +1,64 @@
+# benchmarks/login_bench.py
+#
+# Logins per second under concurrency: verifying on the event loop (what UserManager.authenticate did)
+# vs awaiting the shared hashing pool, plus the worst event-loop stall seen while the logins run.
+# Only the password check is exercised, so Postgres is not needed.
+#
+#   python -m benchmarks.login_bench --logins 200 --concurrency 50 --rounds 12
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks import use_bench_env
+use_bench_env() # Settings() needs these, the benchmark never touches Postgres/Redis
+
+async def watch_loop(stop: asyncio.Event) -> float: # Longest gap between 10 ms ticks, i.e. how long other requests would have waited
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - started - 0.01)
+    return worst
+
+async def run(name: str, verify, hashed: str, args) -> None:
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def login():
+        async with limit:
+            ok, _ = await verify("correct horse", hashed)
+            assert ok
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    stall = await watcher
+    print(f"{name:<12} {args.logins / elapsed:8.1f} logins/s   worst event-loop stall {stall * 1000:8.1f} ms")
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS")
+    args = parser.parse_args()
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds) # Read by the pool's worker processes too
+
+    from app.core import passwords
+    hashed = passwords._context().hash("correct horse")
+
+    async def inline(password: str, stored: str): # Synchronous verify inside the coroutine, like the base UserManager
+        return passwords._context().verify_and_update(password, stored)
+
+    await passwords.hash_password_async("warm up") # Start the worker processes before timing
+    print(f"bcrypt rounds {args.rounds}, {args.logins} logins, {args.concurrency} concurrent, {os.cpu_count()} CPUs")
+    await run("event loop", inline, hashed, args)
+    await run("pool", passwords.verify_and_update_async, hashed, args)
+    passwords.shutdown_pool()
+
+if __name__ == "__main__":
+    asyncio.run(main())
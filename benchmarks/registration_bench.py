@@ -0,0 +1,90 @@
+# benchmarks/registration_bench.py
+#
+# Signups per second for the database half of registration: the old UserManager.create (commit user, refresh,
+# commit birthday) vs one transaction (flush user, add birthday, one commit), against the Postgres in DATABASE_URL.
+# Passwords are hashed once up front so only the DB work is measured; rows created here are deleted afterwards.
+#
+#   python -m benchmarks.registration_bench --signups 500 --concurrency 20
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import date
+
+from benchmarks import use_bench_env
+use_bench_env() # Settings() needs these, the benchmark never touches Redis
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import settings
+from app.core.db import _async_database_url
+from app.models.birthday_model import Birthday, month_day_key
+from app.models.user_model import User
+
+HASHED = "$2b$12$" + "x" * 53 # Never verified, only stored
+EMAIL_DOMAIN = "registration-bench.invalid"
+
+def new_user(i: int, run: str) -> User:
+    return User(email=f"{run}-{i}@{EMAIL_DOMAIN}", hashed_password=HASHED, date_of_birth=date(1990, 1 + i % 12, 1 + i % 28))
+
+async def two_commits(session: AsyncSession, user: User) -> None: # What UserManager.create did
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    session.add(Birthday(user_id=user.user_id, name=user.email, date_of_birth=user.date_of_birth, month_day=month_day_key(user.date_of_birth)))
+    await session.commit()
+
+async def one_transaction(session: AsyncSession, user: User) -> None: # What it does now
+    session.add(user)
+    await session.flush()
+    session.add(Birthday(user_id=user.user_id, name=user.email, date_of_birth=user.date_of_birth,
+                         workspace_id=user.workspace_id, month_day=month_day_key(user.date_of_birth)))
+    await session.commit()
+
+async def run(name: str, register, engine, args) -> None:
+    run_id = f"{name}-{uuid.uuid4().hex[:8]}"
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def signup(i: int):
+        async with limit:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                await register(session, new_user(i, run_id))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(signup(i) for i in range(args.signups)))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<16} {args.signups / elapsed:8.1f} signups/s  ({elapsed:.2f}s for {args.signups})")
+
+async def cleanup(engine) -> None:
+    async with AsyncSession(engine) as session:
+        users = User.__table__.c
+        await session.exec(delete(Birthday).where(Birthday.name.like(f"%@{EMAIL_DOMAIN}")))
+        await session.exec(delete(User).where(users.email.like(f"%@{EMAIL_DOMAIN}")))
+        await session.commit()
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signups", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--database-url", default=_async_database_url(settings.database_url))
+    parser.add_argument("--create-tables", action="store_true", help="Create the schema first (scratch databases)")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url, pool_size=args.concurrency, max_overflow=0) if args.database_url.startswith("postgresql") \
+        else create_async_engine(args.database_url)
+    if args.create_tables:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+    try:
+        print(f"{args.signups} signups, {args.concurrency} concurrent")
+        await run("two commits", two_commits, engine, args)
+        await run("one transaction", one_transaction, engine, args)
+    finally:
+        await cleanup(engine)
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
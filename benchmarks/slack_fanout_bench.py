@@ -0,0 +1,43 @@
+# benchmarks/slack_fanout_bench.py
+#
+# Sequential posting vs the concurrent fan-out engine, against the local stub webhook server.
+#
+#   python -m benchmarks.slack_fanout_bench --workspaces 20 --per-workspace 3 --latency-ms 100
+
+import argparse
+import time
+
+from benchmarks import use_bench_env
+use_bench_env() # Settings() needs these, the benchmark never touches Postgres/Redis
+
+from benchmarks.stub_webhook_server import StubWebhookServer
+from app.services.slack_delivery_service import SlackMessage, deliver
+from app.services.slack_service import post_birthday_message
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workspaces", type=int, default=20)
+    parser.add_argument("--per-workspace", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--rate", type=float, default=1.0, help="Stub's per-webhook rate limit (msg/s)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server = StubWebhookServer(latency_ms=args.latency_ms, rate=args.rate).start()
+    messages = [
+        SlackMessage(webhook_url=server.webhook_url(f"ws{w}"), text=f"Happy Birthday #{i}", key=(w, i))
+        for w in range(args.workspaces)
+        for i in range(args.per_workspace)
+    ]
+
+    started = time.perf_counter()
+    ok = sum(post_birthday_message(m.text, webhook_url=m.webhook_url) for m in messages)
+    sequential = time.perf_counter() - started
+    print(f"sequential: {ok}/{len(messages)} sent in {sequential:.2f}s ({len(messages) / sequential:.1f} msg/s), {server.throttled} throttled")
+
+    server.throttled = 0
+    report = deliver(messages, max_workers=args.workers)
+    print(f"fan-out:    {len(report.succeeded)}/{len(messages)} sent in {report.elapsed:.2f}s ({report.throughput:.1f} msg/s), {server.throttled} throttled")
+
+if __name__ == "__main__":
+    main()
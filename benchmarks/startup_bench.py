@@ -0,0 +1,63 @@
+# benchmarks/startup_bench.py
+#
+# Cold start of the API: time to `import app.main` and to run its lifespan startup, each in a fresh interpreter,
+# plus which heavy optional libraries the import pulled in. Importing no longer touches Postgres; the lifespan
+# starts the scheduler and the Redis listener thread, so only startup (not import) wants REDIS_URL reachable.
+#
+#   python -m benchmarks.startup_bench --runs 10
+#   python -m benchmarks.startup_bench --runs 10 --import-only
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from benchmarks import BENCH_ENV
+
+HEAVY = ("apscheduler", "slack_sdk", "passlib") # Imported on first use, should not show up after the import
+
+CHILD = """
+import asyncio, json, os, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+result = {"import": imported - started, "loaded": [m for m in %(heavy)r if m in sys.modules]}
+if %(startup)r:
+    async def startup():
+        async with app.main.app.router.lifespan_context(app.main.app):
+            result["startup"] = time.perf_counter() - imported
+    asyncio.run(startup())
+print(json.dumps(result))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+def run_once(startup: bool) -> dict:
+    env = {**BENCH_ENV, **os.environ}
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD % {"heavy": HEAVY, "startup": startup}],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def report(name: str, samples: list) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    print(f"{name:<8} median {statistics.median(ms):7.1f} ms   min {ms[0]:7.1f} ms   max {ms[-1]:7.1f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--import-only", action="store_true", help="Skip the lifespan startup (no Redis needed)")
+    args = parser.parse_args()
+
+    results = [run_once(not args.import_only) for _ in range(args.runs)]
+    print(f"{args.runs} cold starts")
+    report("import", [r["import"] for r in results])
+    if not args.import_only:
+        report("startup", [r["startup"] for r in results])
+    loaded = sorted({m for r in results for m in r["loaded"]})
+    print(f"heavy modules loaded by the import: {', '.join(loaded) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/stub_webhook_server.py
+#
+# Local stand-in for Slack incoming webhooks. Every path is treated as its own webhook.
+# Answers "ok" after an optional delay and returns 429 + Retry-After when a path is posted to faster than --rate msgs/s.
+# Tests can script the next responses for a webhook with respond_with().
+#
+#   python -m benchmarks.stub_webhook_server --port 8765 --latency-ms 50 --rate 1
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union
+
+class StubWebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, rate: Optional[float] = None):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency_ms / 1000
+        self.rate = rate
+        self.hits: Dict[str, int] = {}
+        self.throttled = 0
+        self._last_post: Dict[str, float] = {}
+        self._scripted: Dict[str, List[Tuple[int, Optional[int]]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def webhook_url(self, name: str) -> str: # Slack-shaped path so URL redaction in logs behaves like production
+        return f"{self.base_url}/services/T000/B000/{name}"
+
+    def start(self) -> "StubWebhookServer": # Serve from a daemon thread, handy inside benchmarks
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def respond_with(self, name: str, *responses: Union[int, Tuple[int, int]]) -> None:
+        """
+        Answer the next posts to webhook `name` with these status codes, in order, before normal behaviour resumes.
+        Pass (status, retry_after) to also send a Retry-After header.
+        """
+        path = self.webhook_url(name)[len(self.base_url):]
+        with self._lock:
+            self._scripted.setdefault(path, []).extend(r if isinstance(r, tuple) else (r, None) for r in responses)
+
+    def _admit(self, path: str) -> Tuple[int, Optional[int]]: # (status, retry_after seconds)
+        with self._lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            if self._scripted.get(path):
+                return self._scripted[path].pop(0)
+            now = time.monotonic()
+            last = self._last_post.get(path)
+            if self.rate and last is not None and now - last < 1 / self.rate:
+                self.throttled += 1
+                return 429, 1
+            self._last_post[path] = now
+            return 200, None
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubWebhookServer
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status, retry_after = self.server._admit(self.path)
+        body = b"ok" if status == 200 else b"rate_limited" if status == 429 else b"error"
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): # Keep benchmark output readable
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Slack webhook server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=None, help="Max posts per second per webhook before 429s")
+    args = parser.parse_args()
+    server = StubWebhookServer(args.port, args.latency_ms, args.rate)
+    print(f"Stub webhooks listening on {server.base_url}")
+    server.serve_forever()